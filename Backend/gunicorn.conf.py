@@ -0,0 +1,26 @@
+# Multi-worker deployment: gunicorn -c gunicorn.conf.py main:app
+#
+# The app and every fork-safe model (dropout predictor, cluster artifacts)
+# are loaded once in the master and shared copy-on-write by the workers.
+# TensorFlow LSTMs are loaded by each worker after fork.
+#
+# State that endpoints change at runtime (cluster /update and /reload, drift
+# windows) is shared through files under STATE_DIR (services/shared_state.py),
+# so every worker serves the same model versions; STATE_DIR must be on a disk
+# all workers see.
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+# PRELOAD_MODELS=0 loads everything in each worker instead (no sharing)
+preload_app = os.getenv("PRELOAD_MODELS", "1") != "0"
+
+def when_ready(server):
+    if not preload_app:
+        return
+    from services.model_registry import registry
+    report = registry.preload_for_fork(int(os.getenv("MODEL_LOAD_WORKERS", "0")) or None)
+    shared = [model['name'] for model in report['models'] if model['status'] == "ready"]
+    server.log.info("Preloaded %s before forking %d workers", ", ".join(shared), workers)
@@ -1,8 +1,52 @@
-from fastapi import FastAPI
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from routers import forecasting, dropout, cluster
+from fastapi.responses import JSONResponse, PlainTextResponse
+from routers import forecasting, dropout, cluster, district, jobs, models, debug, drift
+from services import drift as drift_monitors, metrics, profiling
+from services.executors import Overloaded, shutdown_executors
+from services.jobs import job_manager
+from services.prediction_log import prediction_logger
+from services.responses import NumpyJSONResponse
+from services.model_registry import registry
 
-app = FastAPI(title="VaccineAI Backend API")
+# "blocking" waits for every model to be loaded and warmed before serving;
+# "background" serves immediately and reports not-ready on /health/ready until warm
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "blocking")
+MODEL_LOAD_WORKERS = int(os.getenv("MODEL_LOAD_WORKERS", "0")) or None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Jobs interrupted by the last shutdown continue from their last committed chunk
+    resumed = job_manager.resume()
+    if resumed:
+        print(f"✅ Resumed {len(resumed)} batch jobs")
+    # Served predictions are buffered and written to the prediction log in the background
+    prediction_logger.start()
+    # Reference sketches for input drift, binned from the training tables
+    await asyncio.to_thread(drift_monitors.fit_all)
+    # Live sketches are published for the other workers' drift reports
+    drift_monitors.start_sharing()
+    # Load and warm every registered model concurrently
+    warmup = asyncio.to_thread(registry.load_all, MODEL_LOAD_WORKERS)
+    if STARTUP_WARMUP == "background":
+        task = asyncio.create_task(warmup)
+        yield
+        await task
+    else:
+        report = await warmup
+        startup = report['startup']
+        print(f"✅ Models warm in {startup['wall_seconds']}s "
+              f"(sum {startup['sum_seconds']}s, slowest {startup['slowest_model']} {startup['slowest_seconds']}s)")
+        yield
+    await job_manager.shutdown()
+    await asyncio.to_thread(prediction_logger.stop)
+    await asyncio.to_thread(drift_monitors.stop_sharing)
+    shutdown_executors()
+
+app = FastAPI(title="VaccineAI Backend API", lifespan=lifespan, default_response_class=NumpyJSONResponse)
 
 # Allow CORS for frontend
 app.add_middleware(
@@ -13,11 +57,50 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency histograms and in-flight requests for /metrics
+app.add_middleware(metrics.MetricsMiddleware)
+
+# Admin-only profiling: nothing is mounted unless DEBUG_TOKEN is set
+if profiling.DEBUG_TOKEN:
+    app.add_middleware(profiling.ProfileMiddleware)
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    """A model executor's queue is full: shed load instead of queuing without bound."""
+    return JSONResponse(
+        status_code=429,
+        content={'error': str(exc), 'status': 'error'},
+        headers={'Retry-After': str(exc.retry_after)}
+    )
+
 # Include routers
 app.include_router(forecasting.router, prefix="/api/forecast", tags=["Forecasting"])
 app.include_router(dropout.router, prefix="/api/dropout", tags=["Dropout"])
 app.include_router(cluster.router, prefix="/api/cluster", tags=["Cluster"])
+app.include_router(district.router, prefix="/api/district", tags=["District"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["Jobs"])
+app.include_router(models.router, prefix="/api/models", tags=["Models"])
+app.include_router(drift.router, prefix="/api/drift", tags=["Drift"])
+if profiling.DEBUG_TOKEN:
+    app.include_router(debug.router, prefix="/debug", tags=["Debug"], include_in_schema=False)
 
 @app.get("/")
-def root():
-    return {"message": "VaccineAI Backend API"} 
\ No newline at end of file
+async def root():
+    return {"message": "VaccineAI Backend API"}
+
+@app.get("/health/live")
+async def health_live():
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def health_ready():
+    """200 once every model is loaded and warmed, 503 before that."""
+    return JSONResponse(
+        status_code=200 if registry.is_ready() else 503,
+        content={'ready': registry.is_ready(), 'startup': registry.startup}
+    )
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus text exposition of request, span, model cache and batch size metrics."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -13,9 +13,24 @@ if not hf_token:
 huggingface_repo_url = f"https://{hf_token}@huggingface.co/spaces/Tanmay0483/ArogyaAI"
 local_clone_folder = "hf_space_clone"
 your_project_folder = "."  # Root of your actual code
-binary_patterns = ["*.pkl", "*.h5", "*.keras", "*.bin", "*.pth", "*.png"]  # Track binary files with LFS
-essential_files = ["Dockerfile", "main.py", "requirements.txt"]  # Essential files
-essential_dirs = ["router", "cluster_model", "notebooks/models", "notebooks/vaccine_models", "notebooks/vaccine_scalers"]  # Model directories
+binary_patterns = ["*.pkl", "*.h5", "*.keras", "*.onnx", "*.pack", "*.bin", "*.pth", "*.png"]  # Track binary files with LFS
+essential_files = ["Dockerfile", "main.py", "gunicorn.conf.py", "requirements.txt", "models.pack"]  # Essential files
+essential_dirs = ["routers", "services", "data"]  # Model files ship inside models.pack
+
+# === STEP 0: Export the forecasting models to ONNX and pack the served model files into models.pack ===
+print("📦 Exporting the ONNX forecast models...")
+try:
+    subprocess.run(["python", "-m", "services.forecast_onnx", "--int8"], check=True)
+except subprocess.CalledProcessError as e:
+    print(f"⚠️ ONNX export failed or does not match Keras: {e}")
+    exit(1)
+
+print("📦 Building the model pack...")
+try:
+    subprocess.run(["python", "-m", "services.model_pack"], check=True)
+except subprocess.CalledProcessError as e:
+    print(f"⚠️ Failed to build models.pack: {e}")
+    exit(1)
 
 # === STEP 1: Clone the Space repo ===
 def remove_directory(path, retries=5, delay=3):
@@ -52,7 +67,8 @@ except subprocess.CalledProcessError as e:
 # === STEP 2: Copy essential files and model directories to the repo ===
 def copy_folder(src, dst):
     exclude_dirs = {'.git', '__pycache__', '.venv', 'venv', 'hf_space_clone', '.vscode', '.idea', '.ipynb_checkpoints'}
-    exclude_files = {'.gitignore', '.env', '*.ipynb'}
+    # Arrow/Parquet copies of the datasets are rebuilt from the CSVs by the Dockerfile
+    exclude_files = {'.gitignore', '.env', '*.ipynb', '*.arrow', '*.parquet'}
     # Copy essential files from the root
     for file in essential_files:
         src_file = os.path.join(src, file)
@@ -61,7 +77,7 @@ def copy_folder(src, dst):
             shutil.copy2(src_file, dst_file)
             print(f"Copied {src_file} to {dst_file}")
 
-    # Copy essential directories (e.g., router, model directories)
+    # Copy essential directories (routers, services, data)
     for dir_name in essential_dirs:
         src_dir = os.path.join(src, dir_name)
         dst_dir = os.path.join(dst, dir_name)
@@ -94,7 +110,7 @@ except subprocess.CalledProcessError as e:
 print("📦 Adding and committing files...")
 try:
     subprocess.run(["git", "add", "."], check=True)
-    subprocess.run(["git", "commit", "-m", "Initial deployment of Docker-based API with main.py, router, and model files"], check=True)
+    subprocess.run(["git", "commit", "-m", "Initial deployment of Docker-based API with main.py, routers, and the model pack"], check=True)
 except subprocess.CalledProcessError as e:
     print(f"⚠️ No changes to commit or error: {e}")
     # Continue to push even if no changes
@@ -1,8 +1,32 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
 import pandas as pd
-import joblib
+import json
 import os
+import threading
+import pyarrow as pa
+from services.cluster_features import (
+    FEATURES, RAW_FEATURES, feature_matrix, frame_feature_matrix, priority_score, valid_rows
+)
+from services import drift, shared_state
+from services.camp_placement import place_camps
+from services.cluster_map import PayloadCache, areas_geojson, grid_geojson
+from services.datasets import AREAS
+from services.executors import ModelExecutor, Overloaded
+from services.cluster_model import (
+    MODEL_FILE, SCALER_FILE, SUMMARY_FILE, OnlineClusterModel, artifact_version, load_cluster_artifacts
+)
+from services.geo_index import AreaIndex
+from services.jobs import JobKind, job_manager
+from services.metrics import observe_batch, span
+from services.response_cache import response_cache
+from services.responses import ErrorResponse, NumpyJSONResponse, SlimModel, parse_fields, slim
+from services.model_registry import ModelSpec, registry
+from services.prediction_log import prediction_logger
 
 router = APIRouter()
 
@@ -10,6 +34,37 @@ router = APIRouter()
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_DIR = os.path.join(BASE_DIR, "../notebooks/cluster_model")
 
+# ClusterInput field name -> area table column name
+INPUT_COLUMNS = {
+    'area_id': 'Area ID',
+    'city_name': 'City Name',
+    'district_name': 'District Name',
+    'latitude': 'Latitude',
+    'longitude': 'Longitude',
+    'zero_dose_count': 'Zero-dose Count',
+    'income': 'Income',
+    'travel_time': 'Travel Time',
+    'literacy_rate': 'Literacy Rate'
+}
+
+# Area table column name -> ClusterInput field name, for logging batch rows as /predict inputs
+FIELD_NAMES = {column: field for field, column in INPUT_COLUMNS.items()}
+
+# Rows scored and serialized per chunk by the batch endpoint
+BATCH_CHUNK_SIZE = 10000
+# Columns of each predict-batch result row, in output order
+BATCH_COLUMNS = [
+    'area_id', 'city_name', 'district_name', 'latitude', 'longitude', 'cluster_id',
+    'cluster_type', 'risk_level', 'priority_score', 'intervention_priority'
+]
+
+# Areas served by /nearest-high-risk
+HIGH_RISK_LEVELS = ('Critical', 'High')
+HIGH_PRIORITY_LEVELS = ('Immediate', 'High')
+
+# Browsers and CDNs may reuse the map for this long before revalidating with the ETag
+MAP_MAX_AGE_SECONDS = 300
+
 class ClusterInput(BaseModel):
     area_id: str
     city_name: str
@@ -21,8 +76,128 @@ class ClusterInput(BaseModel):
     travel_time: int
     literacy_rate: float
 
-@router.post("/predict")
-def cluster_predict(input: ClusterInput):
+# Inputs of /predict and /predict-batch, compared with the area table on /api/drift
+drift_monitor = drift.register(drift.DriftMonitor("cluster", AREAS, numeric={
+    field: INPUT_COLUMNS[field] for field in ('latitude', 'longitude', 'zero_dose_count', 'income', 'travel_time', 'literacy_rate')
+}, categorical={field: INPUT_COLUMNS[field] for field in ('city_name', 'district_name')}))
+
+class CampPlacementInput(BaseModel):
+    camps: int
+    max_travel_km: float
+    method: str = "greedy"
+    district_name: Optional[str] = None
+    time_limit_seconds: float = 10
+
+class Coordinates(BaseModel):
+    latitude: float
+    longitude: float
+
+class AreaInfo(BaseModel):
+    area_id: str
+    city_name: str
+    district_name: str
+    coordinates: Coordinates
+
+class CurrentMetrics(BaseModel):
+    # Echoed from ClusterInput, so they keep its integer types
+    zero_dose_count: int
+    income: int
+    travel_time: int
+    literacy_rate: float
+    priority_score: float
+
+class ClusterCharacteristics(BaseModel):
+    avg_zero_dose: float
+    avg_income: float
+    avg_travel_time: float
+    avg_literacy: float
+    avg_priority_score: float
+    similar_areas: str
+
+class ClusterPrediction(SlimModel):
+    cluster_id: Optional[int] = None
+    cluster_type: Optional[str] = None
+    risk_level: Optional[str] = None
+    area_info: Optional[AreaInfo] = None
+    current_metrics: Optional[CurrentMetrics] = None
+    cluster_characteristics: Optional[ClusterCharacteristics] = None
+    recommendations: Optional[List[str]] = None
+    intervention_priority: Optional[str] = None
+
+class AreaMatch(BaseModel):
+    area_id: str
+    city_name: str
+    district_name: str
+    latitude: float
+    longitude: float
+    cluster_id: int
+    cluster_type: str
+    risk_level: str
+    priority_score: float
+    intervention_priority: str
+    distance_km: float
+
+class AreaMatches(SlimModel):
+    query: Dict[str, Any]
+    count: int
+    areas: List[AreaMatch]
+
+class Camp(BaseModel):
+    rank: int
+    area_id: str
+    city_name: str
+    district_name: str
+    coordinates: Coordinates
+    covered_areas: int
+    covered_zero_dose: int
+    covered_area_ids: List[str]
+
+class CampCoverage(BaseModel):
+    areas: int
+    total_areas: int
+    zero_dose_covered: int
+    zero_dose_total: int
+    zero_dose_covered_pct: float
+    weighted_covered_pct: float
+
+class CampPlacement(SlimModel):
+    status: str
+    camps: List[Camp]
+    coverage: CampCoverage
+    solver: Dict[str, Any]
+
+class ClusterModelUpdate(SlimModel):
+    status: str
+    model_version: Optional[str] = None
+    observations: Optional[int] = None
+    cluster_sizes: Optional[Dict[int, int]] = None
+
+# Feature building, assignment and spatial queries run on the cluster executor
+executor = ModelExecutor.from_env("cluster")
+
+@router.post("/predict", response_model=Union[ClusterPrediction, ErrorResponse], response_model_exclude_unset=True)
+async def cluster_predict(input: ClusterInput, fields: Optional[str] = None, compact: bool = False):
+    """fields= keeps only the listed keys; compact=true drops the static recommendations."""
+    drift_monitor.observe(input)
+
+    if cluster_state_changed():
+        await executor.run(sync_cluster_state)
+    version = registry.version("cluster")
+    result = await response_cache.get_or_compute("cluster", version, input,
+                                                 lambda: executor.run(classify_and_index, input))
+    if 'error' in result:
+        return result
+    prediction_logger.log("cluster", input, result, version)
+    record = classified_record(input, result)
+    if not is_indexed(record):
+        # Cached classification of an area the spatial indexes do not hold (yet)
+        await executor.run(index_classified_areas, [record])
+    # Validated once when it was computed: only fields= and compact= are applied per request
+    return NumpyJSONResponse(slim(result, fields, compact))
+
+def classify_and_index(input):
+    """Classify one area, index it and return the response as it is cached."""
+
     input_dict = {
         'Area ID': input.area_id,
         'City Name': input.city_name,
@@ -35,40 +210,408 @@ def cluster_predict(input: ClusterInput):
         'Literacy Rate': input.literacy_rate
     }
     result = predict_cluster(input_dict)
-    return result
+    if 'error' in result:
+        return result
+    index_classified_areas([classified_record(input, result)])
+    return ClusterPrediction.model_validate(result).model_dump(exclude_unset=True)
 
-def predict_cluster(input_data):
+def classified_record(input, result):
+    """Spatial index record for a ClusterInput and its /predict result."""
+    return {
+        'area_id': input.area_id,
+        'city_name': input.city_name,
+        'district_name': input.district_name,
+        'latitude': input.latitude,
+        'longitude': input.longitude,
+        'cluster_id': result['cluster_id'],
+        'cluster_type': result['cluster_type'],
+        'risk_level': result['risk_level'],
+        'priority_score': result['current_metrics']['priority_score'],
+        'intervention_priority': result['intervention_priority'],
+        # Kept so the area can be re-classified when the artifacts change
+        'zero_dose_count': input.zero_dose_count,
+        'income': input.income,
+        'travel_time': input.travel_time,
+        'literacy_rate': input.literacy_rate
+    }
+
+@router.post("/predict-batch")
+async def cluster_predict_batch(request: Request, format: str = "ndjson", fields: Optional[str] = None):
+    """
+    Classify many areas in one call. Accepts a JSON array of ClusterInput
+    objects, a raw text/csv body or a multipart CSV upload (field "file")
+    using either the area table headers or the ClusterInput field names.
+    Results are streamed back as NDJSON (default) or CSV; fields= keeps
+    only the listed columns.
+    """
+    if format not in ("ndjson", "csv"):
+        return {
+            'error': f"Unsupported format: {format}. Use 'ndjson' or 'csv'",
+            'status': 'error'
+        }
+    columns = [column for column in BATCH_COLUMNS if column in parse_fields(fields)] if fields else None
+    if fields and not columns:
+        return {
+            'error': f"No known fields in {fields}. Available: {', '.join(BATCH_COLUMNS)}",
+            'status': 'error'
+        }
+
+    try:
+        content_type = request.headers.get('content-type', '')
+        if content_type.startswith('multipart/form-data'):
+            form = await request.form()
+            upload = form.get('file')
+            if upload is None:
+                return {'error': "Missing CSV upload field 'file'", 'status': 'error'}
+            body = upload.file
+        else:
+            body = await request.body()
+        areas = await executor.run(read_batch_areas, content_type, body)
+    except Overloaded:
+        raise
+    except Exception as e:
+        return {
+            'error': f'Invalid batch input: {str(e)}',
+            'status': 'error'
+        }
+    if isinstance(areas, dict):
+        return areas
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(executor.iterate(stream_batch_predictions(areas, format, columns=columns)),
+                             media_type=media_type)
+
+def read_batch_areas(content_type, body):
+    """Parse a predict-batch body (CSV file or bytes, or a JSON array) into a prepared area frame."""
+    if content_type.startswith(('multipart/form-data', 'text/csv')):
+        areas = pd.read_csv(body if hasattr(body, 'read') else BytesIO(body))
+    else:
+        payload = json.loads(body)
+        if not isinstance(payload, list):
+            return {'error': 'Expected a JSON array of areas', 'status': 'error'}
+        areas = pd.DataFrame(payload)
+    areas = prepare_batch_frame(areas)
+    drift_monitor.observe_frame(areas)
+    return areas
+
+@router.get("/nearby", response_model=Union[AreaMatches, ErrorResponse])
+async def cluster_nearby(lat: float, lon: float, radius_km: float = 10.0, limit: int = 100):
+    """Classified areas within radius_km of a point, nearest first."""
+    return await executor.run(search_nearby, lat, lon, radius_km, limit)
+
+def search_nearby(lat, lon, radius_km, limit):
+    if radius_km <= 0:
+        return {'error': 'radius_km must be positive', 'status': 'error'}
     try:
-        input_df = pd.DataFrame([input_data])
-
-        input_df['Dose_Density'] = input_df['Zero-dose Count'] / (input_df['Income'] / 1000)
-        input_df['Accessibility_Score'] = input_df['Literacy Rate'] / input_df['Travel Time']
-        input_df['Priority_Score'] = (
-            input_df['Zero-dose Count'] * 0.4 +
-            input_df['Travel Time'] * 0.3 +
-            (100 - input_df['Literacy Rate']) * 0.3
+        area_index, _ = get_area_indexes()
+        matches = area_index.query_radius(lat, lon, radius_km, limit=limit)
+        return {
+            'query': {'latitude': lat, 'longitude': lon, 'radius_km': radius_km},
+            'count': len(matches),
+            'areas': format_area_matches(matches)
+        }
+    except Exception as e:
+        return {
+            'error': f'Nearby search failed: {str(e)}',
+            'status': 'error'
+        }
+
+@router.get("/nearest-high-risk", response_model=Union[AreaMatches, ErrorResponse])
+async def cluster_nearest_high_risk(lat: float, lon: float, k: int = 5):
+    """The k nearest areas with a high risk level or intervention priority."""
+    return await executor.run(search_nearest_high_risk, lat, lon, k)
+
+def search_nearest_high_risk(lat, lon, k):
+    if k <= 0:
+        return {'error': 'k must be positive', 'status': 'error'}
+    try:
+        _, high_risk_index = get_area_indexes()
+        matches = high_risk_index.query_nearest(lat, lon, k=k)
+        return {
+            'query': {'latitude': lat, 'longitude': lon, 'k': k},
+            'count': len(matches),
+            'areas': format_area_matches(matches)
+        }
+    except Exception as e:
+        return {
+            'error': f'Nearest high-risk search failed: {str(e)}',
+            'status': 'error'
+        }
+
+@router.post("/camp-placement", response_model=Union[CampPlacement, ErrorResponse])
+async def cluster_camp_placement(input: CampPlacementInput):
+    """
+    Pick mobile camp locations among the known areas that maximize the
+    zero-dose count within max_travel_km, weighted by priority score.
+    method=greedy uses lazy greedy; method=exact solves the MIP with OR-Tools.
+    """
+    return await executor.run(run_camp_placement, input)
+
+def run_camp_placement(input):
+    if input.camps <= 0 or input.max_travel_km <= 0:
+        return {'error': 'camps and max_travel_km must be positive', 'status': 'error'}
+    if input.method not in ("greedy", "exact"):
+        return {'error': f"Unsupported method: {input.method}. Use 'greedy' or 'exact'", 'status': 'error'}
+    if not AREAS.available():
+        return {'error': 'Area table not available', 'status': 'error'}
+
+    try:
+        areas = prepare_batch_frame(AREAS.frame(list(INPUT_COLUMNS.values())))
+        if input.district_name:
+            areas = areas[areas['District Name'].str.casefold() == input.district_name.casefold()]
+        X = frame_feature_matrix(areas)
+        valid = valid_rows(X)
+        areas, X = areas[valid].reset_index(drop=True), X[valid]
+        if areas.empty:
+            return {'error': 'No areas to place camps over', 'status': 'error'}
+
+        zero_dose = X[:, FEATURES.index('Zero-dose Count')]
+        weights = zero_dose * X[:, FEATURES.index('Priority_Score')]
+        chosen, assigned, solver = place_camps(
+            areas['Latitude'].to_numpy(), areas['Longitude'].to_numpy(), weights,
+            input.camps, input.max_travel_km, input.method, input.time_limit_seconds
         )
 
-        # Load models using relative path
-        scaler_path = os.path.join(MODEL_DIR, "vaccination_scaler.pkl")
-        model_path = os.path.join(MODEL_DIR, "vaccination_cluster_kmeans.pkl")
-        summary_path = os.path.join(MODEL_DIR, "cluster_summary.pkl")
+        camps = []
+        for rank, (site, covered) in enumerate(zip(chosen, assigned), 1):
+            camps.append({
+                'rank': rank,
+                'area_id': areas.at[site, 'Area ID'],
+                'city_name': areas.at[site, 'City Name'],
+                'district_name': areas.at[site, 'District Name'],
+                'coordinates': {
+                    'latitude': float(areas.at[site, 'Latitude']),
+                    'longitude': float(areas.at[site, 'Longitude'])
+                },
+                'covered_areas': int(len(covered)),
+                'covered_zero_dose': int(round(zero_dose[covered].sum())),
+                'covered_area_ids': areas['Area ID'].to_numpy()[covered].tolist()
+            })
+
+        covered_zero_dose = sum(camp['covered_zero_dose'] for camp in camps)
+        covered_weight = float(sum(weights[covered].sum() for covered in assigned))
+        return {
+            'status': 'success',
+            'camps': camps,
+            'coverage': {
+                'areas': int(sum(len(covered) for covered in assigned)),
+                'total_areas': len(areas),
+                'zero_dose_covered': covered_zero_dose,
+                'zero_dose_total': int(round(zero_dose.sum())),
+                'zero_dose_covered_pct': round(100 * covered_zero_dose / max(zero_dose.sum(), 1), 1),
+                'weighted_covered_pct': round(100 * covered_weight / max(weights.sum(), 1e-9), 1)
+            },
+            'solver': solver
+        }
+    except ImportError:
+        return {'error': 'OR-Tools is required for method=exact', 'status': 'error'}
+    except Exception as e:
+        return {
+            'error': f'Camp placement failed: {str(e)}',
+            'status': 'error'
+        }
+
+@router.get("/map")
+async def cluster_map(request: Request, view: str = "areas", cell_deg: float = 0.25):
+    """
+    Risk map of every area in the area table as GeoJSON: one point per area
+    (view=areas) or cell_deg grid cells aggregated (view=grid). Built once
+    per model version, served gzipped with an ETag for conditional requests.
+    """
+    if view not in ("areas", "grid"):
+        return {'error': f"Unsupported view: {view}. Use 'areas' or 'grid'", 'status': 'error'}
+    if view == "grid" and not 0.01 <= cell_deg <= 5:
+        return {'error': 'cell_deg must be between 0.01 and 5', 'status': 'error'}
+    if not AREAS.available():
+        return {'error': 'Area table not available', 'status': 'error'}
+
+    try:
+        artifacts, payload = await executor.run(map_payload, view, cell_deg)
+    except Overloaded:
+        raise
+    except Exception as e:
+        return {
+            'error': f'Map generation failed: {str(e)}',
+            'status': 'error'
+        }
+
+    headers = {
+        'ETag': payload.etag,
+        'Cache-Control': f'public, max-age={MAP_MAX_AGE_SECONDS}',
+        'Vary': 'Accept-Encoding',
+        'X-Model-Version': str(artifacts.version)
+    }
+    if_none_match = request.headers.get('if-none-match', '')
+    if if_none_match and (if_none_match.strip() == '*' or payload.etag in
+                          [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]):
+        return Response(status_code=304, headers=headers)
+    if 'gzip' in request.headers.get('accept-encoding', ''):
+        headers['Content-Encoding'] = 'gzip'
+        return Response(content=payload.gzipped, media_type="application/geo+json", headers=headers)
+    return Response(content=payload.body, media_type="application/geo+json", headers=headers)
+
+def map_payload(view, cell_deg):
+    artifacts = get_cluster_artifacts()
+    if view == "areas":
+        payload = _map_cache.get(artifacts.version, ("areas",),
+                                 lambda: areas_geojson(classify_area_table(artifacts=artifacts)))
+    else:
+        payload = _map_cache.get(artifacts.version, ("grid", cell_deg),
+                                 lambda: grid_geojson(classify_area_table(artifacts=artifacts), cell_deg))
+    return artifacts, payload
+
+@router.post("/update", response_model=Union[ClusterModelUpdate, ErrorResponse], response_model_exclude_unset=True)
+async def cluster_update(areas: List[ClusterInput]):
+    """
+    Learn from newly observed areas: MiniBatchKMeans partial_fit on the
+    served centroids, incremental summary update, and a hot swap of the
+    artifacts used by every cluster endpoint.
+    """
+    return await executor.run(run_cluster_update, areas)
+
+def run_cluster_update(areas):
+    global _online_model
+    if not areas:
+        return {'error': 'No areas provided', 'status': 'error'}
+    try:
+        observations = pd.DataFrame([{INPUT_COLUMNS[k]: v for k, v in area.dict().items()} for area in areas])
+        observe_batch("cluster.update", len(observations))
+        # One update at a time across workers, each starting from the last one saved
+        with shared_state.locked("cluster"), _online_model_lock:
+            sync_cluster_state()
+            if _online_model is None:
+                _online_model = OnlineClusterModel(get_cluster_artifacts())
+            artifacts, learned = _online_model.partial_fit(observations)
+            save_cluster_state(_online_model.base_version, _online_model, artifacts)
+            swap_cluster_artifacts(artifacts)
+            cluster_sizes = {int(k): int(n) for k, n in enumerate(_online_model.counts)}
+
+        return {
+            'status': 'success',
+            'model_version': artifacts.version,
+            'observations': learned,
+            'cluster_sizes': cluster_sizes
+        }
+    except Exception as e:
+        return {
+            'error': f'Cluster update failed: {str(e)}',
+            'status': 'error'
+        }
+
+@router.post("/reload", response_model=Union[ClusterModelUpdate, ErrorResponse], response_model_exclude_unset=True)
+async def cluster_reload():
+    """Reload the cluster artifacts from disk (e.g. after a CLI refit) in every worker, dropping online updates."""
+    return await executor.run(run_cluster_reload)
+
+def run_cluster_reload():
+    global _online_model
+    try:
+        with shared_state.locked("cluster"), _online_model_lock:
+            artifacts = load_cluster_artifacts(MODEL_DIR)
+            _online_model = None
+            save_cluster_state(artifacts.version, None, None)
+            swap_cluster_artifacts(artifacts)
+        return {'status': 'success', 'model_version': artifacts.version}
+    except Exception as e:
+        return {
+            'error': f'Cluster reload failed: {str(e)}',
+            'status': 'error'
+        }
+
+_map_cache = PayloadCache()
+_online_model = None
+# Re-entrant: an update syncs the shared state while holding it
+_online_model_lock = threading.RLock()
+
+# What /update and /reload last saved, so every worker serves the same
+# artifacts and online updates survive a restart
+CLUSTER_STATE = shared_state.path("cluster.pkl")
+_state_stamp = None
 
-        scaler = joblib.load(scaler_path)
-        model = joblib.load(model_path)
-        cluster_summary = joblib.load(summary_path)
+def warm_cluster_artifacts(artifacts):
+    X = feature_matrix(19.0, 75.0, 40, 20000, 30, 87.0)
+    artifacts.assigner.predict(X)
+    artifacts.model.predict((X - artifacts.scaler.mean_) / artifacts.scaler.scale_)
 
-        features = [
-            'Latitude', 'Longitude', 'Zero-dose Count', 'Income',
-            'Travel Time', 'Literacy Rate', 'Dose_Density',
-            'Accessibility_Score', 'Priority_Score'
-        ]
-        processed_input = scaler.transform(input_df[features])
-        cluster = model.predict(processed_input)[0]
+registry.register(ModelSpec(
+    "cluster", "cluster",
+    loader=lambda: load_cluster_artifacts(MODEL_DIR),
+    files=[os.path.join(MODEL_DIR, name) for name in (SCALER_FILE, MODEL_FILE, SUMMARY_FILE)],
+    warmup=warm_cluster_artifacts,
+    refresh=lambda: sync_cluster_state()
+))
 
-        cluster_profile = cluster_summary[cluster_summary['KMeans_Cluster'] == cluster].iloc[0]
+def get_cluster_artifacts():
+    """The served cluster artifacts, shared through the model registry."""
+    return registry.get("cluster")
 
-        cluster_type, risk_level, recommendations = analyze_cluster(cluster, cluster_profile, input_data)
+def cluster_state_changed():
+    return shared_state.stamp(CLUSTER_STATE) != _state_stamp
+
+def save_cluster_state(base_version, online_model, artifacts):
+    """
+    Save what this worker now serves for the others: an online model and
+    its artifacts, or None for the artifacts on disk at base_version.
+    Called with the cluster state lock held.
+    """
+    global _state_stamp
+    shared_state.write_pickle(CLUSTER_STATE, {'base_version': base_version, 'online': online_model,
+                                              'artifacts': artifacts})
+    _state_stamp = shared_state.stamp(CLUSTER_STATE)
+
+def sync_cluster_state():
+    """
+    Serve what another worker's /update or /reload saved. A stat per call
+    while nothing changed; state saved against artifacts since replaced
+    on disk (a refit followed by a restart) is ignored.
+    """
+    global _online_model, _state_stamp
+    if not cluster_state_changed():
+        return
+    with _online_model_lock:
+        stamp = shared_state.stamp(CLUSTER_STATE)
+        if stamp == _state_stamp:
+            return
+        # Set first: reading the registry below refreshes again, which must find nothing new
+        _state_stamp = stamp
+        try:
+            state = shared_state.read_pickle(CLUSTER_STATE)
+            if state is None or state['base_version'] != artifact_version(MODEL_DIR):
+                return
+            current = registry.get("cluster")
+            artifacts = state['artifacts']
+            if artifacts is None and current.version != state['base_version']:
+                artifacts = load_cluster_artifacts(MODEL_DIR)
+            _online_model = state['online']
+            if artifacts is not None and artifacts.version != current.version:
+                swap_cluster_artifacts(artifacts)
+        except Exception as e:
+            print(f"⚠️ Shared cluster state not loaded, serving {registry.version('cluster')}: {e}")
+
+def swap_cluster_artifacts(artifacts):
+    """Serve new artifacts; requests already running keep the ones they started with."""
+    registry.swap("cluster", artifacts, artifacts.version)
+    reindex_areas(artifacts)
+
+def predict_cluster(input_data):
+    try:
+        with span("cluster.features"):
+            X = feature_matrix(*(input_data[col] for col in RAW_FEATURES))
+            if not valid_rows(X)[0]:
+                raise ValueError("Area attributes must be finite numbers")
+            priority = X[0, FEATURES.index('Priority_Score')]
+
+        with span("cluster.model_lookup"):
+            artifacts = get_cluster_artifacts()
+            cluster_summary = artifacts.cluster_summary
+
+        with span("cluster.assign"):
+            cluster = artifacts.assigner.predict(X)[0]
+
+        with span("cluster.rules"):
+            cluster_profile = cluster_summary[cluster_summary['KMeans_Cluster'] == cluster].iloc[0]
+
+            cluster_type, risk_level, recommendations = analyze_cluster(cluster, cluster_profile, input_data)
 
         return {
             'cluster_id': int(cluster),
@@ -88,7 +631,7 @@ def predict_cluster(input_data):
                 'income': input_data['Income'],
                 'travel_time': input_data['Travel Time'],
                 'literacy_rate': input_data['Literacy Rate'],
-                'priority_score': round(input_df['Priority_Score'].iloc[0], 1)
+                'priority_score': round(float(priority), 1)
             },
             'cluster_characteristics': {
                 'avg_zero_dose': round(cluster_profile['Zero-dose Count'], 1),
@@ -99,7 +642,7 @@ def predict_cluster(input_data):
                 'similar_areas': cluster_profile['City Name']
             },
             'recommendations': recommendations,
-            'intervention_priority': get_intervention_priority(cluster, input_data)
+            'intervention_priority': str(intervention_priority_rules(priority))
         }
     except Exception as e:
         return {
@@ -132,6 +675,32 @@ def analyze_cluster(cluster, cluster_profile, input_data):
     recommendations = generate_recommendations(cluster_type, risk_level, input_data)
     return cluster_type, risk_level, recommendations
 
+def classify_cluster_profiles(cluster_summary):
+    """Vectorized analyze_cluster rules: cluster type and risk level for every cluster profile."""
+    avg_zero_dose = cluster_summary['Zero-dose Count'].to_numpy()
+    avg_income = cluster_summary['Income'].to_numpy()
+    avg_travel_time = cluster_summary['Travel Time'].to_numpy()
+    avg_literacy = cluster_summary['Literacy Rate'].to_numpy()
+
+    conditions = [
+        (avg_zero_dose > 150) & (avg_income < 50000),
+        (avg_zero_dose > 100) & (avg_travel_time > 60),
+        (avg_literacy < 70) & (avg_zero_dose > 80),
+        (avg_zero_dose < 50) & (avg_income > 80000),
+    ]
+    cluster_type = np.select(conditions, [
+        "High-Risk Zero-Dose Cluster",
+        "Accessibility-Challenged Cluster",
+        "Low-Literacy High-Dropout Cluster",
+        "Low-Risk Well-Served Cluster",
+    ], default="Moderate-Risk Cluster")
+    risk_level = np.select(conditions, ["Critical", "High", "High", "Low"], default="Medium")
+
+    return pd.DataFrame({
+        'cluster_type': cluster_type,
+        'risk_level': risk_level
+    }, index=cluster_summary['KMeans_Cluster'].astype(int).to_numpy())
+
 def generate_recommendations(cluster_type, risk_level, input_data):
     recommendations = []
 
@@ -179,16 +748,186 @@ def generate_recommendations(cluster_type, risk_level, input_data):
     return recommendations
 
 def get_intervention_priority(cluster, input_data):
-    priority_score = (
-        input_data['Zero-dose Count'] * 0.4 +
-        input_data['Travel Time'] * 0.3 +
-        (100 - input_data['Literacy Rate']) * 0.3
+    score = priority_score(
+        input_data['Zero-dose Count'],
+        input_data['Travel Time'],
+        input_data['Literacy Rate']
     )
-    if priority_score > 80:
-        return "Immediate"
-    elif priority_score > 60:
-        return "High"
-    elif priority_score > 40:
-        return "Medium"
-    else:
-        return "Low"
+    return str(intervention_priority_rules(score))
+
+def intervention_priority_rules(priority_score):
+    """Intervention priority level for a priority score or an array of scores."""
+    priority_score = np.asarray(priority_score)
+    return np.select(
+        [priority_score > 80, priority_score > 60, priority_score > 40],
+        ["Immediate", "High", "Medium"],
+        default="Low"
+    )
+
+def prepare_batch_frame(areas):
+    """Normalize a batch of areas to the area table columns and numeric dtypes."""
+    areas = areas.rename(columns=INPUT_COLUMNS)
+    missing = [col for col in INPUT_COLUMNS.values() if col not in areas.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    areas = areas[list(INPUT_COLUMNS.values())].copy()
+    for col in RAW_FEATURES:
+        areas[col] = pd.to_numeric(areas[col], errors='raise')
+    for col in ('Area ID', 'City Name', 'District Name'):
+        areas[col] = areas[col].astype(str)
+    return areas.reset_index(drop=True)
+
+def predict_cluster_batch(areas, artifacts=None):
+    """
+    Classify a frame of areas (area table columns) in one pass: a single
+    feature matrix, a single nearest-centroid assignment, and rule lookups
+    per cluster instead of per row. Rows with missing attributes are left
+    out of the result.
+    """
+    artifacts = artifacts or get_cluster_artifacts()
+    observe_batch("cluster.predict_batch", len(areas))
+
+    X = frame_feature_matrix(areas)
+    valid = valid_rows(X)
+    if not valid.all():
+        areas, X = areas[valid], X[valid]
+    clusters = artifacts.assigner.predict(X)
+    profiles = classify_cluster_profiles(artifacts.cluster_summary)
+    priority = X[:, FEATURES.index('Priority_Score')]
+
+    return pd.DataFrame({
+        'area_id': areas['Area ID'].to_numpy(),
+        'city_name': areas['City Name'].to_numpy(),
+        'district_name': areas['District Name'].to_numpy(),
+        'latitude': areas['Latitude'].to_numpy(),
+        'longitude': areas['Longitude'].to_numpy(),
+        'cluster_id': clusters.astype(int),
+        'cluster_type': profiles['cluster_type'].reindex(clusters).to_numpy(),
+        'risk_level': profiles['risk_level'].reindex(clusters).to_numpy(),
+        'priority_score': np.round(priority, 1),
+        'intervention_priority': intervention_priority_rules(priority)
+    })
+
+def stream_batch_predictions(areas, format="ndjson", chunk_size=BATCH_CHUNK_SIZE, columns=None):
+    header_written = False
+    for start in range(0, len(areas), chunk_size):
+        chunk = areas.iloc[start:start + chunk_size]
+        try:
+            results = predict_cluster_batch(chunk)
+            scored = scored_rows(chunk, results)
+            index_classified_areas(index_records(scored, results))
+            prediction_logger.log("cluster", scored.rename(columns=FIELD_NAMES), results, registry.version("cluster"))
+            if columns:
+                results = results[columns]
+        except Exception as e:
+            yield format_stream_error(f'Prediction failed for rows {start}-{start + len(chunk) - 1}: {str(e)}', format)
+            continue
+
+        if format == "csv":
+            # The header goes with the first chunk that has rows, whichever chunk that is
+            if not results.empty or not header_written:
+                yield results.to_csv(index=False, header=not header_written)
+                header_written = True
+        elif not results.empty:
+            yield results.to_json(orient='records', lines=True, force_ascii=False).rstrip("\n") + "\n"
+
+        if len(results) < len(chunk):
+            skipped = chunk.loc[~np.isfinite(chunk[RAW_FEATURES].to_numpy(dtype=np.float64)).all(axis=1), 'Area ID']
+            yield format_stream_error(f"Skipped areas with missing or non-finite attributes: {', '.join(skipped)}", format)
+
+def format_stream_error(message, format):
+    if format == "csv":
+        return f"# {message}\n"
+    return json.dumps({'error': message, 'status': 'error'}) + "\n"
+
+def scored_rows(areas, results):
+    """The rows of a batch predict_cluster_batch classified, aligned with its results."""
+    if len(results) == len(areas):
+        return areas
+    return areas[np.isfinite(areas[RAW_FEATURES].to_numpy(dtype=np.float64)).all(axis=1)]
+
+def index_records(areas, results):
+    """Spatial index records: classified rows plus the raw attributes needed to re-classify them."""
+    attributes = {FIELD_NAMES[col]: areas[col].to_numpy() for col in RAW_FEATURES if FIELD_NAMES[col] not in results}
+    return results.assign(**attributes).to_dict('records')
+
+def classify_area_table(artifacts=None):
+    """Re-classify every area in the Maharashtra zero-dose area table."""
+    return predict_cluster_batch(prepare_batch_frame(AREAS.frame(list(INPUT_COLUMNS.values()))), artifacts)
+
+def load_job_input(records, parameters):
+    """Areas for a cluster job: posted ClusterInput records, or the whole area table."""
+    if records is None:
+        return AREAS.table(list(INPUT_COLUMNS.values()))
+    return pa.Table.from_pylist([ClusterInput(**record).model_dump() for record in records])
+
+def score_job_chunk(frame, artifacts):
+    """Classify one chunk of a cluster job in a job worker process, with the artifacts served when it started."""
+    return predict_cluster_batch(prepare_batch_frame(frame), artifacts)
+
+job_manager.register(JobKind("cluster", load_job_input, score_job_chunk,
+                             context=get_cluster_artifacts, version=lambda: registry.version("cluster")))
+
+_area_indexes = None
+_area_indexes_lock = threading.Lock()
+
+def get_area_indexes():
+    """
+    Spatial indexes over the classified area table: every area, and the
+    high-risk subset. Built on first use; missing area data starts empty.
+    """
+    global _area_indexes
+    # Outside the index lock, since picking up another worker's update re-indexes
+    sync_cluster_state()
+    if _area_indexes is None:
+        with _area_indexes_lock:
+            if _area_indexes is None:
+                areas = prepare_batch_frame(AREAS.frame(list(INPUT_COLUMNS.values()))) if AREAS.available() else None
+                # A swap from here on waits for the lock and re-indexes what is built now
+                _area_indexes = build_area_indexes(areas, registry.get("cluster"))
+    return _area_indexes
+
+def build_area_indexes(areas, artifacts=None):
+    """Classify a prepared area frame and index it: every area, and the high-risk subset."""
+    area_index, high_risk_index = AreaIndex(), AreaIndex()
+    if areas is not None and len(areas):
+        results = predict_cluster_batch(areas, artifacts)
+        records = index_records(scored_rows(areas, results), results)
+        area_index.build(records)
+        high_risk_index.build([area for area in records if is_high_risk(area)])
+    return area_index, high_risk_index
+
+def reindex_areas(artifacts):
+    """
+    Re-classify every indexed area with newly swapped artifacts, so
+    /nearby and /nearest-high-risk never serve cluster ids of the old model.
+    """
+    global _area_indexes
+    with _area_indexes_lock:
+        if _area_indexes is None:
+            return
+        records = _area_indexes[0].records()
+        areas = prepare_batch_frame(pd.DataFrame(records)) if records else None
+        _area_indexes = build_area_indexes(areas, artifacts)
+
+def is_high_risk(area):
+    return (area['risk_level'] in HIGH_RISK_LEVELS or
+            area['intervention_priority'] in HIGH_PRIORITY_LEVELS)
+
+def is_indexed(record):
+    """Whether the spatial indexes already hold exactly this area record; never blocks."""
+    return _area_indexes is not None and _area_indexes[0].get(record['area_id']) == record
+
+def index_classified_areas(areas):
+    """Insert newly classified area records into the spatial indexes."""
+    get_area_indexes()
+    # Under the lock so an insert is not lost while reindex_areas replaces the indexes
+    with _area_indexes_lock:
+        area_index, high_risk_index = _area_indexes
+        area_index.insert(areas)
+        high_risk_index.insert([area for area in areas if is_high_risk(area)])
+        high_risk_index.remove([area['area_id'] for area in areas if not is_high_risk(area)])
+
+def format_area_matches(matches):
+    return [dict(match, distance_km=round(match['distance_km'], 3)) for match in matches]
\ No newline at end of file
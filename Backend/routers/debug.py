@@ -0,0 +1,56 @@
+import asyncio
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from services import profiling
+
+async def require_debug_token(x_debug_token: str = Header("")):
+    if not profiling.authorized(x_debug_token):
+        raise HTTPException(status_code=403, detail="A valid X-Debug-Token header is required")
+
+# Mounted at /debug by main.py only when DEBUG_TOKEN is set
+router = APIRouter(dependencies=[Depends(require_debug_token)])
+
+@router.get("/profile")
+async def profile(seconds: float = 5.0, interval_ms: float = 5.0, format: str = "collapsed",
+                  include_idle: bool = False, limit: int = 30):
+    """
+    Sample every thread of this worker for `seconds`. format=collapsed
+    returns one "thread;outer;...;inner count" line per stack, for
+    flamegraph.pl or speedscope; format=json returns the top functions by
+    self and total samples. Threads idling in a wait are left out unless
+    include_idle=true.
+    """
+    if not 0 < seconds <= profiling.MAX_PROFILE_SECONDS:
+        return {'error': f"seconds must be in (0, {profiling.MAX_PROFILE_SECONDS}]", 'status': 'error'}
+    if not 1 <= interval_ms <= 1000:
+        return {'error': "interval_ms must be between 1 and 1000", 'status': 'error'}
+    if format not in ("collapsed", "json"):
+        return {'error': f"Unsupported format: {format}. Use 'collapsed' or 'json'", 'status': 'error'}
+    try:
+        counts, rounds = await asyncio.to_thread(profiling.sample_stacks, seconds, interval_ms / 1000, include_idle)
+    except RuntimeError as e:
+        return {'error': str(e), 'status': 'error'}
+
+    if format == "collapsed":
+        return PlainTextResponse(profiling.collapsed(counts))
+    return {
+        'seconds': seconds,
+        'interval_ms': interval_ms,
+        'rounds': rounds,
+        'samples': sum(counts.values()),
+        'top': profiling.top_functions(counts, limit)
+    }
+
+@router.get("/memory")
+async def memory(limit: int = 20, trace_seconds: float = 0.0):
+    """
+    Resident memory by mapped package/file and by model, plus the top
+    Python allocations by line: live ones if the worker was started with
+    PYTHONTRACEMALLOC=1, otherwise those made in the next trace_seconds.
+    """
+    if not 0 <= trace_seconds <= profiling.MAX_PROFILE_SECONDS:
+        return {'error': f"trace_seconds must be in [0, {profiling.MAX_PROFILE_SECONDS}]", 'status': 'error'}
+    try:
+        return await asyncio.to_thread(profiling.memory_report, limit, trace_seconds)
+    except RuntimeError as e:
+        return {'error': str(e), 'status': 'error'}
@@ -0,0 +1,232 @@
+import asyncio
+import os
+import time
+from fastapi import APIRouter
+from typing import Any, Dict, List, Optional, Union
+from routers import cluster, dropout, forecasting
+from services.datasets import AREAS
+from services.executors import Overloaded
+from services.model_registry import registry
+from services.response_cache import response_cache
+from services.responses import ErrorResponse, SlimModel
+
+router = APIRouter()
+
+# Seconds each part of a report may take before it is returned without it
+REPORT_TIMEOUT = float(os.getenv("DISTRICT_REPORT_TIMEOUT", "10"))
+MAX_REPORT_TIMEOUT = 60.0
+TOP_PRIORITY_AREAS = 5
+
+# Work started for a report, by what it computes. A report that times out
+# only stops waiting: the work finishes in the background, and reports for
+# the same district that arrive meanwhile wait for it instead of queueing
+# it on the executor again.
+_inflight = {}
+
+def single_flight(key, start):
+    """The running task for key, or a new one from start()."""
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(start())
+        _inflight[key] = task
+        task.add_done_callback(lambda done: settle(key, done))
+    return task
+
+def settle(key, task):
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    # Mark retrieved: every report waiting on it may have timed out
+    if not task.cancelled():
+        task.exception()
+
+class VaccineForecast(SlimModel):
+    vaccine_type: str
+    prediction: Optional[int] = None
+    inputs: Optional[Dict[str, float]] = None
+    error: Optional[str] = None
+
+class ForecastSection(SlimModel):
+    status: str
+    seconds: float
+    error: Optional[str] = None
+    total_predicted_doses: Optional[int] = None
+    vaccines: Optional[List[VaccineForecast]] = None
+
+class DropoutSection(SlimModel):
+    status: str
+    seconds: float
+    error: Optional[str] = None
+    model_version: Optional[str] = None
+    totals: Optional[Dict[str, Any]] = None
+    by_distance_band: Optional[List[Dict[str, Any]]] = None
+
+class ClusterSection(SlimModel):
+    status: str
+    seconds: float
+    error: Optional[str] = None
+    model_version: Optional[str] = None
+    areas: Optional[int] = None
+    zero_dose_total: Optional[int] = None
+    by_cluster_type: Optional[Dict[str, int]] = None
+    by_risk_level: Optional[Dict[str, int]] = None
+    top_priority_areas: Optional[List[Dict[str, Any]]] = None
+
+class DistrictReport(SlimModel):
+    district: str
+    status: str
+    seconds: float
+    timeout_seconds: float
+    forecast: ForecastSection
+    dropout: DropoutSection
+    clusters: ClusterSection
+
+def area_districts():
+    return set(AREAS.frame(['District Name'])['District Name'].astype(str)) if AREAS.available() else set()
+
+def known_districts():
+    """Every district some model has data for: forecast histories, the area table and the dropout registry."""
+    with dropout.aggregates.locked(shared=True) as store:
+        registry_districts = {child[1] for child in store.children.values()}
+    return ({district for district, _ in forecasting.recent_data_dict} | area_districts() |
+            registry_districts | {dropout.REGISTRY_DISTRICT})
+
+def district_clusters(district):
+    """Cluster mix of a district's areas in the area table, classified in one batch."""
+    frame = AREAS.frame(list(cluster.INPUT_COLUMNS.values()))
+    frame = frame[frame['District Name'].astype(str) == district]
+    if frame.empty:
+        return {'status': 'unavailable', 'error': f"No areas of {district} in the area table"}
+    results = cluster.predict_cluster_batch(cluster.prepare_batch_frame(frame))
+    top = results.nlargest(TOP_PRIORITY_AREAS, 'priority_score')
+    return {
+        'status': 'success',
+        'model_version': registry.version("cluster"),
+        'areas': len(results),
+        'zero_dose_total': int(frame['Zero-dose Count'].sum()),
+        'by_cluster_type': {str(key): int(n) for key, n in results['cluster_type'].value_counts().items()},
+        'by_risk_level': {str(key): int(n) for key, n in results['risk_level'].value_counts().items()},
+        'top_priority_areas': top[['area_id', 'city_name', 'cluster_type', 'risk_level', 'priority_score',
+                                   'intervention_priority']].to_dict('records')
+    }
+
+def district_dropout(district):
+    """Registry-level dropout risk from the running aggregates, by distance band."""
+    result = dropout.run_aggregates(['distance_band'], {'district': district})
+    if 'error' in result:
+        return {'status': 'error', 'error': result['error']}
+    if not result['totals']['children']:
+        return {'status': 'unavailable', 'error': f"No registry children in {district}"}
+    return {
+        'status': 'success',
+        'model_version': result['model_version'],
+        'totals': result['totals'],
+        'by_distance_band': result['groups']
+    }
+
+def latest_input(key, temperature=None, rainfall=None, holiday_indicator=None):
+    """The /predict input for a model's most recent day, with any given conditions in place of that day's."""
+    last = forecasting.recent_data_dict[key].iloc[-1]
+    return forecasting.ForecastInput(
+        district=key[0],
+        vaccine_type=key[1],
+        temperature=float(last['Temperature']) if temperature is None else temperature,
+        rainfall=float(last['Rainfall']) if rainfall is None else rainfall,
+        stock_left=int(last['Stock Left']),
+        holiday_indicator=int(last['Holiday Indicator']) if holiday_indicator is None else holiday_indicator
+    )
+
+async def vaccine_forecast(input):
+    """One vaccine's /predict result, through the same cache and executor."""
+    name = forecasting.model_name((input.district, input.vaccine_type))
+    version = registry.version(name) if name in registry else None
+    return await response_cache.get_or_compute(
+        "forecast", version, input, lambda: forecasting.executor.run(forecasting.run_forecast, input)
+    )
+
+async def district_forecast(district, overrides, timeout):
+    """
+    Demand for every vaccine modelled in the district, on each model's most
+    recent day unless inputs are overridden. Vaccines run concurrently; those
+    not finished within timeout are reported as timed out.
+    """
+    inputs = [latest_input(key, **overrides) for key in sorted(forecasting.recent_data_dict)
+              if key[0] == district]
+    if not inputs:
+        return {'status': 'unavailable', 'error': f"No forecast models for {district}"}
+    tasks = [single_flight(("forecast", *input.model_dump().values()), lambda input=input: vaccine_forecast(input))
+             for input in inputs]
+    await asyncio.wait(tasks, timeout=timeout)
+
+    vaccines = []
+    for input, task in zip(inputs, tasks):
+        entry = {'vaccine_type': input.vaccine_type,
+                 'inputs': {name: getattr(input, name) for name in forecasting.INPUT_COLUMNS}}
+        if not task.done():
+            entry['error'] = f"No forecast within {timeout}s"
+        elif task.exception() is not None:
+            entry['error'] = str(task.exception())
+        elif 'error' in task.result():
+            entry['error'] = task.result()['error']
+        else:
+            entry['prediction'] = task.result()['prediction']
+        vaccines.append(entry)
+    predicted = [entry['prediction'] for entry in vaccines if 'prediction' in entry]
+    return {
+        'status': 'success' if len(predicted) == len(vaccines) else ('partial' if predicted else 'error'),
+        'total_predicted_doses': sum(predicted),
+        'vaccines': vaccines
+    }
+
+async def timed(section, timeout=None):
+    """
+    A report section with its duration; a timeout or failure becomes the
+    section's status. A section past its timeout is not cancelled.
+    """
+    started = time.perf_counter()
+    try:
+        result = await (asyncio.wait_for(asyncio.shield(section), timeout) if timeout else section)
+    except asyncio.TimeoutError:
+        result = {'status': 'timeout', 'error': f"No result within {timeout}s"}
+    except Overloaded as e:
+        result = {'status': 'overloaded', 'error': str(e)}
+    except Exception as e:
+        result = {'status': 'error', 'error': str(e)}
+    return {**result, 'seconds': round(time.perf_counter() - started, 4)}
+
+@router.get("/{name}/report", response_model=Union[DistrictReport, ErrorResponse], response_model_exclude_unset=True)
+async def district_report(name: str, temperature: Optional[float] = None, rainfall: Optional[float] = None,
+                          holiday_indicator: Optional[int] = None, timeout: Optional[float] = None):
+    """
+    Demand forecast for every vaccine, registry-level dropout risk and the
+    cluster mix of one district's areas in a single call. The three parts
+    run concurrently on their model executors, so the report takes as long
+    as the slowest one; a part that fails or takes longer than timeout
+    seconds is reported as such and the rest are still returned.
+    """
+    districts = {district.lower(): district for district in await asyncio.to_thread(known_districts)}
+    district = districts.get(name.strip().lower())
+    if district is None:
+        return {
+            'error': f"Unknown district: {name}",
+            'available_districts': sorted(districts.values()),
+            'status': 'error'
+        }
+    timeout = min(timeout or REPORT_TIMEOUT, MAX_REPORT_TIMEOUT)
+    overrides = {'temperature': temperature, 'rainfall': rainfall, 'holiday_indicator': holiday_indicator}
+
+    started = time.perf_counter()
+    forecast, dropout_risk, clusters = await asyncio.gather(
+        timed(district_forecast(district, overrides, timeout)),
+        timed(single_flight(("dropout", district), lambda: dropout.executor.run(district_dropout, district)), timeout),
+        timed(single_flight(("clusters", district), lambda: cluster.executor.run(district_clusters, district)), timeout)
+    )
+    sections = (forecast, dropout_risk, clusters)
+    return {
+        'district': district,
+        'status': 'complete' if all(section['status'] in ('success', 'unavailable') for section in sections) else 'partial',
+        'seconds': round(time.perf_counter() - started, 4),
+        'timeout_seconds': timeout,
+        'forecast': forecast,
+        'dropout': dropout_risk,
+        'clusters': clusters
+    }
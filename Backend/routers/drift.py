@@ -0,0 +1,95 @@
+import asyncio
+from fastapi import APIRouter
+from typing import Any, Dict, List, Optional, Union
+from services import drift
+from services.responses import ErrorResponse, SlimModel
+
+router = APIRouter()
+
+class FeatureDrift(SlimModel):
+    feature: str
+    kind: str
+    status: str
+    psi: Optional[float] = None
+    ks: Optional[float] = None
+    reference_mean: Optional[float] = None
+    live_mean: Optional[float] = None
+    bins: Optional[int] = None
+    reference_counts: Optional[Dict[str, int]] = None
+    live_counts: Optional[Dict[str, int]] = None
+    unseen: Optional[List[str]] = None
+
+class DriftReport(SlimModel):
+    model: str
+    status: str
+    reference_rows: int
+    live_rows: int
+    since: float
+    features: List[FeatureDrift]
+
+class DriftSummary(SlimModel):
+    models: List[Dict[str, Any]]
+    thresholds: Dict[str, Union[int, float]]
+
+def monitor_or_error(name):
+    if not drift.ENABLED:
+        return {'error': "Drift monitoring is disabled (DRIFT_MONITORING=0)", 'status': 'error'}
+    if name not in drift.MONITORS:
+        return {
+            'error': f"Unknown drift monitor: {name}",
+            'available_monitors': list(drift.MONITORS),
+            'status': 'error'
+        }
+    return drift.MONITORS[name]
+
+async def run_report(monitor):
+    try:
+        return await asyncio.to_thread(monitor.report)
+    except Exception as e:
+        return {'error': f"Drift report failed: {str(e)}", 'status': 'error'}
+
+@router.get("", response_model=Union[DriftSummary, ErrorResponse])
+async def drift_summary():
+    """Overall drift status per monitored endpoint and the features past the moderate PSI threshold."""
+    if not drift.ENABLED:
+        return monitor_or_error(None)
+    models = []
+    for monitor in drift.MONITORS.values():
+        report = await run_report(monitor)
+        if 'error' in report:
+            models.append({'model': monitor.name, 'status': 'error', 'error': report['error']})
+            continue
+        models.append({
+            'model': report['model'],
+            'status': report['status'],
+            'live_rows': report['live_rows'],
+            'since': report['since'],
+            'shifted_features': [feature['feature'] for feature in report['features']
+                                 if feature['status'] in ("moderate", "drift")]
+        })
+    return {
+        'models': models,
+        'thresholds': {'psi_moderate': drift.PSI_MODERATE, 'psi_drift': drift.PSI_DRIFT, 'min_samples': drift.MIN_SAMPLES}
+    }
+
+@router.get("/{name}", response_model=Union[DriftReport, ErrorResponse], response_model_exclude_unset=True)
+async def drift_report(name: str):
+    """
+    PSI per input feature (and the binned KS statistic for numeric ones) of
+    what every worker has served since the window started or was last
+    reset, against the model's training table in data/. Other workers'
+    requests are included as of their last publish (DRIFT_SHARE_SECONDS).
+    """
+    monitor = monitor_or_error(name)
+    if isinstance(monitor, dict):
+        return monitor
+    return await run_report(monitor)
+
+@router.post("/{name}/reset", response_model=Union[DriftReport, ErrorResponse], response_model_exclude_unset=True)
+async def drift_reset(name: str):
+    """Start a new live window for one monitor in every worker, e.g. after a deploy or a retrain."""
+    monitor = monitor_or_error(name)
+    if isinstance(monitor, dict):
+        return monitor
+    monitor.reset()
+    return await run_report(monitor)
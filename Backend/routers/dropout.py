@@ -5,16 +5,32 @@
 
 import pandas as pd
 import numpy as np
-import joblib
 import os
+import pickle
+import threading
+import pyarrow as pa
+from contextlib import contextmanager
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 from fastapi import APIRouter
 from pydantic import BaseModel
+from typing import Any, Dict, List, Optional, Union
+from services import drift, model_pack, shared_state
+from services.datasets import DROPOUT
+from services.executors import ModelExecutor, Overloaded
+from services.jobs import JobKind, job_manager
+from services.metrics import observe_batch, span
+from services.response_cache import response_cache
+from services.responses import ErrorResponse, NumpyJSONResponse, SlimModel, parse_fields, slim
+from services.model_registry import ModelSpec, registry
+from services.prediction_log import prediction_logger
 
 router = APIRouter()
 
+# data/dropout_prediction_satara.csv is the registry of a single district
+REGISTRY_DISTRICT = "Satara"
+
 class DropoutInput(BaseModel):
     gender: str
     age: int
@@ -25,6 +41,58 @@ class DropoutInput(BaseModel):
     distance_to_center: float
     delay_days: int
 
+# Inputs of /predict and /predict-batch, compared with the training table on /api/drift
+drift_monitor = drift.register(drift.DriftMonitor("dropout", DROPOUT, numeric={
+    'age': 'Age', 'travel_time': 'Travel Time', 'distance_to_center': 'Distance to Center', 'delay_days': 'Delay_Days'
+}, categorical={'gender': 'Gender', 'parent_education': 'Parent Education'}))
+
+class DropoutPrediction(SlimModel):
+    prediction_label: Optional[int] = None
+    prediction_text: Optional[str] = None
+    confidence: Optional[float] = None
+    probability_delayed: Optional[float] = None
+    probability_on_time: Optional[float] = None
+    risk_level: Optional[str] = None
+    input_data: Optional[Dict[str, Any]] = None
+
+class DropoutBatchResponse(SlimModel):
+    status: str
+    count: int
+    predictions: List[DropoutPrediction]
+
+class ModelInfoResponse(SlimModel):
+    status: str
+    model_info: Dict[str, Any]
+
+class ChildInput(DropoutInput):
+    district: str = REGISTRY_DISTRICT
+
+class ChildRecord(ChildInput):
+    child_id: str
+
+class ChildUpdate(SlimModel):
+    status: str
+    child_id: str
+    prediction: Optional[DropoutPrediction] = None
+    # The aggregate group the child now counts towards
+    group: Optional[Dict[str, str]] = None
+    removed: Optional[bool] = None
+
+class ChildrenUpdate(SlimModel):
+    status: str
+    count: int
+    total_children: int
+
+class AggregatesResponse(SlimModel):
+    status: str
+    model_version: Optional[str] = None
+    group_by: List[str]
+    filters: Dict[str, str]
+    # Per group: its dimension values, children, expected_delayed (sum of
+    # probability_delayed), mean_probability_delayed, predicted_delayed, high_risk
+    groups: List[Dict[str, Any]]
+    totals: Dict[str, Any]
+
 class VaccinationPredictor:
     def __init__(self, model_path=None):
         """
@@ -43,6 +111,8 @@ class VaccinationPredictor:
         self.label_encoders = None
         self.feature_columns = None
         self.metadata = None
+        # Training means of the features, used for missing values
+        self.fill_values = None
 
     def load_model(self):
         """Load the saved model and all preprocessing components"""
@@ -50,24 +120,26 @@ class VaccinationPredictor:
             print("Loading model components...")
             
             metadata_file = os.path.join(self.model_path, "model_metadata.pkl")
-            if os.path.exists(metadata_file):
-                self.metadata = joblib.load(metadata_file)
+            if model_pack.exists(metadata_file):
+                self.metadata = model_pack.load_pickle(metadata_file)
                 print(f"✅ Model: {self.metadata['best_model_name']}")
                 print(f"✅ Training Date: {self.metadata['training_date']}")
                 print(f"✅ Best Score: {self.metadata['best_score']:.4f}")
             
-            model_files = [f for f in os.listdir(self.model_path) 
+            model_files = [f for f in model_pack.listdir(self.model_path) 
                           if f.startswith('best_model_') and f.endswith('.pkl')]
             if not model_files:
                 raise FileNotFoundError("No saved model found in the specified path")
             
             model_file = os.path.join(self.model_path, model_files[0])
-            self.model = joblib.load(model_file)
+            self.model = model_pack.load_pickle(model_file)
             print(f"✅ Model loaded from: {model_file}")
             
-            self.scaler = joblib.load(os.path.join(self.model_path, "scaler.pkl"))
-            self.label_encoders = joblib.load(os.path.join(self.model_path, "label_encoders.pkl"))
-            self.feature_columns = joblib.load(os.path.join(self.model_path, "feature_columns.pkl"))
+            self.scaler = model_pack.load_pickle(os.path.join(self.model_path, "scaler.pkl"))
+            self.label_encoders = model_pack.load_pickle(os.path.join(self.model_path, "label_encoders.pkl"))
+            self.feature_columns = model_pack.load_pickle(os.path.join(self.model_path, "feature_columns.pkl"))
+            # Fixed statistics saved with the model, so a child's score never depends on the rest of its batch
+            self.fill_values = pd.Series(self.scaler.mean_, index=self.feature_columns)
             
             print("✅ All components loaded")
             return True
@@ -111,34 +183,48 @@ class VaccinationPredictor:
             df['Parent_Education_Encoded'] = df['Parent Education'].map(education_mapping)
         
         X = df[self.feature_columns]
-        X = X.fillna(X.mean())
+        X = X.fillna(self.fill_values)
         return X
 
     def predict(self, input_data, return_probabilities=False):
         if self.model is None:
             raise ValueError("Model not loaded. Please call load_model() first.")
         
-        X = self.prepare_input_data(input_data)
-        X_scaled = self.scaler.transform(X)
-        predictions = self.model.predict(X_scaled)
+        with span("dropout.prepare"):
+            X = self.prepare_input_data(input_data)
+        observe_batch("dropout.predict", len(X))
+        with span("dropout.scale"):
+            X_scaled = self.scaler.transform(X)
+        with span("dropout.inference"):
+            predictions = self.model.predict(X_scaled)
         
         if return_probabilities:
-            probabilities = self.model.predict_proba(X_scaled)
+            with span("dropout.probabilities"):
+                probabilities = self.model.predict_proba(X_scaled)
             return predictions, probabilities
         
         return predictions
 
     def predict_single(self, input_data):
         predictions, probabilities = self.predict(input_data, return_probabilities=True)
-        result = {
-            'prediction_label': int(predictions[0]),
-            'prediction_text': 'On Time' if predictions[0] == 1 else 'Delayed',
-            'confidence': float(max(probabilities[0]) * 100),
-            'probability_delayed': float(probabilities[0][0] * 100),
-            'probability_on_time': float(probabilities[0][1] * 100),
-            'risk_level': 'Low' if probabilities[0][1] > 0.7 else 'Medium' if probabilities[0][1] > 0.4 else 'High'
+        return self.format_prediction(predictions[0], probabilities[0])
+
+    def predict_many(self, input_data):
+        """predict_single for a list of children, scored in one pass."""
+        predictions, probabilities = self.predict(input_data, return_probabilities=True)
+        return [self.format_prediction(prediction, probability)
+                for prediction, probability in zip(predictions, probabilities)]
+
+    @staticmethod
+    def format_prediction(prediction, probabilities):
+        return {
+            'prediction_label': int(prediction),
+            'prediction_text': 'On Time' if prediction == 1 else 'Delayed',
+            'confidence': float(max(probabilities) * 100),
+            'probability_delayed': float(probabilities[0] * 100),
+            'probability_on_time': float(probabilities[1] * 100),
+            'risk_level': 'Low' if probabilities[1] > 0.7 else 'Medium' if probabilities[1] > 0.4 else 'High'
         }
-        return result
 
     def get_model_info(self):
         if self.metadata:
@@ -151,29 +237,309 @@ class VaccinationPredictor:
             }
         return None
 
-# Initialize predictor globally
-predictor = VaccinationPredictor()
+# Distance to the vaccination centre, in km: [0, 1), [1, 2), [2, 3), [3, 5), 5+
+DISTANCE_BAND_EDGES = [1, 2, 3, 5]
+DISTANCE_BANDS = ['<1 km', '1-2 km', '2-3 km', '3-5 km', '5+ km']
+class DropoutAggregates:
+    """
+    Running totals of dropout risk for every combination of DIMENSIONS,
+    kept up to date as children are added, re-scored or removed, so a
+    dashboard query costs O(groups) however large the registry grows.
+
+    The children are also kept under STATE_DIR, shared by every gunicorn
+    worker and across restarts: a snapshot taken at each rebuild, plus a
+    log of the changes since. Workers replay the log entries they have not
+    seen under locked(); once the log outgrows the snapshot, it is folded
+    into a new one.
+    """
+    DIMENSIONS = ('district', 'gender', 'parent_education', 'distance_band', 'dose1_month')
+    MIN_COMPACT_CHANGES = 10000
+
+    def __init__(self, name="dropout-children"):
+        self.version = None
+        # child_id -> (input record, district, group key, (p_delayed, delayed, high_risk))
+        self.children = {}
+        # group key -> [children, sum of p_delayed, predicted delayed, high risk]
+        self.groups = {}
+        self.lock = threading.RLock()
+        self.name = name
+        self.snapshot_path = shared_state.path(f"{name}.pkl")
+        self.log_path = shared_state.path(f"{name}.log")
+        self._snapshot_stamp = None
+        self._log_offset = 0
+        self._log_changes = 0
+
+    @staticmethod
+    def group_key(record, district):
+        distance_band = DISTANCE_BANDS[int(np.searchsorted(DISTANCE_BAND_EDGES, record['Distance to Center'], side='right'))]
+        return (district, record['Gender'], record['Parent Education'], distance_band, str(record['Dose1 Date'])[:7])
+
+    def _apply(self, key, contribution, sign):
+        totals = self.groups.setdefault(key, [0, 0.0, 0, 0])
+        totals[0] += sign
+        for i, value in enumerate(contribution, start=1):
+            totals[i] += sign * value
+        if totals[0] == 0:
+            # Drop empty groups, and the float residue of their sums
+            del self.groups[key]
+
+    @staticmethod
+    def contribution(prediction):
+        return (prediction['probability_delayed'] / 100, int(prediction['prediction_label'] == 0),
+                int(prediction['risk_level'] == 'High'))
+
+    def _upsert(self, child_id, record, district, contribution):
+        key = self.group_key(record, district)
+        self._remove(child_id)
+        self.children[child_id] = (record, district, key, contribution)
+        self._apply(key, contribution, 1)
+        return dict(zip(self.DIMENSIONS, key))
+
+    def _remove(self, child_id):
+        child = self.children.pop(child_id, None)
+        if child is not None:
+            self._apply(child[2], child[3], -1)
+        return child is not None
+
+    def _load(self, state):
+        self.children, self.groups = {}, {}
+        for child_id, (record, district, _, contribution) in state['children'].items():
+            self._upsert(child_id, record, district, contribution)
+        self.version = state['version']
+
+    def _replay(self, entry):
+        if entry[0] == "upsert":
+            for change in entry[1]:
+                self._upsert(*change)
+        else:
+            self._remove(entry[1])
+        self._log_changes += len(entry[1]) if entry[0] == "upsert" else 1
+
+    def _sync(self):
+        """Catch up with the snapshot and the log entries other workers wrote; needs the file lock."""
+        stamp = shared_state.stamp(self.snapshot_path)
+        if stamp != self._snapshot_stamp:
+            state = shared_state.read_pickle(self.snapshot_path)
+            self._snapshot_stamp, self._log_offset, self._log_changes = stamp, 0, 0
+            if state is not None:
+                self._load(state)
+        log = shared_state.stamp(self.log_path)
+        if stamp is None or log is None or log[2] <= self._log_offset:
+            return
+        with open(self.log_path, 'rb') as f:
+            f.seek(self._log_offset)
+            while f.tell() < log[2]:
+                self._replay(pickle.load(f))
+            self._log_offset = f.tell()
+
+    def _snapshot(self):
+        """Write every child as the new snapshot and start an empty log; needs the exclusive file lock."""
+        shared_state.write_pickle(self.snapshot_path, {'version': self.version, 'children': self.children})
+        with open(f"{self.log_path}.tmp", 'wb'):
+            pass
+        os.replace(f"{self.log_path}.tmp", self.log_path)
+        self._snapshot_stamp, self._log_offset, self._log_changes = shared_state.stamp(self.snapshot_path), 0, 0
+
+    def _append(self, entry):
+        """Log a change and apply it; needs the exclusive file lock."""
+        with open(self.log_path, 'ab') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            self._log_offset = f.tell()
+        self._replay(entry)
+        # Rewriting the snapshot costs O(children), so it waits until the log has about as many changes
+        if self._log_changes > max(self.MIN_COMPACT_CHANGES, len(self.children)):
+            self._snapshot()
+
+    @contextmanager
+    def locked(self, shared=False):
+        """Hold the store across workers and threads, caught up with every worker's changes."""
+        with shared_state.locked(self.name, shared), self.lock:
+            self._sync()
+            if not shared and self._snapshot_stamp is None and self.version is not None:
+                # The shared copy is gone (e.g. STATE_DIR was cleared): start it again from this worker's
+                self._snapshot()
+            yield self
+
+    def upsert_many(self, changes):
+        """
+        Add children, or replace existing children's contributions with their
+        new scores, from [(child_id, record, district, prediction)]; needs
+        locked(). Returns each child's group.
+        """
+        changes = [(child_id, record, district, self.contribution(prediction))
+                   for child_id, record, district, prediction in changes]
+        self._append(("upsert", changes))
+        return [dict(zip(self.DIMENSIONS, self.children[child_id][2])) for child_id, *_ in changes]
+
+    def remove(self, child_id):
+        """Remove a child; needs locked(). False if it is unknown."""
+        if child_id not in self.children:
+            return False
+        self._append(("remove", child_id))
+        return True
+
+    def rebuild(self, children, predictions, version):
+        """
+        Replace every total with children {child_id: (record, district)} and
+        their predictions; needs locked().
+        """
+        self.children, self.groups = {}, {}
+        for (child_id, (record, district)), prediction in zip(children.items(), predictions):
+            self._upsert(child_id, record, district, self.contribution(prediction))
+        self.version = version
+        self._snapshot()
+
+    def query(self, group_by=(), filters=None):
+        """Totals rolled up to the group_by dimensions, over groups matching every filter."""
+        filters = {self.DIMENSIONS.index(name): value for name, value in (filters or {}).items()}
+        positions = [self.DIMENSIONS.index(name) for name in group_by]
+        rolled = {}
+        with self.lock:
+            for key, totals in self.groups.items():
+                if all(key[i] == value for i, value in filters.items()):
+                    out = rolled.setdefault(tuple(key[i] for i in positions), [0, 0.0, 0, 0])
+                    for i, value in enumerate(totals):
+                        out[i] += value
+        return [{
+            **dict(zip(group_by, key)),
+            'children': children,
+            'expected_delayed': round(expected, 4),
+            'mean_probability_delayed': round(100 * expected / children, 4),
+            'predicted_delayed': delayed,
+            'high_risk': high_risk
+        } for key, (children, expected, delayed, high_risk) in sorted(rolled.items())]
+
+# Synthetic child used to warm up the predictor at startup
+WARMUP_INPUT = {
+    'Gender': 'M',
+    'Age': 1,
+    'Travel Time': 15,
+    'Parent Education': 'Secondary',
+    'Dose1 Date': '2024-01-05',
+    'Dose2 Date': '2024-02-04',
+    'Distance to Center': 2.5,
+    'Delay_Days': 30
+}
+
+def load_predictor():
+    predictor = VaccinationPredictor()
+    if not predictor.load_model():
+        raise RuntimeError("Failed to load prediction model. Please check model files.")
+    return predictor
+
+def predictor_files():
+    model_path = VaccinationPredictor().model_path
+    return [os.path.join(model_path, f) for f in model_pack.listdir(model_path) if f.endswith('.pkl')]
+
+registry.register(ModelSpec(
+    "dropout", "dropout",
+    loader=load_predictor,
+    files=predictor_files(),
+    warmup=lambda predictor: predictor.predict_single(WARMUP_INPUT)
+))
+
+def get_predictor():
+    """The loaded VaccinationPredictor shared through the model registry."""
+    return registry.get("dropout")
+
+def score_batch(records):
+    """Score a list of input dicts; also the entry point of batch worker processes."""
+    return get_predictor().predict_many(records)
 
-@router.post("/predict")
-def dropout_predict(input: DropoutInput):
+def load_batch_worker():
+    get_predictor()
+
+executor = ModelExecutor.from_env("dropout")
+# Set DROPOUT_BATCH_PROCESSES to score large batches in worker processes, so
+# pandas feature preparation does not hold the server's GIL; by default
+# batches share the dropout thread pool.
+DROPOUT_BATCH_PROCESSES = int(os.getenv("DROPOUT_BATCH_PROCESSES", "0"))
+batch_executor = ModelExecutor(
+    "dropout_batch", DROPOUT_BATCH_PROCESSES, int(os.getenv("DROPOUT_BATCH_QUEUE", "8")),
+    processes=True, initializer=load_batch_worker
+) if DROPOUT_BATCH_PROCESSES > 0 else executor
+
+def input_record(input):
+    return {
+        'Gender': input.gender,
+        'Age': input.age,
+        'Travel Time': input.travel_time,
+        'Parent Education': input.parent_education,
+        'Dose1 Date': input.dose1_date,
+        'Dose2 Date': input.dose2_date,
+        'Distance to Center': input.distance_to_center,
+        'Delay_Days': input.delay_days
+    }
+
+def load_job_input(records, parameters):
+    """Children for a dropout job: posted DropoutInput records, or the whole Satara registry."""
+    if records is None:
+        return DROPOUT.table()
+    return pa.Table.from_pylist([input_record(DropoutInput(**record)) for record in records])
+
+def score_job_chunk(frame, context=None):
+    """Score one chunk of a dropout job in a job worker process."""
+    predictions = pd.DataFrame(get_predictor().predict_many(frame.drop(columns='row').to_dict('records')))
+    ids = frame[['row', 'Child ID']].rename(columns={'Child ID': 'child_id'}) if 'Child ID' in frame else frame[['row']]
+    return pd.concat([ids.reset_index(drop=True), predictions], axis=1)
+
+job_manager.register(JobKind("dropout", load_job_input, score_job_chunk, version=lambda: registry.version("dropout")))
+
+@router.post("/predict", response_model=Union[DropoutPrediction, ErrorResponse], response_model_exclude_unset=True)
+async def dropout_predict(input: DropoutInput, fields: Optional[str] = None, compact: bool = False):
+    """fields= keeps only the listed keys; compact=true drops the echoed input_data."""
+    drift_monitor.observe(input)
+    version = registry.version("dropout")
+    result = await response_cache.get_or_compute(
+        "dropout", version, input, lambda: executor.run(run_dropout_prediction, input)
+    )
+    if 'error' not in result:
+        prediction_logger.log("dropout", input, result, version)
+    return slim(result, fields, compact)
+
+@router.post("/predict-batch", response_model=Union[DropoutBatchResponse, ErrorResponse])
+async def dropout_predict_batch(inputs: List[DropoutInput], fields: Optional[str] = None):
+    """
+    Score many children in one call; large batches can run in worker
+    processes. fields= keeps only the listed keys of each prediction.
+    """
+    if not inputs:
+        return {'error': 'No children provided', 'status': 'error'}
+    records = [input_record(input) for input in inputs]
+    observe_batch("dropout.predict_batch", len(records))
+    for input in inputs:
+        drift_monitor.observe(input)
     try:
-        if predictor.model is None:
-            if not predictor.load_model():
-                return {
-                    "error": "Failed to load prediction model. Please check model files.",
-                    "status": "error"
-                }
-        
-        input_dict = {
-            'Gender': input.gender,
-            'Age': input.age,
-            'Travel Time': input.travel_time,
-            'Parent Education': input.parent_education,
-            'Dose1 Date': input.dose1_date,
-            'Dose2 Date': input.dose2_date,
-            'Distance to Center': input.distance_to_center,
-            'Delay_Days': input.delay_days
+        predictions = await batch_executor.run(score_batch, records)
+    except Overloaded:
+        raise
+    except Exception as e:
+        return {
+            "error": f"Prediction failed: {str(e)}",
+            "status": "error"
         }
+    prediction_logger.log("dropout", inputs, predictions, registry.version("dropout"))
+    keep = parse_fields(fields)
+    if keep:
+        predictions = [{key: value for key, value in prediction.items() if key in keep} for prediction in predictions]
+    # Serialized directly: validating every row against the model costs more than scoring it
+    return NumpyJSONResponse({
+        'status': 'success',
+        'count': len(predictions),
+        'predictions': predictions
+    })
+
+def run_dropout_prediction(input):
+    try:
+        try:
+            predictor = get_predictor()
+        except Exception:
+            return {
+                "error": "Failed to load prediction model. Please check model files.",
+                "status": "error"
+            }
+        
+        input_dict = input_record(input)
         
         result = predictor.predict_single(input_dict)
         result['input_data'] = input_dict
@@ -183,27 +549,149 @@ def dropout_predict(input: DropoutInput):
         return {
             "error": f"Prediction failed: {str(e)}",
             "status": "error",
-            "input_data": {
-                'Gender': input.gender,
-                'Age': input.age,
-                'Travel Time': input.travel_time,
-                'Parent Education': input.parent_education,
-                'Dose1 Date': input.dose1_date,
-                'Dose2 Date': input.dose2_date,
-                'Distance to Center': input.distance_to_center,
-                'Delay_Days': input.delay_days
-            }
+            "input_data": input_record(input)
         }
 
-@router.get("/model-info")
-def get_model_info():
+aggregates = DropoutAggregates()
+
+def registry_children():
+    """{child_id: (record, district)} for every child in the registry dataset."""
+    if not DROPOUT.available():
+        return {}
+    frame = DROPOUT.frame()
+    records = frame[list(WARMUP_INPUT)].to_dict('records')
+    return {child_id: (record, REGISTRY_DISTRICT) for child_id, record in zip(frame['Child ID'], records)}
+
+def current_aggregates():
+    """
+    The risk aggregates, caught up with every worker's changes: built from
+    the shared snapshot, or the registry dataset on first use, and with
+    every child re-scored when the served model version changes.
+    """
+    predictor = get_predictor()
+    version = registry.version("dropout")
+    with aggregates.locked(shared=True):
+        if aggregates.version == version:
+            return aggregates
+    with aggregates.locked():
+        if aggregates.version != version:
+            if aggregates.version is None:
+                children = registry_children()
+            else:
+                children = {child_id: child[:2] for child_id, child in aggregates.children.items()}
+            predictions = predictor.predict_many([record for record, _ in children.values()]) if children else []
+            aggregates.rebuild(children, predictions, version)
+    return aggregates
+
+def upsert_children(children):
+    """
+    Score [(child_id, ChildInput)] in one pass and fold them into the
+    aggregates. Scoring runs outside the store's locks, so queries and
+    other updates are not held up by it; a batch scored while the model
+    was being swapped is scored again.
+    """
+    records = [input_record(child) for _, child in children]
+    while True:
+        version = current_aggregates().version
+        predictions = get_predictor().predict_many(records)
+        with aggregates.locked() as store:
+            if store.version == version:
+                groups = store.upsert_many([(child_id, record, child.district, prediction)
+                                            for (child_id, child), record, prediction in zip(children, records, predictions)])
+                return predictions, groups
+
+def run_upsert_child(child_id, child):
+    try:
+        predictions, groups = upsert_children([(child_id, child)])
+    except Exception as e:
+        return {'error': f"Prediction failed: {str(e)}", 'status': 'error', 'child_id': child_id}
+    return {'status': 'success', 'child_id': child_id, 'prediction': predictions[0], 'group': groups[0]}
+
+def run_upsert_children(children):
+    try:
+        upsert_children([(child.child_id, child) for child in children])
+    except Exception as e:
+        return {'error': f"Prediction failed: {str(e)}", 'status': 'error'}
+    return {'status': 'success', 'count': len(children), 'total_children': len(aggregates.children)}
+
+def run_remove_child(child_id):
+    try:
+        current_aggregates()
+        with aggregates.locked() as store:
+            removed = store.remove(child_id)
+    except Exception as e:
+        return {'error': f"Failed to update aggregates: {str(e)}", 'status': 'error'}
+    if not removed:
+        return {'error': f"Unknown child: {child_id}", 'status': 'error'}
+    return {'status': 'success', 'child_id': child_id, 'removed': True}
+
+def run_aggregates(group_by, filters):
+    try:
+        store = current_aggregates()
+    except Exception as e:
+        return {'error': f"Failed to build aggregates: {str(e)}", 'status': 'error'}
+    totals = store.query((), filters)
+    return {
+        'status': 'success',
+        'model_version': store.version,
+        'group_by': group_by,
+        'filters': filters,
+        'groups': store.query(group_by, filters),
+        'totals': totals[0] if totals else {'children': 0, 'expected_delayed': 0.0, 'predicted_delayed': 0, 'high_risk': 0}
+    }
+
+@router.get("/aggregates", response_model=Union[AggregatesResponse, ErrorResponse])
+async def dropout_aggregates(group_by: Optional[str] = None, district: Optional[str] = None,
+                             gender: Optional[str] = None, parent_education: Optional[str] = None,
+                             distance_band: Optional[str] = None, dose1_month: Optional[str] = None):
+    """
+    Expected delayed children (sum of probability_delayed), predicted
+    delayed and high-risk counts per combination of the comma-separated
+    group_by dimensions (district, gender, parent_education, distance_band,
+    dose1_month), over children matching the given dimension values.
+    Served from running totals: the cost depends on the number of groups,
+    not on the number of children.
+    """
+    dimensions = [name.strip() for name in group_by.split(',') if name.strip()] if group_by else []
+    unknown = [name for name in dimensions if name not in DropoutAggregates.DIMENSIONS]
+    if unknown:
+        return {'error': f"Unknown dimensions: {', '.join(unknown)}",
+                'available_dimensions': list(DropoutAggregates.DIMENSIONS), 'status': 'error'}
+    filters = {name: value for name, value in (('district', district), ('gender', gender),
+               ('parent_education', parent_education), ('distance_band', distance_band),
+               ('dose1_month', dose1_month)) if value is not None}
+    return await executor.run(run_aggregates, list(dict.fromkeys(dimensions)), filters)
+
+@router.put("/children/{child_id}", response_model=Union[ChildUpdate, ErrorResponse], response_model_exclude_unset=True)
+async def upsert_child(child_id: str, child: ChildInput):
+    """Add a child to the registry, or re-score one whose details changed, and update the aggregates."""
+    return await executor.run(run_upsert_child, child_id, child)
+
+@router.post("/children", response_model=Union[ChildrenUpdate, ErrorResponse])
+async def upsert_children_batch(children: List[ChildRecord]):
+    """Add or re-score many children in one scoring pass."""
+    if not children:
+        return {'error': 'No children provided', 'status': 'error'}
+    return await executor.run(run_upsert_children, children)
+
+@router.delete("/children/{child_id}", response_model=Union[ChildUpdate, ErrorResponse], response_model_exclude_unset=True)
+async def remove_child(child_id: str):
+    """Remove a child from the registry and from the aggregates."""
+    return await executor.run(run_remove_child, child_id)
+
+@router.get("/model-info", response_model=Union[ModelInfoResponse, ErrorResponse])
+async def get_model_info():
+    return await executor.run(run_model_info)
+
+def run_model_info():
     try:
-        if predictor.model is None:
-            if not predictor.load_model():
-                return {
-                    "error": "Failed to load prediction model",
-                    "status": "error"
-                }
+        try:
+            predictor = get_predictor()
+        except Exception:
+            return {
+                "error": "Failed to load prediction model",
+                "status": "error"
+            }
         
         model_info = predictor.get_model_info()
         if model_info:
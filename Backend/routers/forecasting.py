@@ -1,13 +1,24 @@
 import pandas as pd
 import numpy as np
-import pickle
+import hashlib
+import itertools
 import os
+import pyarrow as pa
 from sklearn.preprocessing import MinMaxScaler
-from tensorflow.keras.models import load_model
-from io import StringIO
 import warnings
 from fastapi import APIRouter
 from pydantic import BaseModel
+from typing import Dict, List, Optional, Union
+from services.datasets import FORECAST
+from services import drift, model_pack
+from services.executors import ModelExecutor
+from services.forecast_onnx import BACKENDS, OnnxForecaster, backend_model_path
+from services.jobs import JobKind, job_manager
+from services.metrics import span
+from services.response_cache import response_cache
+from services.responses import ErrorResponse, SlimModel, slim
+from services.model_registry import ModelSpec, registry
+from services.prediction_log import prediction_logger
 warnings.filterwarnings('ignore')
 
 router = APIRouter()
@@ -21,55 +32,98 @@ NOTEBOOKS_DIR = os.path.join(os.path.dirname(BASE_DIR), 'notebooks')
 MODELS_DIR = os.path.join(NOTEBOOKS_DIR, 'vaccine_models')
 SCALERS_DIR = os.path.join(NOTEBOOKS_DIR, 'vaccine_scalers')
 
-# Hardcoded historical data
-HISTORICAL_DATA = """
-Date,District,Vaccine Type,Administered Doses,Temperature,Rainfall,Stock Left,Holiday Indicator
-2024-02-07,Mumbai,Polio,380,39.7,0.2,130,0
-2024-02-07,Nashik,Measles,260,35.5,0.1,0,0
-2024-02-08,Pune,BCG,310,37.2,0.0,0,0
-2024-02-08,Mumbai,Polio,385,39.9,0.0,120,0
-2024-02-08,Nashik,Measles,265,35.7,0.0,0,0
-2024-02-09,Pune,BCG,315,37.4,0.0,0,0
-2024-02-09,Mumbai,Polio,390,40.1,0.1,110,0
-2024-02-09,Nashik,Measles,270,35.9,0.0,0,0
-2024-02-10,Pune,BCG,320,37.6,0.1,0,1
-2024-02-10,Mumbai,Polio,395,40.3,0.0,100,1
-2024-02-10,Nashik,Measles,275,36.2,0.0,0,1
-2024-02-11,Pune,BCG,325,37.9,0.0,0,0
-2024-02-11,Mumbai,Polio,400,40.5,0.0,90,0
-2024-02-11,Nashik,Measles,280,36.4,0.0,0,0
-2024-02-12,Pune,BCG,330,38.0,0.1,0,0
-2024-02-12,Mumbai,Polio,405,40.8,0.0,80,0
-2024-02-12,Nashik,Measles,285,36.6,0.1,0,0
-2024-02-13,Pune,BCG,335,38.2,0.0,0,0
-2024-02-13,Mumbai,Polio,410,41.0,0.0,70,0
-2024-02-13,Nashik,Measles,290,36.9,0.0,0,0
-2024-02-14,Pune,BCG,340,38.5,0.0,0,0
-2024-02-14,Mumbai,Polio,415,41.2,0.1,60,0
-2024-02-14,Nashik,Measles,295,37.1,0.0,0,0
-"""
-
-# Load data into DataFrame
-df = pd.read_csv(StringIO(HISTORICAL_DATA))
-df['Date'] = pd.to_datetime(df['Date'])
+# Recent history per district-vaccine, read from the typed forecast dataset
+df = FORECAST.frame() if FORECAST.available() else pd.DataFrame(columns=FORECAST.schema.names)
+
+FEATURES = ['Administered Doses', 'Temperature', 'Rainfall', 'Stock Left', 'Holiday Indicator']
+WINDOW = 5
+
+def discover_forecast_models():
+    """
+    Find every {District}_{Vaccine}_model.keras in MODELS_DIR that has a
+    matching {District}_{Vaccine}_scaler.pkl in SCALERS_DIR.
+    """
+    model_paths, scaler_paths = {}, {}
+    for filename in model_pack.listdir(MODELS_DIR):
+        if not filename.endswith('_model.keras'):
+            continue
+        stem = filename[:-len('_model.keras')]
+        district, _, vaccine = stem.partition('_')
+        scaler_path = os.path.join(SCALERS_DIR, f"{stem}_scaler.pkl")
+        if vaccine and model_pack.exists(scaler_path):
+            model_paths[(district, vaccine)] = os.path.join(MODELS_DIR, filename)
+            scaler_paths[(district, vaccine)] = scaler_path
+    return model_paths, scaler_paths
 
 # Model paths using relative paths
-MODEL_PATHS = {
-    ('Mumbai', 'Polio'): os.path.join(MODELS_DIR, 'Mumbai_Polio_model.keras'),
-    ('Nashik', 'Measles'): os.path.join(MODELS_DIR, 'Nashik_Measles_model.keras'),
-    ('Pune', 'BCG'): os.path.join(MODELS_DIR, 'Pune_BCG_model.keras'),
-}
+MODEL_PATHS, SCALER_PATHS = discover_forecast_models()
 
-SCALER_PATHS = {
-    ('Mumbai', 'Polio'): os.path.join(SCALERS_DIR, 'Mumbai_Polio_scaler.pkl'),
-    ('Nashik', 'Measles'): os.path.join(SCALERS_DIR, 'Nashik_Measles_scaler.pkl'),
-    ('Pune', 'BCG'): os.path.join(SCALERS_DIR, 'Pune_BCG_scaler.pkl'),
-}
+# "keras" serves the .keras models with TensorFlow; "onnx" / "onnx-int8" serve
+# the files written by `python -m services.forecast_onnx` with onnxruntime
+FORECAST_BACKEND = os.getenv("FORECAST_BACKEND", "keras")
+if FORECAST_BACKEND not in BACKENDS:
+    raise ValueError(f"Unknown FORECAST_BACKEND {FORECAST_BACKEND!r}; use one of {', '.join(BACKENDS)}")
+
+def served_model_path(key):
+    return backend_model_path(MODEL_PATHS[key], FORECAST_BACKEND)
 
 # Create dictionary for recent data (last 5 records per district-vaccine)
 recent_data_dict = {}
-for (district, vaccine), group in df.groupby(['District', 'Vaccine Type']):
-    recent_data_dict[(district, vaccine)] = group.sort_values('Date').tail(5)
+for (district, vaccine), group in df.groupby(['District', 'Vaccine Type'], observed=True):
+    recent_data_dict[(district, vaccine)] = group.sort_values('Date', kind='stable').tail(WINDOW)
+
+def model_name(key):
+    return f"forecast:{key[0]}_{key[1]}"
+
+def load_forecast_model(key):
+    if FORECAST_BACKEND == "keras":
+        # TensorFlow is imported by the loader rather than at module import,
+        # so the import overlaps with the other artifacts loading at startup
+        model = model_pack.load_keras(MODEL_PATHS[key])
+    else:
+        model = OnnxForecaster(model_pack.file_source(served_model_path(key)))
+    scaler = model_pack.load_pickle(SCALER_PATHS[key])
+    return model, scaler
+
+def predict_window_demands(model, scaler, windows):
+    """
+    Scale (N, WINDOW, len(FEATURES)) windows, run the LSTM on all of them
+    at once and inverse-transform the demands, unrounded.
+    """
+    n = len(windows)
+    scaled_input = scaler.transform(windows.reshape(n * WINDOW, len(FEATURES)))
+    lstm_input = scaled_input.reshape(n, WINDOW, len(FEATURES))
+    scaled_predictions = model.predict(lstm_input, verbose=0, batch_size=256)
+
+    # Inverse transform
+    dummy = np.zeros((n, len(FEATURES)))
+    dummy[:, 0] = scaled_predictions[:, 0]
+    return scaler.inverse_transform(dummy)[:, 0]
+
+def predict_windows(model, scaler, windows):
+    """Whole-dose demands for (N, WINDOW, len(FEATURES)) windows, as /predict returns them."""
+    return np.maximum(0, predict_window_demands(model, scaler, windows).astype(int))
+
+def predict_from_window(model, scaler, input_data):
+    """Scale a (WINDOW, len(FEATURES)) window, run the LSTM and inverse-transform the demand."""
+    return int(predict_windows(model, scaler, input_data[np.newaxis])[0])
+
+def warm_forecast_model(key):
+    def warmup(bundle):
+        model, scaler = bundle
+        predict_from_window(model, scaler, recent_data_dict[key][FEATURES].values.copy())
+    return warmup
+
+for key in MODEL_PATHS:
+    registry.register(ModelSpec(
+        model_name(key), "forecast",
+        loader=lambda key=key: load_forecast_model(key),
+        files=[served_model_path(key), SCALER_PATHS[key]],
+        warmup=warm_forecast_model(key) if key in recent_data_dict else None,
+        # Neither TensorFlow's runtime nor ONNX Runtime's thread pools survive
+        # fork, so each worker loads its own LSTMs
+        fork_safe=False
+    ))
 
 class ForecastInput(BaseModel):
     district: str
@@ -79,11 +133,53 @@ class ForecastInput(BaseModel):
     stock_left: int
     holiday_indicator: int
 
-@router.post("/predict")
-def forecast_predict(input: ForecastInput):
+# Inputs of /predict, compared with the forecasting table on /api/drift
+drift_monitor = drift.register(drift.DriftMonitor("forecast", FORECAST, numeric={
+    'temperature': 'Temperature', 'rainfall': 'Rainfall', 'stock_left': 'Stock Left'
+}, categorical={'district': 'District', 'vaccine_type': 'Vaccine Type', 'holiday_indicator': 'Holiday Indicator'}))
+
+class ForecastSweep(BaseModel):
+    """Grid of inputs scored by a forecast job; districts and vaccine_types default to every model."""
+    districts: Optional[List[str]] = None
+    vaccine_types: Optional[List[str]] = None
+    temperatures: List[float]
+    rainfalls: List[float] = [0.0]
+    stock_left: List[int] = [0]
+    holiday_indicators: List[int] = [0]
+
+class ForecastParameters(SlimModel):
+    temperature: Optional[float] = None
+    rainfall: Optional[float] = None
+    stock_left: Optional[int] = None
+    holiday_indicator: Optional[int] = None
+
+class ForecastResponse(SlimModel):
+    model: Optional[str] = None
+    prediction: Optional[int] = None
+    district: Optional[str] = None
+    vaccine_type: Optional[str] = None
+    input_parameters: Optional[ForecastParameters] = None
+
+# TF inference releases the GIL, so forecasts run on their own thread pool
+executor = ModelExecutor.from_env("forecast")
+
+@router.post("/predict", response_model=Union[ForecastResponse, ErrorResponse], response_model_exclude_unset=True)
+async def forecast_predict(input: ForecastInput, fields: Optional[str] = None, compact: bool = False):
     """
-    Predict vaccine demand for a specific district and vaccine type
+    Predict vaccine demand for a specific district and vaccine type.
+    fields= keeps only the listed keys; compact=true drops the echoed input.
     """
+    drift_monitor.observe(input)
+    name = model_name((input.district, input.vaccine_type))
+    version = registry.version(name) if name in registry else None
+    result = await response_cache.get_or_compute(
+        "forecast", version, input, lambda: executor.run(run_forecast, input)
+    )
+    if 'error' not in result:
+        prediction_logger.log("forecast", input, result, version)
+    return slim(result, fields, compact)
+
+def run_forecast(input):
     # Check if the district-vaccine combination exists
     key = (input.district, input.vaccine_type)
     if key not in recent_data_dict:
@@ -95,50 +191,30 @@ def forecast_predict(input: ForecastInput):
         }
     
     try:
-        # Load model and scaler
-        model_path = MODEL_PATHS.get(key)
-        scaler_path = SCALER_PATHS.get(key)
-        
-        if not model_path or not scaler_path:
+        if model_name(key) not in registry:
             return {
                 "error": f"Model files not found for {input.district} - {input.vaccine_type}"
             }
         
-        # Check if files exist
-        if not os.path.exists(model_path) or not os.path.exists(scaler_path):
-            return {
-                "error": f"Model or scaler file does not exist for {input.district} - {input.vaccine_type}",
-                "model_path": model_path,
-                "scaler_path": scaler_path
-            }
+        with span("forecast.model_lookup"):
+            model, scaler = registry.get(model_name(key))
         
-        model = load_model(model_path)
-        with open(scaler_path, 'rb') as f:
-            scaler = pickle.load(f)
-        
-        # Get recent data for this combination
-        recent_data = recent_data_dict[key]
-        
-        # Prepare features
-        features = ['Administered Doses', 'Temperature', 'Rainfall', 'Stock Left', 'Holiday Indicator']
-        input_data = recent_data[features].values.copy()
-        
-        # Update last row with new inputs
-        input_data[-1, 1] = input.temperature
-        input_data[-1, 2] = input.rainfall
-        input_data[-1, 3] = input.stock_left
-        input_data[-1, 4] = input.holiday_indicator
+        with span("forecast.prepare"):
+            # Get recent data for this combination
+            recent_data = recent_data_dict[key]
+            
+            # Prepare features
+            input_data = recent_data[FEATURES].values.copy()
+            
+            # Update last row with new inputs
+            input_data[-1, 1] = input.temperature
+            input_data[-1, 2] = input.rainfall
+            input_data[-1, 3] = input.stock_left
+            input_data[-1, 4] = input.holiday_indicator
         
         # Scale and predict
-        scaled_input = scaler.transform(input_data)
-        lstm_input = scaled_input.reshape(1, 5, len(features))
-        scaled_prediction = model.predict(lstm_input, verbose=0)
-        
-        # Inverse transform
-        dummy = np.zeros((1, len(features)))
-        dummy[0, 0] = scaled_prediction[0, 0]
-        actual_prediction = scaler.inverse_transform(dummy)[0, 0]
-        prediction = max(0, int(actual_prediction))
+        with span("forecast.inference"):
+            prediction = predict_from_window(model, scaler, input_data)
         
         return {
             "model": "LSTM",
@@ -160,6 +236,253 @@ def forecast_predict(input: ForecastInput):
             "vaccine_type": input.vaccine_type
         }
 
+# Request input -> column of FEATURES it sets on the last day of the window
+INPUT_COLUMNS = {'temperature': 1, 'rainfall': 2, 'stock_left': 3, 'holiday_indicator': 4}
+# Differentiated by central differences; the holiday indicator is binary and gets its on/off effect instead
+CONTINUOUS_INPUTS = ['temperature', 'rainfall', 'stock_left']
+SENSITIVITY_UNITS = {
+    'temperature': "doses per °C",
+    'rainfall': "doses per unit of rainfall",
+    'stock_left': "doses per dose of stock left",
+    'holiday_indicator': "doses on a holiday minus doses on a normal day"
+}
+# Central difference step, as a fraction of each input's range in the model's scaler
+SENSITIVITY_STEP = 0.01
+MAX_SENSITIVITY_GRID = 10_000
+
+class SensitivityRequest(BaseModel):
+    """
+    Where to measure sensitivity; inputs left out default to each model's
+    most recent day. temperatures x rainfalls optionally adds a sweep.
+    """
+    districts: Optional[List[str]] = None
+    vaccine_types: Optional[List[str]] = None
+    temperature: Optional[float] = None
+    rainfall: Optional[float] = None
+    stock_left: Optional[int] = None
+    holiday_indicator: Optional[int] = None
+    temperatures: Optional[List[float]] = None
+    rainfalls: Optional[List[float]] = None
+
+class SensitivityGrid(SlimModel):
+    temperatures: List[float]
+    rainfalls: List[float]
+    # predictions[i][j] is the demand at temperatures[i] and rainfalls[j]
+    predictions: List[List[int]]
+
+class SensitivityResult(SlimModel):
+    district: str
+    vaccine_type: str
+    inputs: Optional[ForecastParameters] = None
+    prediction: Optional[int] = None
+    demand: Optional[float] = None
+    sensitivity: Optional[Dict[str, float]] = None
+    grid: Optional[SensitivityGrid] = None
+    error: Optional[str] = None
+
+class SensitivityResponse(SlimModel):
+    model: str
+    method: str
+    step_fraction: float
+    units: Dict[str, str]
+    model_calls: int
+    results: List[SensitivityResult]
+
+def sensitivity_windows(window, steps, temperatures, rainfalls):
+    """
+    Every window one model's sensitivity needs, stacked for a single LSTM
+    call: the base window, +step and -step on each continuous input,
+    holiday off and on, then the temperature x rainfall grid.
+    """
+    columns = [INPUT_COLUMNS[name] for name in CONTINUOUS_INPUTS]
+    grid = list(itertools.product(temperatures, rainfalls))
+    windows = np.repeat(window[np.newaxis], 1 + 2 * len(columns) + 2 + len(grid), axis=0)
+    for i, (column, step) in enumerate(zip(columns, steps)):
+        windows[1 + 2 * i, -1, column] += step
+        windows[2 + 2 * i, -1, column] -= step
+    holiday = 1 + 2 * len(columns)
+    windows[holiday:holiday + 2, -1, INPUT_COLUMNS['holiday_indicator']] = [0, 1]
+    if grid:
+        windows[holiday + 2:, -1, [INPUT_COLUMNS['temperature'], INPUT_COLUMNS['rainfall']]] = grid
+    return windows
+
+def model_sensitivity(key, request, temperatures, rainfalls):
+    """Demand, its sensitivity to each input and the optional grid for one model, from one LSTM call."""
+    model, scaler = registry.get(model_name(key))
+    window = recent_data_dict[key][FEATURES].to_numpy(dtype=np.float64)
+    for name, column in INPUT_COLUMNS.items():
+        if getattr(request, name) is not None:
+            window[-1, column] = getattr(request, name)
+    inputs = {name: window[-1, column].item() for name, column in INPUT_COLUMNS.items()}
+    temperatures = temperatures or ([inputs['temperature']] if rainfalls else [])
+    rainfalls = rainfalls or ([inputs['rainfall']] if temperatures else [])
+
+    steps = SENSITIVITY_STEP * scaler.data_range_[[INPUT_COLUMNS[name] for name in CONTINUOUS_INPUTS]]
+    demands = predict_window_demands(model, scaler, sensitivity_windows(window, steps, temperatures, rainfalls))
+    sensitivity = {
+        name: round(float((demands[1 + 2 * i] - demands[2 + 2 * i]) / (2 * step)), 4)
+        for i, (name, step) in enumerate(zip(CONTINUOUS_INPUTS, steps))
+    }
+    holiday = 1 + 2 * len(CONTINUOUS_INPUTS)
+    sensitivity['holiday_indicator'] = round(float(demands[holiday + 1] - demands[holiday]), 4)
+
+    result = {
+        'district': key[0],
+        'vaccine_type': key[1],
+        'inputs': {**inputs, 'stock_left': int(inputs['stock_left']), 'holiday_indicator': int(inputs['holiday_indicator'])},
+        'prediction': int(max(0, int(demands[0]))),
+        'demand': round(float(demands[0]), 4),
+        'sensitivity': sensitivity
+    }
+    if temperatures:
+        grid = np.maximum(0, demands[holiday + 2:].astype(int)).reshape(len(temperatures), len(rainfalls))
+        result['grid'] = {'temperatures': temperatures, 'rainfalls': rainfalls, 'predictions': grid.tolist()}
+    return result
+
+def run_sensitivity(request):
+    keys = [key for key in recent_data_dict
+            if (not request.districts or key[0] in request.districts) and
+            (not request.vaccine_types or key[1] in request.vaccine_types)]
+    if not keys:
+        return {
+            'error': "No forecast models match the requested districts and vaccine types",
+            'available_combinations': [f"{district} - {vaccine}" for district, vaccine in recent_data_dict],
+            'status': 'error'
+        }
+    grid_size = len(request.temperatures or [None]) * len(request.rainfalls or [None])
+    if grid_size > MAX_SENSITIVITY_GRID:
+        return {'error': f"Grid has {grid_size} points; the limit is {MAX_SENSITIVITY_GRID}", 'status': 'error'}
+
+    results = []
+    for key in keys:
+        if model_name(key) not in registry:
+            results.append({'district': key[0], 'vaccine_type': key[1],
+                            'error': f"Model files not found for {key[0]} - {key[1]}"})
+            continue
+        try:
+            with span("forecast.sensitivity"):
+                results.append(model_sensitivity(key, request, request.temperatures, request.rainfalls))
+        except Exception as e:
+            results.append({'district': key[0], 'vaccine_type': key[1], 'error': f"Sensitivity failed: {str(e)}"})
+    return {
+        'model': "LSTM",
+        'method': "central finite differences, one batched LSTM call per model",
+        'step_fraction': SENSITIVITY_STEP,
+        'units': SENSITIVITY_UNITS,
+        'model_calls': sum('error' not in result for result in results),
+        'results': results
+    }
+
+@router.post("/sensitivity", response_model=Union[SensitivityResponse, ErrorResponse], response_model_exclude_unset=True)
+async def forecast_sensitivity(request: SensitivityRequest):
+    """
+    How much each model's demand moves per unit of temperature, rainfall
+    and stock left, and on a holiday, at the given inputs; with
+    temperatures and/or rainfalls, also the demand over that grid.
+    """
+    return await executor.run(run_sensitivity, request)
+
+SWEEP_INPUTS = ['temperature', 'rainfall', 'stock_left', 'holiday_indicator']
+MAX_SWEEP_ROWS = 1_000_000
+
+def load_job_input(records, parameters):
+    """
+    Inputs for a forecast job: posted ForecastInput records, or every
+    combination of the ForecastSweep grid in parameters.
+    """
+    if records is not None:
+        return pa.Table.from_pylist([ForecastInput(**record).model_dump() for record in records])
+
+    sweep = ForecastSweep(**parameters)
+    keys = [key for key in recent_data_dict
+            if (not sweep.districts or key[0] in sweep.districts) and
+            (not sweep.vaccine_types or key[1] in sweep.vaccine_types)]
+    if not keys:
+        raise ValueError("No forecast models match the requested districts and vaccine types")
+    grid = [sweep.temperatures, sweep.rainfalls, sweep.stock_left, sweep.holiday_indicators]
+    n_rows = len(keys) * int(np.prod([len(values) for values in grid]))
+    if n_rows > MAX_SWEEP_ROWS:
+        raise ValueError(f"Sweep has {n_rows} combinations; the limit is {MAX_SWEEP_ROWS}")
+
+    rows = [(district, vaccine, *values) for (district, vaccine), *values in itertools.product(keys, *grid)]
+    return pa.Table.from_pylist([dict(zip(['district', 'vaccine_type', *SWEEP_INPUTS], row)) for row in rows])
+
+def served_forecast_keys():
+    return [key for key in sorted(MODEL_PATHS) if model_name(key) in registry]
+
+def forecast_job_version():
+    """One version over every served forecast model, recorded on forecast jobs."""
+    digest = hashlib.sha1()
+    for key in served_forecast_keys():
+        registry.get(model_name(key))
+        digest.update(f"{model_name(key)}={registry.version(model_name(key))}".encode())
+    return digest.hexdigest()[:12]
+
+def portable_model(model):
+    """A picklable copy of a served forecast model: Keras config and weights, or ONNX bytes."""
+    if isinstance(model, OnnxForecaster):
+        if isinstance(model.source, str):
+            with open(model.source, 'rb') as f:
+                return "onnx", f.read()
+        return "onnx", bytes(model.source)
+    return "keras", model.to_json(), model.get_weights()
+
+def load_portable_model(portable):
+    if portable[0] == "onnx":
+        return OnnxForecaster(portable[1])
+    import keras
+
+    model = keras.models.model_from_json(portable[1])
+    model.set_weights(portable[2])
+    return model
+
+def forecast_job_context():
+    """
+    {key: (version, portable model, scaler)} of the models served when a
+    forecast job starts, so every chunk uses them even if they are reloaded
+    while it runs.
+    """
+    context = {}
+    for key in served_forecast_keys():
+        model, scaler = registry.get(model_name(key))
+        context[key] = (registry.version(model_name(key)), portable_model(model), scaler)
+    return context
+
+# (key, version) -> (model, scaler) built from a job context, per job worker process
+_job_models = {}
+
+def job_model(key, version, portable, scaler):
+    if (key, version) not in _job_models:
+        for cached in [cached for cached in _job_models if cached[0] == key]:
+            del _job_models[cached]
+        _job_models[(key, version)] = load_portable_model(portable), scaler
+    return _job_models[(key, version)]
+
+def score_job_chunk(frame, models):
+    """
+    Forecast one chunk of a job in a job worker process, with the models
+    served when it started: one batched LSTM call per district-vaccine
+    instead of one per row.
+    """
+    predictions = np.full(len(frame), -1, dtype=np.int64)
+    errors = np.full(len(frame), None, dtype=object)
+    for key, index in frame.groupby(['district', 'vaccine_type'], sort=False).indices.items():
+        if key not in recent_data_dict or key not in models:
+            errors[index] = f"No model available for {key[0]} - {key[1]}"
+            continue
+        model, scaler = job_model(key, *models[key])
+        windows = np.repeat(recent_data_dict[key][FEATURES].to_numpy(dtype=np.float64)[np.newaxis], len(index), axis=0)
+        windows[:, -1, 1:] = frame[SWEEP_INPUTS].to_numpy(dtype=np.float64)[index]
+        predictions[index] = predict_windows(model, scaler, windows)
+
+    result = frame[['row', 'district', 'vaccine_type', *SWEEP_INPUTS]].reset_index(drop=True)
+    result['prediction'] = pd.Series(predictions).where(predictions >= 0).astype("Int64")
+    result['error'] = errors
+    return result
+
+job_manager.register(JobKind("forecast", load_job_input, score_job_chunk,
+                             context=forecast_job_context, version=forecast_job_version))
+
 def predict_demand(input_dict):
     # Validate input
     required_keys = ['temperature', 'rainfall', 'stock_left', 'holiday']
@@ -180,21 +503,13 @@ def predict_demand(input_dict):
         key = f"{district}_{vaccine_type}"
         
         try:
-            # Load model and scaler
-            model_path = MODEL_PATHS.get((district, vaccine_type))
-            scaler_path = SCALER_PATHS.get((district, vaccine_type))
-            
-            # Check if files exist
-            if not os.path.exists(model_path) or not os.path.exists(scaler_path):
+            if model_name((district, vaccine_type)) not in registry:
                 prediction = "Model files not found"
             else:
-                model = load_model(model_path)
-                with open(scaler_path, 'rb') as f:
-                    scaler = pickle.load(f)
+                model, scaler = registry.get(model_name((district, vaccine_type)))
                 
                 # Prepare features
-                features = ['Administered Doses', 'Temperature', 'Rainfall', 'Stock Left', 'Holiday Indicator']
-                input_data = recent_data[features].values.copy()
+                input_data = recent_data[FEATURES].values.copy()
                 
                 # Update last row with new inputs
                 input_data[-1, 1] = temperature
@@ -203,15 +518,7 @@ def predict_demand(input_dict):
                 input_data[-1, 4] = holiday
                 
                 # Scale and predict
-                scaled_input = scaler.transform(input_data)
-                lstm_input = scaled_input.reshape(1, 5, len(features))
-                scaled_prediction = model.predict(lstm_input, verbose=0)
-                
-                # Inverse transform
-                dummy = np.zeros((1, len(features)))
-                dummy[0, 0] = scaled_prediction[0, 0]
-                actual_prediction = scaler.inverse_transform(dummy)[0, 0]
-                prediction = max(0, int(actual_prediction))
+                prediction = predict_from_window(model, scaler, input_data)
             
         except Exception as e:
             prediction = f"Model not available: {str(e)}"
@@ -0,0 +1,103 @@
+import asyncio
+import os
+from fastapi import APIRouter
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional, Union
+from services.jobs import DEFAULT_CHUNK_SIZE, job_manager, read_table
+from services.responses import ErrorResponse, SlimModel
+
+router = APIRouter()
+
+# Rows per streamed piece of a CSV/NDJSON result download
+RESULT_BATCH_ROWS = 10000
+
+class JobRequest(BaseModel):
+    kind: str
+    # Rows to score, as the kind's /predict input; omitted scores the kind's dataset in data/
+    records: Optional[List[Dict[str, Any]]] = None
+    # Forecast sweep grid (temperatures, rainfalls, stock_left, holiday_indicators, districts, vaccine_types)
+    parameters: Dict[str, Any] = {}
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+
+class Job(SlimModel):
+    id: str
+    kind: str
+    status: str
+    parameters: Dict[str, Any]
+    source: str
+    chunk_size: int
+    total_rows: int
+    total_chunks: int
+    completed_chunks: int
+    result_rows: int
+    resumed_chunks: int
+    progress: float
+    model_version: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    updated_at: float
+
+class JobList(SlimModel):
+    jobs: List[Job]
+
+@router.post("", response_model=Union[Job, ErrorResponse])
+async def submit_job(request: JobRequest):
+    """
+    Start a batch scoring job (dropout, cluster or forecast) and return
+    at once; poll GET /api/jobs/{id} for progress.
+    """
+    try:
+        job = await asyncio.to_thread(job_manager.submit, request.kind, request.records,
+                                      request.parameters, request.chunk_size)
+    except ValueError as e:
+        return {'error': str(e), 'status': 'error'}
+    return await job_manager.start(job['id'])
+
+@router.get("", response_model=JobList)
+async def list_jobs():
+    return {'jobs': job_manager.list()}
+
+@router.get("/{job_id}", response_model=Union[Job, ErrorResponse])
+async def get_job(job_id: str):
+    return job_manager.describe(job_id) or job_not_found(job_id)
+
+@router.post("/{job_id}/cancel", response_model=Union[Job, ErrorResponse])
+async def cancel_job(job_id: str):
+    """Stop a queued or running job; chunks already scored are kept on disk."""
+    if await job_manager.cancel(job_id) is None:
+        return job_not_found(job_id)
+    return job_manager.describe(job_id)
+
+@router.get("/{job_id}/result")
+async def job_result(job_id: str, format: str = "csv"):
+    """The results of a completed job as CSV, NDJSON or an Arrow IPC file."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return job_not_found(job_id)
+    if format not in ("csv", "ndjson", "arrow"):
+        return {'error': f"Unsupported format: {format}. Use 'csv', 'ndjson' or 'arrow'", 'status': 'error'}
+    path = job_manager.result_path(job_id)
+    if job['status'] != "completed" or not os.path.exists(path):
+        return {'error': f"Job {job_id} is {job['status']}; results are available once it completes",
+                'status': 'error', 'job_status': job['status']}
+
+    filename = f"{job['kind']}-{job_id}.{format}"
+    if format == "arrow":
+        return FileResponse(path, media_type="application/vnd.apache.arrow.file", filename=filename)
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(stream_result(path, format), media_type=media_type,
+                             headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+def stream_result(path, format):
+    for i, batch in enumerate(read_table(path).to_batches(max_chunksize=RESULT_BATCH_ROWS)):
+        frame = batch.to_pandas()
+        if format == "csv":
+            yield frame.to_csv(index=False, header=(i == 0))
+        elif not frame.empty:
+            yield frame.to_json(orient='records', lines=True, force_ascii=False).rstrip("\n") + "\n"
+
+def job_not_found(job_id):
+    return {'error': f"Unknown job: {job_id}", 'status': 'error'}
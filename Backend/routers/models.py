@@ -0,0 +1,28 @@
+import os
+from fastapi import APIRouter
+from services.executors import EXECUTORS
+from services.model_registry import registry
+from services.response_cache import response_cache
+
+router = APIRouter()
+
+@router.get("")
+async def models_status():
+    """Load status, version, timings and memory of every registered model, executor queues and the response cache."""
+    return {
+        **registry.status(),
+        'worker_pid': os.getpid(),
+        'executors': [executor.describe() for executor in EXECUTORS],
+        'response_cache': response_cache.describe()
+    }
+
+@router.get("/{name}")
+async def model_status(name: str):
+    for model in registry.status()['models']:
+        if model['name'] == name:
+            return model
+    return {
+        "error": f"Unknown model: {name}",
+        "available_models": registry.names(),
+        "status": "error"
+    }
@@ -0,0 +1,125 @@
+import heapq
+import time
+import numpy as np
+
+from services.geo_index import haversine_matrix_km
+
+# Rows of the candidate x area distance matrix computed at once, bounding memory
+DISTANCE_BLOCK_ROWS = 2048
+
+def coverage_sets(lats, lons, radius_km, block_rows=DISTANCE_BLOCK_ROWS):
+    """
+    For every candidate site (each area location), the indices of the areas
+    within radius_km, built from blocked vectorized haversine matrices.
+    """
+    covers = []
+    for start in range(0, len(lats), block_rows):
+        block = haversine_matrix_km(lats[start:start + block_rows], lons[start:start + block_rows], lats, lons)
+        rows, cols = np.nonzero(block <= radius_km)
+        splits = np.searchsorted(rows, np.arange(1, len(block)))
+        covers.extend(np.split(cols, splits))
+    return covers
+
+def lazy_greedy(covers, weights, k):
+    """
+    Greedy maximum weighted coverage with lazy gain evaluation: a site's
+    cached gain only ever shrinks, so it is recomputed only when it reaches
+    the top of the heap. Gives the usual (1 - 1/e) approximation.
+    """
+    covered = np.zeros(len(weights), dtype=bool)
+    heap = [(-float(weights[cover].sum()), site) for site, cover in enumerate(covers)]
+    heapq.heapify(heap)
+    chosen, gains = [], []
+    while heap and len(chosen) < k:
+        neg_gain, site = heapq.heappop(heap)
+        cover = covers[site]
+        gain = float(weights[cover[~covered[cover]]].sum())
+        if heap and gain < -heap[0][0] - 1e-9:
+            heapq.heappush(heap, (-gain, site))
+            continue
+        if gain <= 0:
+            break
+        chosen.append(site)
+        gains.append(gain)
+        covered[cover] = True
+    return chosen, gains
+
+def exact_placement(covers, weights, k, time_limit_seconds=10):
+    """
+    Maximum weighted coverage as a MIP solved with OR-Tools: choose k sites
+    x_j, mark area i covered (y_i) only if a chosen site covers it, maximize
+    sum(w_i * y_i). Returns the chosen sites and whether the solve is optimal.
+    """
+    from ortools.linear_solver import pywraplp
+
+    solver = pywraplp.Solver.CreateSolver("SCIP") or pywraplp.Solver.CreateSolver("CBC")
+    if solver is None:
+        raise RuntimeError("No OR-Tools MIP solver available")
+    solver.SetTimeLimit(int(time_limit_seconds * 1000))
+
+    sites = [solver.BoolVar(f"x{j}") for j in range(len(covers))]
+    covered_by = [[] for _ in range(len(weights))]
+    for j, cover in enumerate(covers):
+        for i in cover:
+            covered_by[i].append(sites[j])
+
+    objective = solver.Objective()
+    for i, weight in enumerate(weights):
+        if weight <= 0 or not covered_by[i]:
+            continue
+        y = solver.NumVar(0, 1, f"y{i}")
+        solver.Add(y <= solver.Sum(covered_by[i]))
+        objective.SetCoefficient(y, float(weight))
+    objective.SetMaximization()
+    solver.Add(solver.Sum(sites) <= k)
+
+    status = solver.Solve()
+    if status not in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE):
+        raise RuntimeError("OR-Tools found no feasible camp placement")
+    chosen = [j for j, x in enumerate(sites) if x.solution_value() > 0.5]
+    return chosen, status == pywraplp.Solver.OPTIMAL
+
+def by_contribution(sites, covers, weights):
+    """
+    Sites in greedy order of marginal contribution, like the greedy
+    placement's. lazy_greedy stops at the first site that adds nothing, so
+    the sites whose areas the others already cover follow, in their order.
+    """
+    order, _ = lazy_greedy([covers[j] for j in sites], weights, len(sites))
+    ordered = set(order)
+    return [sites[i] for i in order] + [site for i, site in enumerate(sites) if i not in ordered]
+
+def assign_coverage(chosen, covers, n_areas):
+    """Areas newly covered by each chosen site, in choice order (each area counted once)."""
+    covered = np.zeros(n_areas, dtype=bool)
+    assigned = []
+    for site in chosen:
+        cover = covers[site]
+        new = cover[~covered[cover]]
+        covered[new] = True
+        assigned.append(new)
+    return assigned
+
+def place_camps(lats, lons, weights, k, radius_km, method="greedy", time_limit_seconds=10):
+    """
+    Choose up to k camp sites among the area locations maximizing the
+    weighted coverage of areas within radius_km. Returns the chosen sites
+    (largest contribution first), the areas each one newly covers and
+    solver details.
+    """
+    started = time.perf_counter()
+    weights = np.asarray(weights, dtype=np.float64)
+    covers = coverage_sets(np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64), radius_km)
+
+    optimal = None
+    if method == "exact":
+        sites, optimal = exact_placement(covers, weights, k, time_limit_seconds)
+        chosen = by_contribution(sites, covers, weights)
+    else:
+        chosen, _ = lazy_greedy(covers, weights, k)
+
+    return chosen, assign_coverage(chosen, covers, len(weights)), {
+        'method': method,
+        'optimal': optimal,
+        'solve_seconds': round(time.perf_counter() - started, 3)
+    }
@@ -0,0 +1,67 @@
+import numpy as np
+
+# Raw area attributes, in the order the scaler was fitted on
+RAW_FEATURES = [
+    'Latitude', 'Longitude', 'Zero-dose Count', 'Income',
+    'Travel Time', 'Literacy Rate'
+]
+FEATURES = RAW_FEATURES + ['Dose_Density', 'Accessibility_Score', 'Priority_Score']
+
+# The training table (City_cluster.ipynb) has no zero or negative incomes or
+# travel times, so inputs are clipped into the domain the formulas were fitted
+# on before dividing: income to at least Rs 1000 (one unit of Income/1000),
+# travel time to at least one minute, counts to >= 0 and literacy to 0-100.
+INCOME_FLOOR = 1000
+TRAVEL_TIME_FLOOR = 1
+
+def clip_inputs(zero_dose_count, income, travel_time, literacy_rate):
+    return (
+        np.clip(np.asarray(zero_dose_count, dtype=np.float64), 0, None),
+        np.clip(np.asarray(income, dtype=np.float64), INCOME_FLOOR, None),
+        np.clip(np.asarray(travel_time, dtype=np.float64), TRAVEL_TIME_FLOOR, None),
+        np.clip(np.asarray(literacy_rate, dtype=np.float64), 0, 100)
+    )
+
+def priority_score(zero_dose_count, travel_time, literacy_rate):
+    """Intervention priority score; shared by the feature matrix and get_intervention_priority."""
+    zero_dose_count, _, travel_time, literacy_rate = clip_inputs(
+        zero_dose_count, INCOME_FLOOR, travel_time, literacy_rate
+    )
+    return zero_dose_count * 0.4 + travel_time * 0.3 + (100 - literacy_rate) * 0.3
+
+def feature_matrix(latitude, longitude, zero_dose_count, income, travel_time, literacy_rate):
+    """
+    Build the (n, 9) float64 matrix in FEATURES order from scalars or
+    arrays of raw attributes. Values are clipped with clip_inputs, so the
+    ratio features stay finite; missing (NaN) inputs stay NaN.
+    """
+    zero_dose_count, income, travel_time, literacy_rate = clip_inputs(
+        zero_dose_count, income, travel_time, literacy_rate
+    )
+    columns = [
+        np.asarray(latitude, dtype=np.float64),
+        np.asarray(longitude, dtype=np.float64),
+        zero_dose_count,
+        income,
+        travel_time,
+        literacy_rate,
+        zero_dose_count / (income / 1000),
+        literacy_rate / travel_time,
+        zero_dose_count * 0.4 + travel_time * 0.3 + (100 - literacy_rate) * 0.3
+    ]
+    return np.column_stack(np.broadcast_arrays(*columns)).reshape(-1, len(FEATURES))
+
+def frame_feature_matrix(df):
+    """feature_matrix over a frame with the area table columns."""
+    return feature_matrix(*(df[col].to_numpy(dtype=np.float64) for col in RAW_FEATURES))
+
+def add_engineered_features(df):
+    """Add the clipped Dose_Density, Accessibility_Score and Priority_Score columns to df."""
+    X = frame_feature_matrix(df)
+    for i, col in enumerate(FEATURES):
+        df[col] = X[:, i]
+    return df
+
+def valid_rows(X):
+    """Rows of a feature matrix that can be assigned (no missing values)."""
+    return np.isfinite(X).all(axis=1)
@@ -0,0 +1,108 @@
+import gzip
+import hashlib
+import json
+import threading
+import numpy as np
+
+RISK_ORDER = ['Low', 'Medium', 'High', 'Critical']
+PRIORITY_ORDER = ['Low', 'Medium', 'High', 'Immediate']
+
+def areas_geojson(results):
+    """One Point feature per classified area (output of predict_cluster_batch)."""
+    features = [
+        {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [round(lon, 5), round(lat, 5)]},
+            'properties': {
+                'area_id': area_id,
+                'city_name': city,
+                'district_name': district,
+                'cluster_id': cluster,
+                'risk_level': risk,
+                'priority_score': priority,
+                'intervention_priority': intervention
+            }
+        }
+        for area_id, city, district, lat, lon, cluster, risk, priority, intervention in zip(
+            results['area_id'], results['city_name'], results['district_name'],
+            results['latitude'].astype(float), results['longitude'].astype(float),
+            results['cluster_id'].astype(int).tolist(), results['risk_level'],
+            results['priority_score'].astype(float).tolist(), results['intervention_priority']
+        )
+    ]
+    return {'type': 'FeatureCollection', 'features': features}
+
+def grid_geojson(results, cell_deg):
+    """
+    Aggregate classified areas into cell_deg x cell_deg polygons with area
+    counts, the dominant cluster, the worst risk level and priority stats.
+    """
+    lat = results['latitude'].to_numpy(dtype=np.float64)
+    lon = results['longitude'].to_numpy(dtype=np.float64)
+    cells = results.assign(
+        cell_lat=np.floor(lat / cell_deg).astype(np.int64),
+        cell_lon=np.floor(lon / cell_deg).astype(np.int64),
+        risk_rank=results['risk_level'].map(RISK_ORDER.index),
+        urgent=results['intervention_priority'].isin(PRIORITY_ORDER[2:])
+    )
+    grouped = cells.groupby(['cell_lat', 'cell_lon'], sort=True)
+    stats = grouped.agg(
+        areas=('area_id', 'size'),
+        max_risk=('risk_rank', 'max'),
+        mean_priority=('priority_score', 'mean'),
+        max_priority=('priority_score', 'max'),
+        urgent_areas=('urgent', 'sum')
+    )
+    dominant = grouped['cluster_id'].agg(lambda clusters: clusters.value_counts().idxmax())
+
+    features = []
+    for (cell_lat, cell_lon), row in stats.iterrows():
+        south, west = cell_lat * cell_deg, cell_lon * cell_deg
+        north, east = south + cell_deg, west + cell_deg
+        features.append({
+            'type': 'Feature',
+            'geometry': {'type': 'Polygon', 'coordinates': [[
+                [round(west, 5), round(south, 5)], [round(east, 5), round(south, 5)],
+                [round(east, 5), round(north, 5)], [round(west, 5), round(north, 5)],
+                [round(west, 5), round(south, 5)]
+            ]]},
+            'properties': {
+                'areas': int(row['areas']),
+                'dominant_cluster_id': int(dominant[(cell_lat, cell_lon)]),
+                'risk_level': RISK_ORDER[int(row['max_risk'])],
+                'mean_priority_score': round(float(row['mean_priority']), 1),
+                'max_priority_score': round(float(row['max_priority']), 1),
+                'urgent_areas': int(row['urgent_areas'])
+            }
+        })
+    return {'type': 'FeatureCollection', 'features': features}
+
+class EncodedPayload:
+    """A JSON body serialized and gzipped once, with a strong ETag."""
+    def __init__(self, obj):
+        self.body = json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        self.gzipped = gzip.compress(self.body, compresslevel=6)
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest()[:20] + '"'
+
+class PayloadCache:
+    """
+    Encoded payloads keyed by (model version, view); a new model version
+    drops everything built for the previous one.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = (None, {})
+
+    def get(self, version, key, build):
+        cached_version, payloads = self._state
+        if cached_version == version and key in payloads:
+            return payloads[key]
+        with self._lock:
+            cached_version, payloads = self._state
+            if cached_version != version:
+                payloads = {}
+            if key not in payloads:
+                payloads = dict(payloads)
+                payloads[key] = EncodedPayload(build())
+                self._state = (version, payloads)
+            return payloads[key]
@@ -0,0 +1,263 @@
+import argparse
+import copy
+import hashlib
+import os
+import threading
+from collections import Counter
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.preprocessing import StandardScaler
+
+from services import model_pack
+from services.cluster_features import FEATURES, frame_feature_matrix, valid_rows
+from services.datasets import iter_frames, read_frame
+from services.model_registry import files_version
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(BACKEND_DIR, "notebooks", "cluster_model")
+AREA_DATA_PATH = os.path.join(BACKEND_DIR, "data", "zero_dose_clusters_maharashtra.csv")
+
+SCALER_FILE = "vaccination_scaler.pkl"
+MODEL_FILE = "vaccination_cluster_kmeans.pkl"
+SUMMARY_FILE = "cluster_summary.pkl"
+
+# Per-cluster averages kept in cluster_summary.pkl, as built by City_cluster.ipynb
+SUMMARY_COLUMNS = ['Zero-dose Count', 'Income', 'Travel Time', 'Literacy Rate', 'Priority_Score']
+# Most frequent cities listed per cluster in the summary, and city counts kept per cluster to rank them
+TOP_CITIES = 10
+CITY_CAPACITY = 256
+
+class NearestCentroidAssigner:
+    """
+    KMeans assignment with the StandardScaler folded into the centroids.
+
+    The centroids are mapped back to raw feature space and the per-feature
+    1/scale^2 weights are expanded into a linear score, so assigning 1 or N
+    raw feature rows is one matmul plus an argmin:
+        argmin_k ||(x - mean)/scale - c_k||^2 = argmin_k x @ coef[:, k] + intercept[k]
+    """
+    def __init__(self, scaler, model):
+        centers = np.asarray(model.cluster_centers_, dtype=np.float64)
+        n_features = centers.shape[1]
+        mean = scaler.mean_ if getattr(scaler, 'with_mean', True) and scaler.mean_ is not None else np.zeros(n_features)
+        scale = scaler.scale_ if getattr(scaler, 'with_std', True) and scaler.scale_ is not None else np.ones(n_features)
+
+        self.raw_centers = centers * scale + mean
+        weights = 1.0 / np.square(scale)
+        self.coef = np.ascontiguousarray(-2.0 * (self.raw_centers * weights).T)
+        self.intercept = (np.square(self.raw_centers) * weights).sum(axis=1)
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        return np.argmin(X @ self.coef + self.intercept, axis=1)
+
+class ClusterArtifacts:
+    """The scaler, KMeans model and cluster summary served together under one version."""
+    def __init__(self, scaler, model, cluster_summary, version):
+        self.scaler = scaler
+        self.model = model
+        self.cluster_summary = cluster_summary
+        self.version = version
+        self.assigner = NearestCentroidAssigner(scaler, model)
+
+def artifact_version(model_dir=MODEL_DIR):
+    """Short content hash of the artifact files, so any refit gets a new version."""
+    return files_version([os.path.join(model_dir, name) for name in (SCALER_FILE, MODEL_FILE, SUMMARY_FILE)])
+
+def load_cluster_artifacts(model_dir=MODEL_DIR):
+    """The artifacts in model_dir, from the model pack where it holds an unchanged copy."""
+    scaler = model_pack.load_pickle(os.path.join(model_dir, SCALER_FILE))
+    model = model_pack.load_pickle(os.path.join(model_dir, MODEL_FILE))
+    cluster_summary = model_pack.load_pickle(os.path.join(model_dir, SUMMARY_FILE))
+    return ClusterArtifacts(scaler, model, cluster_summary, artifact_version(model_dir))
+
+def save_cluster_artifacts(artifacts, model_dir=MODEL_DIR):
+    """Write the artifacts next to each other, replacing each file atomically."""
+    os.makedirs(model_dir, exist_ok=True)
+    for name, obj in ((SCALER_FILE, artifacts.scaler), (MODEL_FILE, artifacts.model),
+                      (SUMMARY_FILE, artifacts.cluster_summary)):
+        path = os.path.join(model_dir, name)
+        joblib.dump(obj, path + ".tmp")
+        os.replace(path + ".tmp", path)
+    artifacts.version = artifact_version(model_dir)
+    return artifacts
+
+def build_cluster_summary(sums, counts, cities):
+    """
+    cluster_summary frame from per-cluster sums of SUMMARY_COLUMNS, counts
+    and city counters; City Name lists the TOP_CITIES most frequent cities.
+    """
+    means = sums / np.maximum(counts, 1)[:, None]
+    summary = pd.DataFrame(means, columns=SUMMARY_COLUMNS)
+    summary.insert(0, 'KMeans_Cluster', np.arange(len(counts), dtype=np.int32))
+    summary['Areas'] = np.asarray(counts, dtype=np.int64)
+    summary['City Name'] = [', '.join(name for name, _ in names.most_common(TOP_CITIES)) for names in cities]
+    return summary
+
+def merge_cities(cities, new):
+    """Add city counts to a cluster's counter, keeping only the CITY_CAPACITY most frequent."""
+    cities.update(new)
+    if len(cities) > CITY_CAPACITY:
+        kept = cities.most_common(CITY_CAPACITY)
+        cities.clear()
+        cities.update(dict(kept))
+    return cities
+
+def summary_stats(areas, X, labels, n_clusters):
+    """Per-cluster sums, counts and city counters for a batch of assigned areas."""
+    summary_X = X[:, [FEATURES.index(col) for col in SUMMARY_COLUMNS]]
+    sums = np.zeros((n_clusters, len(SUMMARY_COLUMNS)))
+    np.add.at(sums, labels, summary_X)
+    counts = np.bincount(labels, minlength=n_clusters)
+    city_names = areas['City Name'].astype(str).to_numpy()
+    cities = [merge_cities(Counter(), city_names[labels == k].tolist()) for k in range(n_clusters)]
+    return sums, counts, cities
+
+def summary_version(base_version, model, counts, sums):
+    """
+    Version of updated artifacts: a hash of the centroids and summary they
+    were learned into, so the same state gets the same version in every
+    process and different states never share one.
+    """
+    digest = hashlib.sha1(str(base_version).encode())
+    for array in (model.cluster_centers_, counts, sums):
+        digest.update(np.ascontiguousarray(array, dtype=np.float64).tobytes())
+    return f"{base_version}+{digest.hexdigest()[:8]}"
+
+def area_matrix(areas):
+    X = frame_feature_matrix(areas)
+    valid = valid_rows(X)
+    return areas[valid], X[valid]
+
+def fit_cluster_model(areas, n_clusters=3, algorithm='kmeans', batch_size=1024, random_state=42):
+    """Fit the scaler, KMeans/MiniBatchKMeans model and summary on an area table frame."""
+    areas, X = area_matrix(areas)
+    scaler = StandardScaler().fit(X)
+    X_scaled = scaler.transform(X)
+    if algorithm == 'minibatch':
+        model = MiniBatchKMeans(n_clusters=n_clusters, batch_size=batch_size, n_init=10,
+                                reassignment_ratio=0.0, random_state=random_state)
+    else:
+        model = KMeans(n_clusters=n_clusters, n_init=10, random_state=random_state)
+    labels = model.fit_predict(X_scaled)
+    cluster_summary = build_cluster_summary(*summary_stats(areas, X, labels, n_clusters))
+    return ClusterArtifacts(scaler, model, cluster_summary, version=None)
+
+def fit_cluster_model_chunked(path, chunksize, n_clusters=3, batch_size=1024, random_state=42):
+    """
+    Stream a large area table (.csv, .arrow or .parquet) in chunks: one
+    pass to partial_fit the scaler, one to partial_fit MiniBatchKMeans and
+    one to accumulate the summary with the final centroids.
+    """
+    scaler = StandardScaler()
+    for chunk in iter_frames(path, chunksize):
+        scaler.partial_fit(area_matrix(chunk)[1])
+
+    model = MiniBatchKMeans(n_clusters=n_clusters, batch_size=batch_size, n_init=3,
+                            reassignment_ratio=0.0, random_state=random_state)
+    for chunk in iter_frames(path, chunksize):
+        model.partial_fit(scaler.transform(area_matrix(chunk)[1]))
+
+    assigner = NearestCentroidAssigner(scaler, model)
+    sums = np.zeros((n_clusters, len(SUMMARY_COLUMNS)))
+    counts = np.zeros(n_clusters, dtype=np.int64)
+    cities = [Counter() for _ in range(n_clusters)]
+    for chunk in iter_frames(path, chunksize):
+        chunk, X = area_matrix(chunk)
+        chunk_sums, chunk_counts, chunk_cities = summary_stats(chunk, X, assigner.predict(X), n_clusters)
+        sums += chunk_sums
+        counts += chunk_counts
+        for k in range(n_clusters):
+            merge_cities(cities[k], chunk_cities[k])
+    return ClusterArtifacts(scaler, model, build_cluster_summary(sums, counts, cities), version=None)
+
+class OnlineClusterModel:
+    """
+    MiniBatchKMeans seeded from served artifacts and updated with partial_fit.
+
+    Seeding runs one partial_fit over the current centroids weighted by the
+    cluster sizes in the summary, so new observations move the centroids by
+    their share of all areas seen instead of replacing them. The scaler is
+    kept frozen so centroids stay in the served feature space. Summaries are
+    updated from running sums, counts and capped city counters, so an update
+    costs the same however many areas were seen before; areas seen earlier
+    keep the cluster they were counted in.
+    """
+    def __init__(self, artifacts, batch_size=1024, random_state=42):
+        centers = np.asarray(artifacts.model.cluster_centers_, dtype=np.float64)
+        self.n_clusters = len(centers)
+        self.scaler = artifacts.scaler
+        self.base_version = artifacts.version
+        self._lock = threading.Lock()
+
+        summary = artifacts.cluster_summary.sort_values('KMeans_Cluster')
+        names = [names.split(', ') if names else [] for names in summary['City Name'].fillna('')]
+        self.cities = [merge_cities(Counter(), cities) for cities in names]
+        # Summaries from City_cluster.ipynb list every city instead of counting areas
+        self.counts = (summary['Areas'].to_numpy(dtype=np.int64) if 'Areas' in summary
+                       else np.array([len(cities) for cities in names], dtype=np.int64))
+        self.sums = summary[SUMMARY_COLUMNS].to_numpy(dtype=np.float64) * self.counts[:, None]
+
+        self.model = MiniBatchKMeans(n_clusters=self.n_clusters, init=centers, n_init=1,
+                                     batch_size=batch_size, reassignment_ratio=0.0,
+                                     random_state=random_state)
+        self.model.partial_fit(centers, sample_weight=np.maximum(self.counts, 1).astype(np.float64))
+
+    def __getstate__(self):
+        # Saved to the shared cluster state; the lock is per process
+        state = dict(self.__dict__)
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def partial_fit(self, areas):
+        """Update centroids and summaries with a frame of new areas; returns fresh artifacts."""
+        areas, X = area_matrix(areas)
+        if len(X) == 0:
+            raise ValueError("No areas with complete attributes to learn from")
+
+        with self._lock:
+            X_scaled = (X - self.scaler.mean_) / self.scaler.scale_
+            self.model.partial_fit(X_scaled)
+            assigner = NearestCentroidAssigner(self.scaler, self.model)
+            sums, counts, cities = summary_stats(areas, X, assigner.predict(X), self.n_clusters)
+            self.sums += sums
+            self.counts += counts
+            for k in range(self.n_clusters):
+                merge_cities(self.cities[k], cities[k])
+
+            model = copy.deepcopy(self.model)
+            cluster_summary = build_cluster_summary(self.sums, self.counts, self.cities)
+            version = summary_version(self.base_version, model, self.counts, self.sums)
+        return ClusterArtifacts(self.scaler, model, cluster_summary, version), len(X)
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit the zero-dose area clustering artifacts")
+    parser.add_argument("--data", default=AREA_DATA_PATH, help="Area table (.csv, .arrow or .parquet)")
+    parser.add_argument("--output-dir", default=MODEL_DIR, help="Directory for the scaler, model and summary pickles")
+    parser.add_argument("--algorithm", choices=["kmeans", "minibatch"], default="kmeans")
+    parser.add_argument("--clusters", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=1024)
+    parser.add_argument("--chunksize", type=int, default=0,
+                        help="Stream the table in chunks (minibatch only) instead of loading it at once")
+    args = parser.parse_args()
+
+    print(f"📊 Fitting {args.algorithm} with {args.clusters} clusters on {args.data}")
+    if args.chunksize and args.algorithm == "minibatch":
+        artifacts = fit_cluster_model_chunked(args.data, args.chunksize, args.clusters, args.batch_size)
+    else:
+        artifacts = fit_cluster_model(read_frame(args.data), args.clusters, args.algorithm, args.batch_size)
+    save_cluster_artifacts(artifacts, args.output_dir)
+
+    print(f"✅ Saved artifacts to {args.output_dir} (version {artifacts.version})")
+    print(artifacts.cluster_summary.drop(columns='City Name').round(2).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
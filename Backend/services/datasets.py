@@ -0,0 +1,242 @@
+"""
+Typed columnar copies of the tables in data/.
+
+Each CSV gets an explicit Arrow schema (dictionary-encoded district,
+vaccine, gender and other low-cardinality strings, date32 dates, narrow
+integers) and is converted once to an uncompressed Arrow IPC file next
+to it. Fractional columns stay float64: they are model and scaler inputs,
+and must reach the models as the same values the CSV parsed to.
+
+    python -m services.datasets            # data/*.csv -> data/*.arrow
+    python -m services.datasets --parquet  # also write zstd Parquet
+
+Loading memory-maps the .arrow file, so the columns are read zero-copy
+from the page cache and only the projected ones are ever touched. The
+.arrow files are build outputs, not committed: the Dockerfile runs the
+conversion, and a missing or stale one (the CSV hash in its metadata no
+longer matches, or it was written with another schema) is rebuilt from
+the CSV on first load. A current .parquet copy is used before that, and
+where data/ is read-only the CSV is parsed with the same schema, so
+results never depend on which copy is on disk.
+"""
+import argparse
+import hashlib
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BACKEND_DIR, "data")
+
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+SOURCE_HASH_KEY = b"source_sha256"
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class Dataset:
+    """One table in data/: its CSV, its Arrow schema and its converted copies."""
+    def __init__(self, name, csv_file, schema, data_dir=DATA_DIR):
+        self.name = name
+        self.schema = schema
+        self.csv_path = os.path.join(data_dir, csv_file)
+        stem = os.path.splitext(self.csv_path)[0]
+        self.arrow_path = f"{stem}.arrow"
+        self.parquet_path = f"{stem}.parquet"
+        self._source_hash = None
+        self._lock = threading.Lock()
+        self._convert_lock = threading.Lock()
+
+    def available(self):
+        return any(os.path.exists(path) for path in (self.arrow_path, self.parquet_path, self.csv_path))
+
+    def source_hash(self):
+        """sha256 of the CSV, computed once per process (None without a CSV)."""
+        if self._source_hash is None and os.path.exists(self.csv_path):
+            with self._lock:
+                if self._source_hash is None:
+                    self._source_hash = file_sha256(self.csv_path)
+        return self._source_hash
+
+    def read_csv(self, path=None):
+        """Parse the CSV with the explicit schema instead of type inference."""
+        return pa_csv.read_csv(
+            path or self.csv_path,
+            convert_options=pa_csv.ConvertOptions(column_types=self.schema,
+                                                  include_columns=self.schema.names)
+        ).cast(self.schema)
+
+    def convert(self, csv_path=None, arrow_path=None, parquet_path=None):
+        """Write the typed table as an Arrow IPC file (and Parquet if parquet_path is given)."""
+        csv_path = csv_path or self.csv_path
+        metadata = {SOURCE_HASH_KEY: file_sha256(csv_path).encode()}
+        # One record batch with one dictionary per column, so loads are zero-copy
+        table = self.read_csv(csv_path).unify_dictionaries().combine_chunks().replace_schema_metadata(metadata)
+        arrow_path = arrow_path or self.arrow_path
+        # Per process: several workers may rebuild the same file on first load
+        tmp_path = f"{arrow_path}.{os.getpid()}.tmp"
+        with pa.OSFile(tmp_path, 'wb') as sink, ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, arrow_path)
+        if parquet_path:
+            pq.write_table(table, parquet_path, compression='zstd')
+        if csv_path == self.csv_path:
+            self._source_hash = metadata[SOURCE_HASH_KEY].decode()
+        return table
+
+    def _is_current(self, schema):
+        if [(field.name, field.type) for field in schema] != [(field.name, field.type) for field in self.schema]:
+            return False
+        expected = self.source_hash()
+        return expected is None or (schema.metadata or {}).get(SOURCE_HASH_KEY, b'').decode() == expected
+
+    def table(self, columns=None):
+        """
+        The table, or only `columns` of it, from the freshest copy on disk:
+        memory-mapped Arrow, then Parquet, then the CSV itself, converted
+        to Arrow on the way so the next load is mapped.
+        """
+        table = self._mapped()
+        if table is not None:
+            return table.select(columns) if columns else table
+        if os.path.exists(self.parquet_path):
+            parquet = pq.ParquetFile(self.parquet_path, memory_map=True)
+            if self._is_current(parquet.schema_arrow):
+                return parquet.read(columns=columns)
+        if not os.path.exists(self.csv_path):
+            raise FileNotFoundError(f"No data for dataset {self.name!r} in {os.path.dirname(self.csv_path)}")
+        with self._convert_lock:
+            table = self._mapped()
+            if table is None:
+                try:
+                    self.convert()
+                    table = self._mapped()
+                except OSError as e:
+                    print(f"⚠️ Could not write {os.path.basename(self.arrow_path)}, parsing the CSV: {e}")
+                    table = self.read_csv()
+        return table.select(columns) if columns else table
+
+    def _mapped(self):
+        """The memory-mapped .arrow table if it is current, else None."""
+        if not os.path.exists(self.arrow_path):
+            return None
+        reader = ipc.open_file(pa.memory_map(self.arrow_path, 'r'))
+        return reader.read_all() if self._is_current(reader.schema) else None
+
+    def frame(self, columns=None):
+        """
+        The table as a DataFrame: dictionary columns become categoricals,
+        dates datetime64, and numeric columns share the mapped buffers.
+        """
+        return table_to_frame(self.table(columns))
+
+    def iter_frames(self, chunksize, columns=None):
+        """The table as DataFrames of at most `chunksize` rows."""
+        for batch in self.table(columns).to_batches(max_chunksize=chunksize):
+            yield table_to_frame(pa.Table.from_batches([batch]))
+
+def table_to_frame(table):
+    return table.to_pandas(date_as_object=False, split_blocks=True)
+
+AREAS = Dataset("areas", "zero_dose_clusters_maharashtra.csv", pa.schema([
+    ('Area ID', pa.string()),
+    ('City Name', CATEGORY),
+    ('District Name', CATEGORY),
+    ('Latitude', pa.float64()),
+    ('Longitude', pa.float64()),
+    ('Zero-dose Count', pa.int32()),
+    ('Income', pa.float64()),
+    ('Travel Time', pa.float64()),
+    ('Literacy Rate', pa.float64())
+]))
+
+DROPOUT = Dataset("dropout", "dropout_prediction_satara.csv", pa.schema([
+    ('Child ID', pa.string()),
+    ('Gender', CATEGORY),
+    ('Age', pa.int8()),
+    ('Travel Time', pa.int16()),
+    ('Parent Education', CATEGORY),
+    ('Dose1 Date', pa.date32()),
+    ('Dose2 Date', pa.date32()),
+    ('Distance to Center', pa.float64()),
+    ('Delay_Days', pa.int16()),
+    ('Is_On_Time', pa.int8())
+]))
+
+FORECAST = Dataset("forecast", "vaccine_demand_forecasting.csv", pa.schema([
+    ('Date', pa.date32()),
+    ('District', CATEGORY),
+    ('Vaccine Type', CATEGORY),
+    ('Administered Doses', pa.int32()),
+    ('Temperature', pa.float64()),
+    ('Rainfall', pa.float64()),
+    ('Stock Left', pa.int32()),
+    ('Holiday Indicator', pa.int8())
+]))
+
+DATASETS = {dataset.name: dataset for dataset in (AREAS, DROPOUT, FORECAST)}
+
+def dataset_for_path(path):
+    """The registered dataset whose CSV, Arrow or Parquet file is `path`, if any."""
+    path = os.path.abspath(path)
+    for dataset in DATASETS.values():
+        if path in (dataset.csv_path, dataset.arrow_path, dataset.parquet_path):
+            return dataset
+    return None
+
+def read_frame(path):
+    """A DataFrame from an .arrow, .parquet or .csv file, typed if it is a known dataset."""
+    dataset = dataset_for_path(path)
+    if dataset is not None:
+        return dataset.frame()
+    if path.endswith('.arrow'):
+        return table_to_frame(ipc.open_file(pa.memory_map(path, 'r')).read_all())
+    if path.endswith('.parquet'):
+        return table_to_frame(pq.read_table(path, memory_map=True))
+    return pd.read_csv(path)
+
+def iter_frames(path, chunksize):
+    """
+    `path` in DataFrames of at most `chunksize` rows: Arrow and Parquet
+    record batches, or CSV chunks.
+    """
+    dataset = dataset_for_path(path)
+    if dataset is not None:
+        yield from dataset.iter_frames(chunksize)
+    elif path.endswith('.arrow'):
+        for batch in ipc.open_file(pa.memory_map(path, 'r')).read_all().to_batches(max_chunksize=chunksize):
+            yield table_to_frame(pa.Table.from_batches([batch]))
+    elif path.endswith('.parquet'):
+        for batch in pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=chunksize):
+            yield table_to_frame(pa.Table.from_batches([batch]))
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the CSVs in data/ to typed Arrow (and Parquet) files")
+    parser.add_argument("datasets", nargs="*", help=f"Datasets to convert: {', '.join(DATASETS)} (default: all)")
+    parser.add_argument("--parquet", action="store_true", help="Also write a zstd Parquet copy")
+    args = parser.parse_args()
+    unknown = [name for name in args.datasets if name not in DATASETS]
+    if unknown:
+        parser.error(f"unknown datasets: {', '.join(unknown)}")
+
+    for name in args.datasets or DATASETS:
+        dataset = DATASETS[name]
+        table = dataset.convert(parquet_path=dataset.parquet_path if args.parquet else None)
+        sizes = ", ".join(f"{os.path.basename(path)} {os.path.getsize(path) / 1024:.1f} KB"
+                          for path in (dataset.csv_path, dataset.arrow_path, dataset.parquet_path)
+                          if os.path.exists(path) and (args.parquet or path != dataset.parquet_path))
+        print(f"✅ {name}: {table.num_rows} rows ({sizes})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+"""
+Streaming input drift sketches, compared with the training data in data/.
+
+Every monitored input feature keeps a sketch of the values served since
+the live window started (or was last reset):
+
+- numeric:     counts over up to BINS bins whose edges are quantiles of
+               the training column, plus a running sum for the mean
+- categorical: counts per value, at most MAX_CATEGORIES (the rest under OTHER)
+
+The same sketch is built once from the training table, so drift is a
+comparison of two histograms: PSI for every feature and, for numeric
+ones, the KS statistic between the binned CDFs (a lower bound of the
+exact two-sample KS distance). Recording a request is a bisect and a few
+integer increments per feature into a sketch owned by the calling thread,
+so the request path takes no lock; reports merge the per-thread sketches.
+
+Every worker publishes its merged sketch under STATE_DIR/drift/<monitor>/
+every DRIFT_SHARE_SECONDS, and a report adds the other workers' latest
+ones to its own, so any worker reports on all the traffic. A reset
+writes the start of the new window there too; sketches from before it
+are left out, and the other workers start over on their next publish
+(requests they serve until then are not counted in the new window).
+Sketches of workers that have exited, or that have not been refreshed
+for DRIFT_STALE_SECONDS, are deleted instead of merged.
+"""
+import os
+import socket
+import threading
+import time
+from bisect import bisect_right
+
+import numpy as np
+
+from services import shared_state
+
+# DRIFT_MONITORING=0 leaves every monitor unfitted, which makes observe() a no-op
+ENABLED = os.getenv("DRIFT_MONITORING", "1").lower() not in ("0", "false", "no")
+BINS = int(os.getenv("DRIFT_BINS", "20"))
+MAX_CATEGORIES = 64
+OTHER = "__other__"
+# Fewer live rows than this are reported as insufficient_data
+MIN_SAMPLES = int(os.getenv("DRIFT_MIN_SAMPLES", "100"))
+# PSI rule of thumb: below 0.1 stable, 0.1-0.25 a moderate shift, above 0.25 drift
+PSI_MODERATE = 0.1
+PSI_DRIFT = 0.25
+# Floor for empty bin proportions, so PSI stays finite
+EPSILON = 1e-4
+STATUSES = ("insufficient_data", "stable", "moderate", "drift")
+# How often each worker publishes its live sketches for the others' reports
+SHARE_SECONDS = float(os.getenv("DRIFT_SHARE_SECONDS", "10"))
+# A published sketch not refreshed for this long is from a worker that is gone
+# (restarted, or WEB_CONCURRENCY lowered) and is deleted instead of merged
+STALE_SECONDS = float(os.getenv("DRIFT_STALE_SECONDS", str(3 * SHARE_SECONDS)))
+WINDOW_FILE = "window.pkl"
+
+class _Plan:
+    """The bins of one reference fit and the live sketches recorded against them."""
+    __slots__ = ('numeric', 'categorical', 'sketches', 'started_at')
+
+    def __init__(self, numeric, categorical, started_at=None):
+        self.numeric = numeric          # ((field, edges), ...)
+        self.categorical = categorical  # (field, ...)
+        self.sketches = []
+        self.started_at = started_at or time.time()
+
+class _Sketch:
+    """Counts per bin (and a running sum) of each numeric field and per value of each categorical one."""
+    __slots__ = ('plan', 'count', 'numeric', 'categorical')
+
+    def __init__(self, plan):
+        self.plan = plan
+        self.count = 0
+        # The last slot of each numeric count list holds the sum of the values
+        self.numeric = tuple((field, edges, [0] * (len(edges) + 1) + [0.0]) for field, edges in plan.numeric)
+        self.categorical = tuple((field, {}) for field in plan.categorical)
+
+def _add_category(counts, value, n=1):
+    if value not in counts and len(counts) >= MAX_CATEGORIES:
+        value = OTHER
+    counts[value] = counts.get(value, 0) + n
+
+def _merge(total, count, numeric, categorical):
+    """Add one sketch's counts (per numeric field lists, per categorical field dicts) into total."""
+    total.count += count
+    for (_, _, into), counts in zip(total.numeric, numeric):
+        for i, n in enumerate(list(counts)):
+            into[i] += n
+    for (_, into), counts in zip(total.categorical, categorical):
+        for value, n in list(counts.items()):
+            _add_category(into, value, n)
+
+_worker = None
+
+def worker_id():
+    """Names this process's published sketches; unique per process, also across forks, restarts and hosts."""
+    global _worker
+    if _worker is None or _worker[0] != os.getpid():
+        _worker = (os.getpid(), f"{socket.gethostname()}-{os.getpid()}-{time.time_ns()}")
+    return _worker[1]
+
+def worker_exited(worker):
+    """Whether a worker id names a process on this host that is no longer running."""
+    parts = worker.rsplit("-", 2)
+    # Signal 0 only probes on POSIX (on Windows os.kill terminates the process)
+    if len(parts) != 3 or parts[0] != socket.gethostname() or os.name != "posix":
+        return False
+    try:
+        os.kill(int(parts[1]), 0)
+    except ProcessLookupError:
+        return True
+    except (PermissionError, ValueError):
+        pass
+    return False
+
+def quantile_edges(values):
+    """
+    Up to BINS - 1 edges at quantiles of values, each moved halfway to the
+    next distinct value so discrete inputs (ages, minutes, 0.5 km steps)
+    never sit on an edge.
+    """
+    distinct = np.unique(values)
+    quantiles = np.quantile(values, np.linspace(0, 1, BINS + 1)[1:-1])
+    upper = np.unique(np.searchsorted(distinct, quantiles, side='right'))
+    upper = upper[(upper > 0) & (upper < len(distinct))]
+    return ((distinct[upper - 1] + distinct[upper]) / 2).tolist()
+
+def psi(reference, live):
+    """Population stability index between two count vectors over the same bins."""
+    reference = np.asarray(reference, dtype=np.float64)
+    live = np.asarray(live, dtype=np.float64)
+    p = np.maximum(reference / reference.sum(), EPSILON)
+    q = np.maximum(live / live.sum(), EPSILON)
+    return float(np.sum((q - p) * np.log(q / p)))
+
+def ks_statistic(reference, live):
+    """Largest gap between the two binned CDFs."""
+    reference = np.cumsum(reference, dtype=np.float64)
+    live = np.cumsum(live, dtype=np.float64)
+    return float(np.max(np.abs(reference / reference[-1] - live / live[-1])))
+
+def feature_status(score, live_rows):
+    if live_rows < MIN_SAMPLES:
+        return "insufficient_data"
+    if score >= PSI_DRIFT:
+        return "drift"
+    return "moderate" if score >= PSI_MODERATE else "stable"
+
+class DriftMonitor:
+    """
+    Live sketches of one endpoint's inputs against its training table.
+    numeric and categorical map input field names to dataset columns.
+    """
+    def __init__(self, name, dataset, numeric, categorical):
+        self.name = name
+        self.dataset = dataset
+        self.numeric = dict(numeric)
+        self.categorical = dict(categorical)
+        self.reference = None
+        self._plan = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def fit(self):
+        """Bin the training table into the reference sketch and start an empty live one."""
+        frame = self.dataset.frame(list({**self.numeric, **self.categorical}.values()))
+        numeric = []
+        for field, column in self.numeric.items():
+            values = frame[column].to_numpy(dtype=np.float64)
+            numeric.append((field, quantile_edges(values)))
+        plan = _Plan(tuple(numeric), tuple(self.categorical))
+
+        reference = _Sketch(plan)
+        self._record_frame(reference, frame)
+        self.reference = reference
+        self._plan = plan
+
+    def _share_dir(self):
+        return shared_state.path("drift", self.name)
+
+    def reset(self):
+        """Start a new live window in every worker; the bins and the reference are kept."""
+        plan = self._plan
+        if plan is None:
+            return
+        directory = self._share_dir()
+        with shared_state.locked(f"drift-{self.name}"):
+            started_at = time.time()
+            shared_state.write_pickle(os.path.join(directory, WINDOW_FILE), started_at)
+            for name in os.listdir(directory):
+                if name.endswith(".pkl") and name != WINDOW_FILE:
+                    os.remove(os.path.join(directory, name))
+        self._plan = _Plan(plan.numeric, plan.categorical, started_at)
+
+    def sync_window(self):
+        """Start of the shared live window; starts a new local one if another worker reset it."""
+        started_at = shared_state.read_pickle(os.path.join(self._share_dir(), WINDOW_FILE), 0.0)
+        plan = self._plan
+        if plan is not None and started_at > plan.started_at:
+            self._plan = _Plan(plan.numeric, plan.categorical, started_at)
+        return started_at
+
+    def _new_sketch(self, plan):
+        """A sketch for the calling thread, made on its first request against plan."""
+        sketch = _Sketch(plan)
+        with self._lock:
+            plan.sketches.append(sketch)
+        self._local.sketch = sketch
+        return sketch
+
+    def observe(self, input):
+        """Record one request's inputs (a pydantic input model, or any object whose __dict__ holds the fields)."""
+        plan = self._plan
+        if plan is None:
+            return
+        sketch = getattr(self._local, 'sketch', None)
+        if sketch is None or sketch.plan is not plan:
+            sketch = self._new_sketch(plan)
+        sketch.count += 1
+        values = input.__dict__
+        for field, edges, counts in sketch.numeric:
+            value = values[field]
+            counts[bisect_right(edges, value)] += 1
+            counts[-1] += value
+        for field, counts in sketch.categorical:
+            value = values[field]
+            n = counts.get(value)
+            if n is None:
+                _add_category(counts, value)
+            else:
+                counts[value] = n + 1
+
+    def observe_frame(self, frame):
+        """Record a batch given as a frame with the training table's column names."""
+        plan = self._plan
+        if plan is None or frame.empty:
+            return
+        sketch = getattr(self._local, 'sketch', None)
+        if sketch is None or sketch.plan is not plan:
+            sketch = self._new_sketch(plan)
+        self._record_frame(sketch, frame)
+
+    def _record_frame(self, sketch, frame):
+        sketch.count += len(frame)
+        for field, edges, counts in sketch.numeric:
+            values = frame[self.numeric[field]].to_numpy(dtype=np.float64)
+            for i, n in enumerate(np.bincount(np.searchsorted(edges, values, side='right'),
+                                              minlength=len(edges) + 1).tolist()):
+                counts[i] += n
+            counts[-1] += float(values.sum())
+        for field, counts in sketch.categorical:
+            for value, n in frame[self.categorical[field]].value_counts().items():
+                if n:
+                    _add_category(counts, value.item() if hasattr(value, 'item') else value, int(n))
+
+    def live(self):
+        """Every thread's sketch merged into one."""
+        plan = self._plan
+        merged = _Sketch(plan)
+        with self._lock:
+            sketches = list(plan.sketches)
+        for sketch in sketches:
+            _merge(merged, sketch.count, [counts for _, _, counts in sketch.numeric],
+                   [counts for _, counts in sketch.categorical])
+        return merged
+
+    def publish(self):
+        """Write this worker's live sketch for the other workers' reports."""
+        if self._plan is None:
+            return
+        self.sync_window()
+        live = self.live()
+        if live.count:
+            shared_state.write_pickle(os.path.join(self._share_dir(), f"{worker_id()}.pkl"), {
+                'started_at': live.plan.started_at,
+                'edges': [edges for _, edges in live.plan.numeric],
+                'count': live.count,
+                'numeric': [counts for _, _, counts in live.numeric],
+                'categorical': [counts for _, counts in live.categorical]
+            })
+
+    def shared_live(self):
+        """
+        This worker's live sketch plus the latest one every other live worker
+        published in the current window, and when the earliest of them started.
+        Sketches of exited workers are deleted on the way.
+        """
+        window = self.sync_window()
+        merged = self.live()
+        since = merged.plan.started_at
+        edges = [edges for _, edges in merged.plan.numeric]
+        directory = self._share_dir()
+        own = f"{worker_id()}.pkl"
+        now = time.time()
+        for name in os.listdir(directory) if os.path.isdir(directory) else []:
+            if not name.endswith(".pkl") or name in (own, WINDOW_FILE):
+                continue
+            file = os.path.join(directory, name)
+            try:
+                if now - os.path.getmtime(file) > STALE_SECONDS or worker_exited(name[:-len(".pkl")]):
+                    os.remove(file)
+                    continue
+            except FileNotFoundError:
+                # Pruned or reset by another worker meanwhile
+                continue
+            published = shared_state.read_pickle(file)
+            # Skip sketches from before a reset, or binned against another fit of the training data
+            if published is None or published['started_at'] < window or published['edges'] != edges:
+                continue
+            _merge(merged, published['count'], published['numeric'], published['categorical'])
+            since = min(since, published['started_at'])
+        return merged, since
+
+    def report(self):
+        """PSI (and KS for numeric features) of the live inputs of every worker against the training data."""
+        if self._plan is None:
+            self.fit()
+        reference, (live, since) = self.reference, self.shared_live()
+        features = []
+        for (field, edges, expected), (_, _, observed) in zip(reference.numeric, live.numeric):
+            score = psi(expected[:-1], observed[:-1]) if live.count else None
+            features.append({
+                'feature': field,
+                'kind': "numeric",
+                'status': feature_status(score or 0.0, live.count),
+                'psi': score,
+                'ks': ks_statistic(expected[:-1], observed[:-1]) if live.count else None,
+                'reference_mean': expected[-1] / reference.count,
+                'live_mean': observed[-1] / live.count if live.count else None,
+                'bins': len(edges) + 1
+            })
+        for (field, expected), (_, observed) in zip(reference.categorical, live.categorical):
+            values = sorted(set(expected) | set(observed), key=str)
+            score = psi([expected.get(v, 0) for v in values], [observed.get(v, 0) for v in values]) if live.count else None
+            features.append({
+                'feature': field,
+                'kind': "categorical",
+                'status': feature_status(score or 0.0, live.count),
+                'psi': score,
+                'reference_counts': {str(v): n for v, n in expected.items()},
+                'live_counts': {str(v): n for v, n in observed.items()},
+                'unseen': [str(v) for v in values if v not in expected]
+            })
+        return {
+            'model': self.name,
+            'status': max((feature['status'] for feature in features), key=STATUSES.index),
+            'reference_rows': reference.count,
+            'live_rows': live.count,
+            'since': since,
+            'features': features
+        }
+
+MONITORS = {}
+
+def register(monitor):
+    MONITORS[monitor.name] = monitor
+    return monitor
+
+def fit_all():
+    """Fit every registered monitor from data/; a monitor whose table is missing stays off."""
+    if not ENABLED:
+        return
+    for monitor in MONITORS.values():
+        try:
+            monitor.fit()
+        except Exception as e:
+            print(f"⚠️ Drift monitor {monitor.name} not fitted: {e}")
+
+def publish_all():
+    for monitor in MONITORS.values():
+        try:
+            monitor.publish()
+        except Exception as e:
+            print(f"⚠️ Drift monitor {monitor.name} not published: {e}")
+
+_publisher = None
+_stopping = threading.Event()
+
+def _publish_loop(interval):
+    while not _stopping.wait(interval):
+        publish_all()
+
+def start_sharing(interval=SHARE_SECONDS):
+    """Publish every monitor's live sketch every interval seconds, in a daemon thread."""
+    global _publisher
+    if not ENABLED or _publisher is not None:
+        return
+    _stopping.clear()
+    _publisher = threading.Thread(target=_publish_loop, args=(interval,), name="drift-share", daemon=True)
+    _publisher.start()
+
+def stop_sharing():
+    """Stop the publisher and publish once more, so a worker's last requests are shared before it exits."""
+    global _publisher
+    thread, _publisher = _publisher, None
+    if thread is None:
+        return
+    _stopping.set()
+    thread.join()
+    publish_all()
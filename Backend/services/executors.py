@@ -0,0 +1,131 @@
+import asyncio
+import contextvars
+import multiprocessing
+import os
+import threading
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from services import metrics
+
+class Overloaded(Exception):
+    """An executor's queue is full; served as HTTP 429 by main.py."""
+    def __init__(self, name, retry_after=1):
+        super().__init__(f"{name} executor is overloaded, retry later")
+        self.name = name
+        self.retry_after = retry_after
+
+_DONE = object()
+
+EXECUTORS = []
+
+class ModelExecutor:
+    """
+    Bounded executor for one model family, so CPU-bound pandas/sklearn/TF
+    work runs off the event loop without competing in one shared pool.
+
+    At most `workers` calls run at once and at most `queue` more wait;
+    anything beyond that is rejected with Overloaded instead of queuing
+    without limit. With processes=True work runs in a process pool
+    (functions and arguments must be picklable); the pool is created on
+    first use.
+    """
+    def __init__(self, name, workers=4, queue=32, processes=False, initializer=None):
+        self.name = name
+        self.workers = workers
+        self.queue = queue
+        self.processes = processes
+        self.initializer = initializer
+        self.pending = 0
+        self._pool = None
+        self._lock = threading.Lock()
+        EXECUTORS.append(self)
+
+    @classmethod
+    def from_env(cls, name, workers=4, queue=32, **kwargs):
+        """Sizes from {NAME}_WORKERS and {NAME}_QUEUE, e.g. FORECAST_WORKERS=2."""
+        prefix = name.upper()
+        return cls(name, int(os.getenv(f"{prefix}_WORKERS", workers)),
+                   int(os.getenv(f"{prefix}_QUEUE", queue)), **kwargs)
+
+    def pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    if self.processes:
+                        self._pool = ProcessPoolExecutor(
+                            max_workers=self.workers, initializer=self.initializer,
+                            mp_context=multiprocessing.get_context("forkserver")
+                        )
+                    else:
+                        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.name)
+        return self._pool
+
+    def check_capacity(self):
+        if self.pending >= self.workers + self.queue:
+            if metrics.ENABLED:
+                metrics.ADMISSION_REJECTED.inc((self.name,))
+            raise Overloaded(self.name)
+
+    def _acquire(self, admit):
+        with self._lock:
+            if admit:
+                self.check_capacity()
+            self.pending += 1
+        if metrics.ENABLED:
+            metrics.EXECUTOR_PENDING.set(self.pending, (self.name,))
+
+    def _release(self, _future=None):
+        with self._lock:
+            self.pending -= 1
+        if metrics.ENABLED:
+            metrics.EXECUTOR_PENDING.set(self.pending, (self.name,))
+
+    async def run(self, fn, *args, admit=True):
+        """Run fn(*args) on this executor; raises Overloaded when the queue is full."""
+        self._acquire(admit)
+        if not self.processes and metrics.profiling():
+            # Carry a profiled request's span collector into the worker thread
+            fn, args = contextvars.copy_context().run, (fn, *args)
+        try:
+            future = self.pool().submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # Released when the work actually finishes, even if the request is cancelled
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenExecutor:
+            # A worker process died; start a fresh pool for the next call
+            self.shutdown()
+            raise
+
+    async def iterate(self, iterator):
+        """
+        Advance a blocking (thread executor only) iterator on this executor,
+        e.g. a streamed response body. Capacity should be checked before the
+        response starts; items are not rejected once it has.
+        """
+        while True:
+            item = await self.run(next, iterator, _DONE, admit=False)
+            if item is _DONE:
+                return
+            yield item
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def describe(self):
+        return {
+            'name': self.name,
+            'kind': 'process' if self.processes else 'thread',
+            'workers': self.workers,
+            'queue': self.queue,
+            'pending': self.pending
+        }
+
+def shutdown_executors():
+    for executor in EXECUTORS:
+        executor.shutdown()
@@ -0,0 +1,119 @@
+"""
+ONNX export and ONNX Runtime inference for the forecasting LSTMs.
+
+    python -m services.forecast_onnx          # *_model.keras -> *_model.onnx
+    python -m services.forecast_onnx --int8   # also *_model.int8.onnx
+
+--int8 adds a copy with dynamically quantized int8 weights. Every export is
+checked against the Keras model on the history windows and perturbed
+copies of them; the Dockerfile and push.py run the export, so the .onnx
+files are never committed. Exporting needs TensorFlow with the tf2onnx
+and onnx packages; serving with FORECAST_BACKEND=onnx or onnx-int8 needs only
+onnxruntime, so TensorFlow is never imported.
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+# FORECAST_BACKEND -> model file suffix next to each {District}_{Vaccine}_model.keras
+BACKENDS = {"keras": "_model.keras", "onnx": "_model.onnx", "onnx-int8": "_model.int8.onnx"}
+ONNX_THREADS = int(os.getenv("FORECAST_ONNX_THREADS", "1"))
+# Largest accepted difference in scaled (0-1) demand against Keras
+PARITY_TOLERANCE = {"onnx": 1e-4, "onnx-int8": 0.02}
+
+def backend_model_path(keras_path, backend):
+    return keras_path[:-len(BACKENDS["keras"])] + BACKENDS[backend]
+
+class OnnxForecaster:
+    """An ONNX Runtime session behind the Keras predict() call predict_windows makes."""
+    def __init__(self, path, threads=ONNX_THREADS):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        # The forecast executor already runs requests in parallel
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        # A path or the model's bytes, for copies of the served model (forecast jobs)
+        self.source = path
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, x, verbose=0, batch_size=None):
+        return self.session.run(None, {self.input_name: np.asarray(x, dtype=np.float32)})[0]
+
+def export_model(keras_path, onnx_path):
+    """Convert one Keras model to ONNX with a dynamic batch dimension; returns the Keras model."""
+    import keras
+
+    model = keras.models.load_model(keras_path)
+    # Keras only exports models that have been called once
+    model(np.zeros((1, *model.input_shape[1:]), dtype=np.float32))
+    tmp_path = f"{onnx_path}.tmp"
+    model.export(tmp_path, format="onnx", verbose=False)
+    os.replace(tmp_path, onnx_path)
+    return model
+
+def quantize_model(onnx_path, int8_path):
+    """Dynamic int8 quantization: int8 weights, activations quantized per batch at run time."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    tmp_path = f"{int8_path}.tmp"
+    quantize_dynamic(onnx_path, tmp_path, weight_type=QuantType.QInt8)
+    os.replace(tmp_path, int8_path)
+
+def parity_windows(window, n=256, seed=42):
+    """The history window plus n copies with the inputs of the last day perturbed by up to ±20%."""
+    rng = np.random.default_rng(seed)
+    windows = np.repeat(window[np.newaxis], n + 1, axis=0)
+    windows[1:, -1, 1:] *= rng.uniform(0.8, 1.2, (n, window.shape[1] - 1))
+    return windows
+
+def parity(model, scaler, window, forecasters):
+    """
+    Compare ONNX forecasters with the Keras model on parity_windows(window):
+    {backend: (max |Δ scaled|, |Δ demand| per window)}.
+    """
+    from routers.forecasting import predict_windows
+
+    windows = parity_windows(window)
+    scaled = scaler.transform(windows.reshape(-1, windows.shape[-1])).reshape(windows.shape).astype(np.float32)
+    expected = model.predict(scaled, verbose=0)
+    expected_demand = predict_windows(model, scaler, windows)
+    return {backend: (float(np.abs(forecaster.predict(scaled) - expected).max()),
+                      np.abs(predict_windows(forecaster, scaler, windows) - expected_demand))
+            for backend, forecaster in forecasters.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the forecasting LSTMs to ONNX and check them against Keras")
+    parser.add_argument("--int8", action="store_true", help="Also write dynamically quantized int8 models")
+    args = parser.parse_args()
+
+    from routers.forecasting import FEATURES, MODEL_PATHS, SCALER_PATHS, recent_data_dict
+    import pickle
+
+    ok = True
+    for key, keras_path in MODEL_PATHS.items():
+        onnx_path = backend_model_path(keras_path, "onnx")
+        model = export_model(keras_path, onnx_path)
+        paths = {"onnx": onnx_path}
+        if args.int8:
+            paths["onnx-int8"] = backend_model_path(keras_path, "onnx-int8")
+            quantize_model(onnx_path, paths["onnx-int8"])
+
+        with open(SCALER_PATHS[key], 'rb') as f:
+            scaler = pickle.load(f)
+        window = recent_data_dict[key][FEATURES].to_numpy(dtype=np.float64)
+        results = parity(model, scaler, window, {backend: OnnxForecaster(path) for backend, path in paths.items()})
+
+        for backend, (diff, demand_diff) in results.items():
+            passed = diff <= PARITY_TOLERANCE[backend]
+            ok &= passed
+            print(f"{'✅' if passed else '❌'} {key[0]} {key[1]} {backend:>9}: {os.path.getsize(paths[backend]) / 1024:6.1f} KB | "
+                  f"max |Δ scaled| {diff:.2e} | demand differs on {int((demand_diff > 0).sum())}/{len(demand_diff)} "
+                  f"windows (max {int(demand_diff.max())} doses)")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
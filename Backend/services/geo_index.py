@@ -0,0 +1,145 @@
+import threading
+import numpy as np
+from sklearn.neighbors import BallTree
+
+EARTH_RADIUS_KM = 6371.0088
+
+def haversine_km(lat, lon, lats, lons):
+    """Great-circle distance in km from one point (degrees) to arrays of points (degrees)."""
+    lat, lon = np.radians(lat), np.radians(lon)
+    lats, lons = np.radians(lats), np.radians(lons)
+    a = (np.sin((lats - lat) / 2) ** 2 +
+         np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def haversine_matrix_km(lats_a, lons_a, lats_b, lons_b):
+    """Pairwise great-circle distances in km, shape (len(a), len(b)), as float32."""
+    lat_a, lon_a = np.radians(np.asarray(lats_a, dtype=np.float64))[:, None], np.radians(np.asarray(lons_a, dtype=np.float64))[:, None]
+    lat_b, lon_b = np.radians(np.asarray(lats_b, dtype=np.float64))[None, :], np.radians(np.asarray(lons_b, dtype=np.float64))[None, :]
+    a = (np.sin((lat_b - lat_a) / 2) ** 2 +
+         np.cos(lat_a) * np.cos(lat_b) * np.sin((lon_b - lon_a) / 2) ** 2)
+    return (2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))).astype(np.float32)
+
+class AreaIndex:
+    """
+    Haversine BallTree over area records with cheap incremental inserts.
+
+    Inserted areas go to a small pending buffer that is searched by brute
+    force and merged into a rebuilt tree once it grows past
+    rebuild_threshold. Re-inserting an existing area id supersedes the old
+    entry and removed ids are kept as tombstones until the next rebuild.
+    Writers hold a lock and publish an immutable snapshot, so queries never
+    block.
+    """
+    def __init__(self, id_key='area_id', lat_key='latitude', lon_key='longitude',
+                 rebuild_threshold=1024):
+        self.id_key = id_key
+        self.lat_key = lat_key
+        self.lon_key = lon_key
+        self.rebuild_threshold = rebuild_threshold
+        self._lock = threading.Lock()
+        self._state = self._make_state([], {})
+
+    def __len__(self):
+        _, records, _, _, pending, _, superseded = self._state
+        return len(records) - len(superseded) + len(pending)
+
+    def _coords(self, records):
+        return np.array([[r[self.lat_key], r[self.lon_key]] for r in records], dtype=np.float64).reshape(-1, 2)
+
+    def _make_state(self, records, pending, tree=None, tree_ids=None):
+        if tree is None and records:
+            tree = BallTree(np.radians(self._coords(records)), metric='haversine')
+        if tree_ids is None:
+            # Area id -> row in records
+            tree_ids = {r[self.id_key]: row for row, r in enumerate(records)}
+        pending_records = [r for r in pending.values() if r is not None]
+        superseded = frozenset(tree_ids.keys() & pending.keys()) if pending else frozenset()
+        return tree, records, tree_ids, pending, pending_records, self._coords(pending_records), superseded
+
+    def build(self, records):
+        """Replace the index contents with records (dicts with id, lat and lon keys)."""
+        records = list({r[self.id_key]: r for r in records}.values())
+        with self._lock:
+            self._state = self._make_state(records, {})
+
+    def records(self):
+        """Every record currently in the index."""
+        _, records, _, pending, _, _, _ = self._state
+        merged = {r[self.id_key]: r for r in records}
+        merged.update(pending)
+        return [r for r in merged.values() if r is not None]
+
+    def get(self, id):
+        """The current record with this id, or None; a lookup, without taking the lock."""
+        _, records, tree_ids, pending, _, _, _ = self._state
+        if id in pending:
+            return pending[id]
+        row = tree_ids.get(id)
+        return records[row] if row is not None else None
+
+    def insert(self, records):
+        """Add or update records without rebuilding the tree on every call."""
+        if records:
+            self._update((r[self.id_key], r) for r in records)
+
+    def remove(self, ids):
+        """Drop records by id, if present."""
+        _, _, tree_ids, pending, _, _, _ = self._state
+        ids = [i for i in ids if i in tree_ids or pending.get(i) is not None]
+        if ids:
+            self._update((i, None) for i in ids)
+
+    def _update(self, items):
+        with self._lock:
+            tree, tree_records, tree_ids, pending, _, _, _ = self._state
+            pending = dict(pending)
+            pending.update(items)
+
+            if len(pending) > self.rebuild_threshold or tree is None:
+                merged = {r[self.id_key]: r for r in tree_records}
+                merged.update(pending)
+                records = [r for r in merged.values() if r is not None]
+                self._state = self._make_state(records, {})
+            else:
+                self._state = self._make_state(tree_records, pending, tree, tree_ids)
+
+    def _matches(self, records, superseded, rows, distances):
+        return [dict(records[row], distance_km=float(distance))
+                for row, distance in zip(rows, distances)
+                if not superseded or records[row][self.id_key] not in superseded]
+
+    def _pending_distances(self, pending_coords, lat, lon):
+        return haversine_km(lat, lon, pending_coords[:, 0], pending_coords[:, 1])
+
+    def query_radius(self, lat, lon, radius_km, limit=None):
+        """Records within radius_km of (lat, lon), nearest first."""
+        tree, records, _, _, pending, pending_coords, superseded = self._state
+        matches = []
+        if tree is not None:
+            rows, distances = tree.query_radius(np.radians([[lat, lon]]), r=radius_km / EARTH_RADIUS_KM,
+                                                return_distance=True, sort_results=True)
+            matches = self._matches(records, superseded, rows[0], distances[0] * EARTH_RADIUS_KM)
+        if pending:
+            distances = self._pending_distances(pending_coords, lat, lon)
+            rows = np.flatnonzero(distances <= radius_km)
+            matches += self._matches(pending, None, rows, distances[rows])
+        return self._merge(matches, limit)
+
+    def query_nearest(self, lat, lon, k=5):
+        """The k records nearest to (lat, lon)."""
+        tree, records, _, _, pending, pending_coords, superseded = self._state
+        matches = []
+        if tree is not None:
+            n = min(len(records), k + len(superseded))
+            distances, rows = tree.query(np.radians([[lat, lon]]), k=n)
+            matches = self._matches(records, superseded, rows[0], distances[0] * EARTH_RADIUS_KM)
+        if pending:
+            distances = self._pending_distances(pending_coords, lat, lon)
+            rows = np.argsort(distances, kind='stable')[:k]
+            matches += self._matches(pending, None, rows, distances[rows])
+        return self._merge(matches, k)
+
+    def _merge(self, matches, limit):
+        matches.sort(key=lambda match: match['distance_km'])
+        return matches if limit is None else matches[:limit]
@@ -0,0 +1,348 @@
+"""
+Batch scoring jobs that outlive an HTTP request.
+
+A job snapshots its input rows to jobs/<id>/input.arrow and is scored in
+chunks on a process pool. Every chunk is committed by atomically renaming
+its Arrow file into jobs/<id>/chunks/, and job.json records progress, so a
+restart picks incomplete jobs up again from the chunks already on disk.
+When every chunk is in, they are merged into jobs/<id>/result.arrow.
+
+Routers register a JobKind per kind of job, the same way they register
+models: how to build the input table and a module-level (picklable)
+function that scores one chunk in a worker process.
+"""
+import asyncio
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: jobs are only claimed within this process, so run a single worker there
+    fcntl = None
+
+from services.datasets import table_to_frame
+from services.executors import ModelExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+JOBS_DIR = os.getenv("JOBS_DIR", os.path.join(BACKEND_DIR, "jobs"))
+# Jobs scored at once; further jobs wait in "queued"
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "1"))
+DEFAULT_CHUNK_SIZE = 1000
+
+ACTIVE = ("queued", "running")
+JOB_ID = re.compile(r"[0-9a-f]{32}")
+
+class JobKind:
+    """
+    One kind of job:
+    - load(records, parameters) -> pyarrow.Table of input rows, in the
+      parent; raises ValueError for invalid input
+    - score(frame, context) -> DataFrame of results for one chunk, in a
+      worker process, so it must be a module-level function
+    - context() -> picklable state passed to every chunk (e.g. the served
+      model), taken once when the job starts
+    - version() -> model version recorded on the job
+    """
+    def __init__(self, name, load, score, context=None, version=None):
+        self.name = name
+        self.load = load
+        self.score = score
+        self.context = context
+        self.version = version
+
+def write_table(table, path):
+    """Write an Arrow IPC file atomically: readers see all of it or none."""
+    tmp_path = f"{path}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink, ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, path)
+
+def read_table(path):
+    return ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+def score_chunk(score, context, input_path, start, stop, chunk_path):
+    """Score input rows [start, stop) and commit them to chunk_path; runs in a worker process."""
+    frame = table_to_frame(read_table(input_path).slice(start, stop - start))
+    result = score(frame, context)
+    write_table(pa.Table.from_pandas(result, preserve_index=False), chunk_path)
+    return len(result)
+
+class JobManager:
+    """Submits, runs, cancels and resumes jobs stored under `directory`."""
+    def __init__(self, directory=JOBS_DIR, concurrency=JOB_CONCURRENCY):
+        self.directory = directory
+        self.kinds = {}
+        self.executor = ModelExecutor.from_env("jobs", workers=2, queue=0, processes=True)
+        self._jobs = {}
+        self._tasks = {}
+        self._cancelled = set()
+        self._claimed = set()
+        self.concurrency = concurrency
+        self._slots = None
+
+    def register(self, kind):
+        self.kinds[kind.name] = kind
+
+    def _path(self, job_id, *parts):
+        return os.path.join(self.directory, job_id, *parts)
+
+    def _chunk_path(self, job_id, index):
+        return self._path(job_id, "chunks", f"{index:06d}.arrow")
+
+    def _save(self, job):
+        job['updated_at'] = time.time()
+        path = self._path(job['id'], "job.json")
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump(job, f)
+        os.replace(f"{path}.tmp", path)
+
+    def _read(self, job_id):
+        """job.json from disk, or None for an unknown id."""
+        path = self._path(job_id, "job.json")
+        if not JOB_ID.fullmatch(job_id) or not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _refresh(self, job_id):
+        """
+        The current state of a job. Jobs run by this process are tracked in
+        memory; others (another gunicorn worker, or before a restart) are
+        re-read from disk.
+        """
+        if job_id not in self._tasks:
+            job = self._read(job_id)
+            if job is not None:
+                self._jobs[job_id] = job
+        return self._jobs.get(job_id)
+
+    def _claim(self, job_id):
+        """
+        Lock a job for this process, so only one of several workers runs it.
+        The lock is released when the job ends or the process exits.
+        """
+        if fcntl is None:
+            if job_id in self._claimed:
+                return None
+            self._claimed.add(job_id)
+            return job_id
+        fd = os.open(self._path(job_id, "job.lock"), os.O_RDWR | os.O_CREAT)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return None
+        return fd
+
+    def _release(self, claim):
+        if fcntl is None:
+            self._claimed.discard(claim)
+        else:
+            os.close(claim)
+
+    def resume(self):
+        """Restart every job that was queued or running when the server stopped."""
+        resumed = []
+        if not os.path.isdir(self.directory):
+            return resumed
+        jobs = [self._refresh(job_id) for job_id in os.listdir(self.directory)]
+        for job in sorted(filter(None, jobs), key=lambda job: job['created_at']):
+            if job['status'] in ACTIVE and job['id'] not in self._tasks and job['kind'] in self.kinds:
+                self._start(job['id'])
+                resumed.append(job['id'])
+        return resumed
+
+    def submit(self, kind_name, records=None, parameters=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Create a queued job from records (or the kind's default dataset).
+        Writes the input snapshot, so routers call it on a thread and then
+        start() it.
+        """
+        if kind_name not in self.kinds:
+            raise ValueError(f"Unknown job kind: {kind_name}. Use one of: {', '.join(self.kinds)}")
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        kind = self.kinds[kind_name]
+        table = kind.load(records, parameters or {})
+        if table.num_rows == 0:
+            raise ValueError("No rows to score")
+
+        job_id = uuid.uuid4().hex
+        os.makedirs(self._path(job_id, "chunks"))
+        table = table.append_column('row', pa.array(range(table.num_rows), pa.int64()))
+        write_table(table.combine_chunks(), self._path(job_id, "input.arrow"))
+        job = {
+            'id': job_id,
+            'kind': kind_name,
+            'status': "queued",
+            'parameters': parameters or {},
+            'source': "records" if records is not None else "dataset",
+            'chunk_size': chunk_size,
+            'total_rows': table.num_rows,
+            'total_chunks': -(-table.num_rows // chunk_size),
+            'completed_chunks': 0,
+            'result_rows': 0,
+            'resumed_chunks': 0,
+            'model_version': kind.version() if kind.version else None,
+            'error': None,
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None
+        }
+        self._jobs[job_id] = job
+        self._save(job)
+        return job
+
+    def _start(self, job_id):
+        if self._slots is None:
+            # Created on the serving loop, not at import
+            self._slots = asyncio.Semaphore(self.concurrency)
+        task = asyncio.get_running_loop().create_task(self._run(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def start(self, job_id):
+        self._start(job_id)
+        return self.describe(job_id)
+
+    async def _run(self, job_id):
+        claim = self._claim(job_id)
+        if claim is None:
+            # Another worker process is running it
+            return
+        job = self._read(job_id)
+        self._jobs[job_id] = job
+        try:
+            if job['status'] not in ACTIVE:
+                return
+            async with self._slots:
+                await self._score(job)
+        except asyncio.CancelledError:
+            if job_id in self._cancelled:
+                self._finish(job, "cancelled")
+            # Otherwise the server is stopping: leave the job active to resume
+            raise
+        except Exception as e:
+            self._finish(job, "failed", f"{type(e).__name__}: {e}")
+        finally:
+            self._release(claim)
+
+    async def _score(self, job):
+        kind = self.kinds[job['kind']]
+        job['status'] = "running"
+        job['started_at'] = job['started_at'] or time.time()
+        context = kind.context() if kind.context else None
+        input_path = self._path(job['id'], "input.arrow")
+
+        # Chunks committed before a restart are kept
+        pending = []
+        job['completed_chunks'], job['result_rows'] = 0, 0
+        for index in range(job['total_chunks']):
+            chunk_path = self._chunk_path(job['id'], index)
+            if os.path.exists(chunk_path):
+                job['completed_chunks'] += 1
+                job['result_rows'] += read_table(chunk_path).num_rows
+            else:
+                pending.append(index)
+        job['resumed_chunks'] = job['completed_chunks']
+        self._save(job)
+
+        async def worker():
+            while pending:
+                index = pending.pop(0)
+                start = index * job['chunk_size']
+                stop = min(start + job['chunk_size'], job['total_rows'])
+                rows = await self.executor.run(score_chunk, kind.score, context, input_path,
+                                               start, stop, self._chunk_path(job['id'], index), admit=False)
+                job['completed_chunks'] += 1
+                job['result_rows'] += rows
+                self._save(job)
+                if os.path.exists(self._path(job['id'], "cancel")):
+                    # Cancelled through another worker process
+                    self._cancelled.add(job['id'])
+                    raise asyncio.CancelledError
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(max(1, self.executor.workers))]
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            raise
+        await asyncio.to_thread(self._merge, job)
+        self._finish(job, "completed")
+
+    def _merge(self, job):
+        """Concatenate the committed chunks into result.arrow and drop them."""
+        tables = [read_table(self._chunk_path(job['id'], index)) for index in range(job['total_chunks'])]
+        tables = [table for table in tables if table.num_columns]
+        result = pa.concat_tables(tables, promote_options="permissive") if tables else pa.table({})
+        write_table(result, self._path(job['id'], "result.arrow"))
+        shutil.rmtree(self._path(job['id'], "chunks"), ignore_errors=True)
+
+    def _finish(self, job, status, error=None):
+        job['status'] = status
+        job['error'] = error
+        job['finished_at'] = time.time()
+        self._cancelled.discard(job['id'])
+        self._save(job)
+
+    async def cancel(self, job_id):
+        job = self._refresh(job_id)
+        if job is None or job['status'] not in ACTIVE:
+            return job
+        self._cancelled.add(job_id)
+        task = self._tasks.get(job_id)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            return job
+        claim = self._claim(job_id)
+        if claim is None:
+            # Running in another worker process, which stops after its current chunk
+            open(self._path(job_id, "cancel"), 'w').close()
+            return job
+        try:
+            self._finish(job, "cancelled")
+        finally:
+            self._release(claim)
+        return job
+
+    def get(self, job_id):
+        return self._refresh(job_id)
+
+    def result_path(self, job_id):
+        return self._path(job_id, "result.arrow")
+
+    def describe(self, job_id):
+        job = self._refresh(job_id)
+        if job is None:
+            return None
+        return {
+            **job,
+            'progress': round(job['completed_chunks'] / job['total_chunks'], 4) if job['total_chunks'] else 1.0
+        }
+
+    def list(self):
+        job_ids = os.listdir(self.directory) if os.path.isdir(self.directory) else []
+        jobs = filter(None, (self.describe(job_id) for job_id in job_ids))
+        return sorted(jobs, key=lambda job: job['created_at'], reverse=True)
+
+    async def shutdown(self):
+        """Stop running jobs without marking them cancelled; they resume on the next start."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._slots = None
+
+job_manager = JobManager()
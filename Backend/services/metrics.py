@@ -0,0 +1,244 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Set METRICS_ENABLED=0 to turn spans and request timing into no-ops
+ENABLED = os.getenv("METRICS_ENABLED", "1").lower() not in ("0", "false", "no")
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels=()):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_format(value)}")
+        return lines
+
+class Gauge(Counter):
+    def dec(self, labels=(), amount=1):
+        self.inc(labels, -amount)
+
+    def set(self, value, labels=()):
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self):
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+class Histogram:
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, [('le', _format(bound))])} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_format(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route", "status")
+)
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served.")
+SPAN_LATENCY = Histogram("span_duration_seconds", "Latency of hot-path stages inside handlers.", ("span",))
+MODEL_CACHE = Counter("model_cache_requests_total", "Model registry lookups by result (hit = already loaded).", ("model", "result"))
+BATCH_SIZE = Histogram("batch_size", "Rows per batch handled by batch endpoints.", ("operation",), SIZE_BUCKETS)
+EXECUTOR_PENDING = Gauge("executor_pending", "Calls running or queued on each model executor.", ("executor",))
+ADMISSION_REJECTED = Counter("admission_rejected_total", "Requests rejected with 429 because an executor queue was full.", ("executor",))
+RESPONSE_CACHE = Counter(
+    "response_cache_requests_total",
+    "Response cache lookups by result (local_hits, redis_hits, coalesced, misses, redis_errors).",
+    ("cache", "result")
+)
+PREDICTION_LOG = Counter(
+    "prediction_log_records_total",
+    "Served predictions by prediction log stream and result (written, dropped when the buffer was full, failed).",
+    ("stream", "result")
+)
+
+FAMILIES = [
+    REQUEST_LATENCY, REQUESTS_IN_FLIGHT, SPAN_LATENCY, MODEL_CACHE, BATCH_SIZE,
+    EXECUTOR_PENDING, ADMISSION_REJECTED, RESPONSE_CACHE, PREDICTION_LOG
+]
+
+class _Span:
+    __slots__ = ('labels', 'start')
+
+    def __init__(self, name):
+        self.labels = (name,)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        SPAN_LATENCY.observe(time.perf_counter() - self.start, self.labels)
+        return False
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NOOP_SPAN = _NoopSpan()
+
+# Spans of requests that opted into profiling (X-Profile); span() only looks
+# the collector up while at least one such request is in flight
+_SPANS = ContextVar("profile_spans", default=None)
+_profiled_requests = 0
+_profiled_lock = threading.Lock()
+
+class _ProfiledSpan:
+    __slots__ = ('name', 'spans', 'start')
+
+    def __init__(self, name, spans):
+        self.name = name
+        self.spans = spans
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        if ENABLED:
+            SPAN_LATENCY.observe(elapsed, (self.name,))
+        self.spans.append((self.name, self.start, elapsed))
+        return False
+
+def span(name):
+    """Time a block into span_duration_seconds{span=name}; a shared no-op when disabled."""
+    if _profiled_requests:
+        spans = _SPANS.get()
+        if spans is not None:
+            return _ProfiledSpan(name, spans)
+    if not ENABLED:
+        return _NOOP_SPAN
+    return _Span(name)
+
+def profiling():
+    """True while a request is collecting its spans."""
+    return _profiled_requests > 0
+
+@contextmanager
+def collect_spans():
+    """
+    Record every span entered in this context (and in executor threads it
+    hands work to) as (name, start, seconds), whether or not metrics are enabled.
+    """
+    global _profiled_requests
+    spans = []
+    token = _SPANS.set(spans)
+    with _profiled_lock:
+        _profiled_requests += 1
+    try:
+        yield spans
+    finally:
+        with _profiled_lock:
+            _profiled_requests -= 1
+        _SPANS.reset(token)
+
+def observe_batch(operation, size):
+    if ENABLED:
+        BATCH_SIZE.observe(size, (operation,))
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for family in FAMILIES:
+        lines.extend(family.render())
+    return '\n'.join(lines) + '\n'
+
+def route_template(scope):
+    """
+    Matched route path template (e.g. /api/cluster/nearby) so labels stay
+    bounded; FastAPI versions that nest included routers keep the full path
+    on the effective route context instead of scope['route'].
+    """
+    context = scope.get('fastapi', {}).get('effective_route_context')
+    if context is not None and getattr(context, 'path', None):
+        return context.path
+    return getattr(scope.get('route'), 'path', 'unmatched')
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing every HTTP request by method, route template
+    and status, and tracking in-flight requests.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_with_status(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        started = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - started,
+                (scope['method'], route_template(scope), str(status[0]))
+            )
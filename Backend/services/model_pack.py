@@ -0,0 +1,317 @@
+"""
+A single-file, content-addressed pack of every served model artifact.
+
+    python -m services.model_pack             # build models.pack from the registered models
+    python -m services.model_pack --list      # show what a pack holds
+
+Layout: an 8-byte magic, the offset and length of a JSON index, then the
+blobs. Every blob is addressed by the sha256 of its contents, so identical
+payloads are stored once. Pickle streams and configs are zstd-compressed.
+Array payloads are stored raw and 64-byte aligned, so numpy arrays are
+served straight from the memory-mapped file (and shared by every worker
+process) instead of being read and copied. Each artifact becomes an entry
+under its path relative to Backend/:
+
+- pickle: .pkl files (joblib or plain pickle) re-pickled with protocol 5,
+  so their numpy arrays become out-of-band buffers
+- keras:  the model config plus one array per weight
+- raw:    anything else, e.g. ONNX models
+
+The loaders below (load_pickle, load_keras, file_source, listdir) read an
+artifact from the pack when it has one and the file on disk is missing or
+unchanged since packing, and from disk otherwise; so a refit written to
+disk is served without rebuilding the pack. The pack is opened once per
+process and entries are only materialised when a model is loaded.
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# MODEL_PACK=off serves every artifact from its own file
+MODEL_PACK = os.getenv("MODEL_PACK", os.path.join(BACKEND_DIR, "models.pack"))
+
+MAGIC = b"MODLPAK1"
+HEADER = struct.Struct("<8sQQ")
+ALIGNMENT = 64
+# Arrays smaller than this stay inside their pickle stream
+MIN_OUT_OF_BAND_BYTES = 1024
+CODEC = "zstd"
+
+def relative_path(path):
+    return os.path.relpath(os.path.abspath(path), BACKEND_DIR)
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class PackWriter:
+    """Appends deduplicated blobs to a pack file; close() writes the index."""
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.file = open(self.tmp_path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, 0, 0))
+        self.blobs = {}
+        self.entries = {}
+
+    def blob(self, data, compress):
+        """Store data once under its sha256; returns the digest."""
+        data = memoryview(data).cast('B')
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in self.blobs:
+            return digest
+        if compress:
+            import pyarrow as pa
+
+            stored = pa.compress(data, codec=CODEC, asbytes=True)
+            codec = CODEC
+        else:
+            # Aligned so arrays can be viewed in place
+            self.file.write(b"\0" * (-self.file.tell() % ALIGNMENT))
+            stored, codec = data, None
+        self.blobs[digest] = [self.file.tell(), len(stored), len(data), codec]
+        self.file.write(stored)
+        return digest
+
+    def add(self, path, entry):
+        entry['source'] = {
+            'size': os.path.getsize(path),
+            'mtime_ns': os.stat(path).st_mtime_ns,
+            'sha256': file_sha256(path)
+        }
+        self.entries[relative_path(path)] = entry
+
+    def add_pickle(self, path):
+        import joblib
+
+        buffers = []
+
+        def out_of_band(buffer):
+            if buffer.raw().nbytes < MIN_OUT_OF_BAND_BYTES:
+                return True
+            buffers.append(buffer)
+            return False
+
+        stream = pickle.dumps(joblib.load(path), protocol=5, buffer_callback=out_of_band)
+        self.add(path, {
+            'format': "pickle",
+            'pickle': self.blob(stream, compress=True),
+            'buffers': [self.blob(buffer.raw(), compress=False) for buffer in buffers]
+        })
+
+    def add_keras(self, path):
+        import keras
+
+        model = keras.models.load_model(path, compile=False)
+        weights = [np.ascontiguousarray(w) for w in model.get_weights()]
+        self.add(path, {
+            'format': "keras",
+            'config': self.blob(model.to_json().encode(), compress=True),
+            'weights': [[self.blob(w, compress=False), str(w.dtype), list(w.shape)] for w in weights]
+        })
+
+    def add_raw(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        # ONNX files are almost all weights: keep them uncompressed
+        self.add(path, {'format': "raw", 'data': self.blob(data, compress=not path.endswith('.onnx'))})
+
+    def add_file(self, path):
+        if path.endswith('.pkl'):
+            self.add_pickle(path)
+        elif path.endswith('.keras'):
+            self.add_keras(path)
+        else:
+            self.add_raw(path)
+
+    def close(self):
+        index = json.dumps({'created_at': time.time(), 'blobs': self.blobs, 'entries': self.entries}).encode()
+        offset = self.file.tell()
+        self.file.write(index)
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, offset, len(index)))
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+
+class ModelPack:
+    """A memory-mapped pack; entries are decoded only when loaded."""
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, offset, length = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a model pack")
+        index = json.loads(self._mmap[offset:offset + length])
+        self.blobs = index['blobs']
+        self.entries = index['entries']
+        self.created_at = index['created_at']
+
+    def entry(self, path):
+        return self.entries.get(relative_path(path))
+
+    def blob(self, digest):
+        """Uncompressed blobs as a zero-copy view of the mapped file, others decompressed."""
+        offset, stored_size, size, codec = self.blobs[digest]
+        view = memoryview(self._mmap)[offset:offset + stored_size]
+        if codec is None:
+            return view
+        import pyarrow as pa
+
+        return pa.decompress(view, decompressed_size=size, codec=codec, asbytes=True)
+
+    def load(self, path):
+        entry = self.entry(path)
+        if entry['format'] == "pickle":
+            return pickle.loads(self.blob(entry['pickle']), buffers=[self.blob(digest) for digest in entry['buffers']])
+        if entry['format'] == "keras":
+            import keras
+
+            model = keras.models.model_from_json(bytes(self.blob(entry['config'])).decode())
+            model.set_weights([np.frombuffer(self.blob(digest), dtype=dtype).reshape(shape)
+                               for digest, dtype, shape in entry['weights']])
+            return model
+        return self.blob(entry['data'])
+
+    def listdir(self, directory):
+        prefix = relative_path(directory) + os.sep
+        return sorted(name[len(prefix):] for name in self.entries
+                      if name.startswith(prefix) and os.sep not in name[len(prefix):])
+
+    def describe(self):
+        return {
+            'path': self.path,
+            'bytes': os.path.getsize(self.path),
+            'entries': len(self.entries),
+            'blobs': len(self.blobs),
+            'created_at': self.created_at
+        }
+
+_pack = None
+_pack_lock = threading.Lock()
+
+def get_pack():
+    """The process's model pack, opened on first use; None when there is none or MODEL_PACK=off."""
+    global _pack
+    if _pack is None and MODEL_PACK.lower() not in ("", "0", "off", "false", "no") and os.path.exists(MODEL_PACK):
+        with _pack_lock:
+            if _pack is None:
+                _pack = ModelPack(MODEL_PACK)
+    return _pack
+
+# (path, size, mtime_ns) -> whether that file on disk matches its packed copy
+_unchanged = {}
+
+def packed(path):
+    """The pack entry for path, unless the file on disk has changed since it was packed."""
+    pack = get_pack()
+    entry = pack.entry(path) if pack is not None else None
+    if entry is None:
+        return None
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return entry
+    source = entry['source']
+    if stat.st_size != source['size']:
+        return None
+    if stat.st_mtime_ns != source['mtime_ns']:
+        # Same size but touched since packing (e.g. a fresh checkout): compare contents once
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        if key not in _unchanged:
+            _unchanged[key] = file_sha256(path) == source['sha256']
+        if not _unchanged[key]:
+            return None
+    return entry
+
+def load_pickle(path):
+    if packed(path):
+        return get_pack().load(path)
+    import joblib
+
+    return joblib.load(path)
+
+def load_keras(path):
+    if packed(path):
+        return get_pack().load(path)
+    from tensorflow.keras.models import load_model
+
+    return load_model(path)
+
+def file_source(path):
+    """The file's contents from the pack (as bytes), or its path when it is served from disk."""
+    return bytes(get_pack().load(path)) if packed(path) else path
+
+def exists(path):
+    return os.path.exists(path) or packed(path) is not None
+
+def listdir(directory):
+    """Files in directory on disk and in the pack."""
+    names = set(os.listdir(directory)) if os.path.isdir(directory) else set()
+    pack = get_pack()
+    if pack is not None:
+        names.update(pack.listdir(directory))
+    return sorted(names)
+
+def artifact_sha256(path):
+    """sha256 of an artifact's original contents, without reading it when it is packed."""
+    entry = packed(path)
+    return entry['source']['sha256'] if entry else file_sha256(path)
+
+def file_size(path):
+    entry = packed(path)
+    if entry:
+        return entry['source']['size']
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+def served_files():
+    """Every artifact a registered model can load, including each forecasting backend's model files."""
+    from routers import cluster, dropout, forecasting
+    from services.model_registry import registry
+
+    files = {path for name in registry.names() for path in registry.spec(name).files}
+    for path in forecasting.MODEL_PATHS.values():
+        files.update(forecasting.backend_model_path(path, backend) for backend in forecasting.BACKENDS)
+    return sorted(path for path in map(os.path.abspath, files) if os.path.exists(path))
+
+def build(path, files):
+    writer = PackWriter(path)
+    for file in files:
+        writer.add_file(file)
+    writer.close()
+    return ModelPack(path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect the single-file model pack")
+    parser.add_argument("--output", default=os.path.join(BACKEND_DIR, "models.pack"))
+    parser.add_argument("--list", action="store_true", help="List the entries of --output instead of building it")
+    args = parser.parse_args()
+
+    if not args.list:
+        files = served_files()
+        source_bytes = sum(os.path.getsize(file) for file in files)
+        started = time.perf_counter()
+        pack = build(args.output, files)
+        print(f"✅ Packed {len(files)} files ({source_bytes / 1024:.0f} KB) into {args.output}: "
+              f"{pack.describe()['bytes'] / 1024:.0f} KB, {len(pack.blobs)} blobs, {time.perf_counter() - started:.1f}s")
+    pack = ModelPack(args.output)
+    for name, entry in sorted(pack.entries.items()):
+        parts = [entry.get('pickle'), entry.get('config'), entry.get('data'), *entry.get('buffers', []),
+                 *(digest for digest, _, _ in entry.get('weights', []))]
+        stored = sum(pack.blobs[digest][1] for digest in parts if digest)
+        print(f"   {entry['format']:>6} | {entry['source']['size'] / 1024:7.1f} KB -> {stored / 1024:7.1f} KB | {name}")
+
+if __name__ == "__main__":
+    main()
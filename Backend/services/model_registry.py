@@ -0,0 +1,239 @@
+import gc
+import hashlib
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from services import metrics, model_pack
+
+class ModelSpec:
+    """
+    How to load one servable model: a loader returning the ready object,
+    an optional warmup(obj) running one synthetic inference, and the
+    artifact files used for versioning and on-disk size. fork_safe=False
+    marks models (TensorFlow) that must be loaded in each worker process
+    rather than preloaded before workers fork. refresh(), if given, runs
+    before the model or its version is read, so a model that other worker
+    processes can update (see shared_state) is swapped in first.
+    """
+    def __init__(self, name, kind, loader, files=(), warmup=None, fork_safe=True, refresh=None):
+        self.name = name
+        self.kind = kind
+        self.loader = loader
+        self.files = list(files)
+        self.warmup = warmup
+        self.fork_safe = fork_safe
+        self.refresh = refresh
+
+class LoadedModel:
+    def __init__(self, spec):
+        self.spec = spec
+        self.obj = None
+        self.status = "registered"
+        self.version = None
+        self.error = None
+        self.loaded_at = None
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self.memory_bytes = None
+        self.lock = threading.Lock()
+
+    def describe(self):
+        return {
+            'name': self.spec.name,
+            'kind': self.spec.kind,
+            'status': self.status,
+            'version': self.version,
+            'error': self.error,
+            'loaded_at': self.loaded_at,
+            'load_seconds': self.load_seconds,
+            'warmup_seconds': self.warmup_seconds,
+            'memory_bytes': self.memory_bytes,
+            'artifact_bytes': sum(model_pack.file_size(path) for path in self.spec.files)
+        }
+
+def files_version(paths):
+    """
+    Short content hash over artifact files, the same whether they are
+    served from disk or from the model pack.
+    """
+    digest = hashlib.sha1()
+    for path in paths:
+        digest.update(model_pack.artifact_sha256(path).encode())
+    return digest.hexdigest()[:12]
+
+def estimate_memory_bytes(obj):
+    """
+    Approximate resident size of a loaded model: Keras weights are summed
+    directly, containers and this app's own wrapper classes are walked, and
+    anything else is measured by its pickle size (dominated by the numpy
+    arrays inside sklearn/pandas objects).
+    """
+    if obj is None:
+        return 0
+    if hasattr(obj, 'count_params') and hasattr(obj, 'weights'):
+        return int(sum(w.numpy().nbytes for w in obj.weights))
+    if isinstance(obj, (tuple, list)):
+        return sum(estimate_memory_bytes(item) or 0 for item in obj)
+    if isinstance(obj, dict):
+        return sum(estimate_memory_bytes(item) or 0 for item in obj.values())
+    if type(obj).__module__.startswith(('routers.', 'services.')):
+        return sum(estimate_memory_bytes(item) or 0 for name, item in vars(obj).items()
+                   if not name.startswith('_'))
+    try:
+        return len(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return None
+
+def process_rss_bytes():
+    """Current resident set size of this process, where the platform exposes it."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        try:
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except Exception:
+            return None
+
+class ModelRegistry:
+    """
+    Process-wide registry of every servable model. Routers register specs at
+    import time and read ready objects with get() (a dict lookup once
+    loaded). load_all() loads and warms every registered model concurrently
+    at startup; anything not loaded yet is loaded on first get().
+    """
+    def __init__(self):
+        self._models = {}
+        self._lock = threading.Lock()
+        self.startup = {'status': 'pending'}
+
+    def register(self, spec):
+        with self._lock:
+            if spec.name not in self._models:
+                self._models[spec.name] = LoadedModel(spec)
+        return spec
+
+    def names(self, kind=None):
+        return [name for name, entry in self._models.items() if kind is None or entry.spec.kind == kind]
+
+    def spec(self, name):
+        return self._models[name].spec
+
+    def __contains__(self, name):
+        return name in self._models
+
+    def get(self, name):
+        entry = self._models[name]
+        if entry.spec.refresh is not None:
+            entry.spec.refresh()
+        if entry.status != "ready":
+            if metrics.ENABLED:
+                metrics.MODEL_CACHE.inc((name, "miss"))
+            self._load(entry)
+            if entry.status != "ready":
+                raise RuntimeError(f"Model {name} failed to load: {entry.error}")
+        elif metrics.ENABLED:
+            metrics.MODEL_CACHE.inc((name, "hit"))
+        return entry.obj
+
+    def version(self, name):
+        entry = self._models[name]
+        if entry.spec.refresh is not None:
+            entry.spec.refresh()
+        return entry.version
+
+    def swap(self, name, obj, version=None):
+        """Atomically serve a new object (e.g. an online update) under name."""
+        entry = self._models[name]
+        with entry.lock:
+            entry.obj = obj
+            entry.version = version or getattr(obj, 'version', None) or entry.version
+            entry.memory_bytes = estimate_memory_bytes(obj)
+            entry.loaded_at = time.time()
+            entry.status = "ready"
+            entry.error = None
+
+    def _load(self, entry, warmup=True):
+        with entry.lock:
+            if entry.status == "ready":
+                return entry
+            entry.status = "loading"
+            try:
+                started = time.perf_counter()
+                obj = entry.spec.loader()
+                entry.load_seconds = round(time.perf_counter() - started, 4)
+                if warmup and entry.spec.warmup is not None:
+                    started = time.perf_counter()
+                    entry.spec.warmup(obj)
+                    entry.warmup_seconds = round(time.perf_counter() - started, 4)
+                entry.obj = obj
+                entry.version = getattr(obj, 'version', None) or (files_version(entry.spec.files) if entry.spec.files else None)
+                entry.memory_bytes = estimate_memory_bytes(obj)
+                entry.loaded_at = time.time()
+                entry.error = None
+                entry.status = "ready"
+            except Exception as e:
+                entry.error = str(e)
+                entry.status = "failed"
+        return entry
+
+    def load_all(self, max_workers=None, fork_safe_only=False):
+        """
+        Load and warm every registered model in parallel and record the
+        startup timings; returns the status report. Wall time should track
+        the slowest model rather than the sum of all of them. With
+        fork_safe_only, only models that may be shared with forked worker
+        processes are loaded (see preload_for_fork).
+        """
+        entries = [entry for entry in self._models.values() if entry.spec.fork_safe or not fork_safe_only]
+        self.startup = {'status': 'warming', 'started_at': time.time()}
+        started = time.perf_counter()
+        if entries:
+            with ThreadPoolExecutor(max_workers=max_workers or len(entries), thread_name_prefix="model-load") as pool:
+                list(pool.map(self._load, entries))
+
+        timings = {entry.spec.name: (entry.load_seconds or 0) + (entry.warmup_seconds or 0) for entry in entries}
+        slowest = max(timings, key=timings.get) if timings else None
+        self.startup = {
+            'status': 'ready' if self.is_ready() else 'degraded',
+            'started_at': self.startup['started_at'],
+            'wall_seconds': round(time.perf_counter() - started, 4),
+            'sum_seconds': round(sum(timings.values()), 4),
+            'slowest_model': slowest,
+            'slowest_seconds': round(timings[slowest], 4) if slowest else None,
+            'failed_models': [entry.spec.name for entry in entries if entry.status == "failed"]
+        }
+        return self.status()
+
+    def preload_for_fork(self, max_workers=None):
+        """
+        Load fork-safe models in a server's master process before it forks
+        workers, then freeze the garbage collector so the loaded objects are
+        not touched (and copied) by collections in each worker. Workers
+        share those pages copy-on-write and load the rest at startup.
+        """
+        report = self.load_all(max_workers, fork_safe_only=True)
+        gc.collect()
+        gc.freeze()
+        return report
+
+    def is_ready(self):
+        """True once every registered model is loaded and warmed."""
+        return all(entry.status == "ready" for entry in self._models.values())
+
+    def status(self):
+        for entry in self._models.values():
+            if entry.spec.refresh is not None and entry.status == "ready":
+                entry.spec.refresh()
+        models = [entry.describe() for entry in self._models.values()]
+        return {
+            'ready': all(model['status'] == "ready" for model in models),
+            'startup': self.startup,
+            'process_rss_bytes': process_rss_bytes(),
+            'models': models
+        }
+
+registry = ModelRegistry()
@@ -0,0 +1,280 @@
+"""
+Append-only columnar log of served predictions, for retraining and replay.
+
+    python -m services.prediction_log                  # files and rows per stream
+    python test/benchmark.py --replay prediction_logs  # benchmark with logged inputs
+
+Routers hand each served prediction (the input model and the result dict,
+or lists / frames of them for batches) to log(), which only appends a
+reference to an in-memory ring buffer. A background thread drains the
+buffer every PREDICTION_LOG_FLUSH_SECONDS, or as soon as it holds
+PREDICTION_LOG_FLUSH_ROWS rows, converts the entries to Arrow and
+appends them to one file per stream:
+
+    <PREDICTION_LOG_DIR>/<stream>/<stream>-<UTC time>-<pid>-<n>.parquet
+
+with columns logged_at, model_version, input (struct) and output (struct,
+without the echoed input and static advice). The file being written ends
+in .open and is renamed when it is rotated (PREDICTION_LOG_ROTATE_MB,
+PREDICTION_LOG_ROTATE_SECONDS, or a change of schema), so every file
+without the suffix is complete and immutable. When the buffer holds
+PREDICTION_LOG_BUFFER rows new entries are dropped and counted in prediction_log_records_total
+{result="dropped"}; the request path never waits for the disk.
+"""
+import argparse
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from services import metrics
+from services.responses import ECHO_FIELDS
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# parquet, arrow (IPC file), or off
+FORMAT = os.getenv("PREDICTION_LOG", "parquet").lower()
+LOG_DIR = os.getenv("PREDICTION_LOG_DIR", os.path.join(BACKEND_DIR, "prediction_logs"))
+BUFFER_SIZE = int(os.getenv("PREDICTION_LOG_BUFFER", "10000"))
+FLUSH_ROWS = int(os.getenv("PREDICTION_LOG_FLUSH_ROWS", "1000"))
+FLUSH_SECONDS = float(os.getenv("PREDICTION_LOG_FLUSH_SECONDS", "5"))
+ROTATE_BYTES = int(float(os.getenv("PREDICTION_LOG_ROTATE_MB", "64")) * 1024 ** 2)
+ROTATE_SECONDS = float(os.getenv("PREDICTION_LOG_ROTATE_SECONDS", "3600"))
+
+EXTENSIONS = {'parquet': ".parquet", 'arrow': ".arrow"}
+OPEN_SUFFIX = ".open"
+
+def as_rows(values):
+    """One record, a list of records or a DataFrame as a list of plain dicts."""
+    if hasattr(values, 'to_dict') and not isinstance(values, dict):
+        return values.to_dict('records')
+    if not isinstance(values, list):
+        values = [values]
+    return [value.model_dump() if hasattr(value, 'model_dump') else value for value in values]
+
+def row_count(values):
+    """Number of rows log() queues for an entry: one record, or the length of a list / DataFrame."""
+    return len(values) if isinstance(values, list) or hasattr(values, 'to_dict') and not isinstance(values, dict) else 1
+
+def output_row(result):
+    return {key: value for key, value in result.items() if key not in ECHO_FIELDS}
+
+class LogFile:
+    """The file a stream is currently appending to; closed files are renamed to their final name."""
+    def __init__(self, directory, stream, format, schema, sequence):
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self.path = os.path.join(directory, f"{stream}-{stamp}-{os.getpid()}-{sequence}{EXTENSIONS[format]}")
+        self.schema = schema
+        self.opened_at = time.monotonic()
+        self.rows = 0
+        if format == "parquet":
+            self._writer = pq.ParquetWriter(self.path + OPEN_SUFFIX, schema, compression='zstd')
+        else:
+            self._sink = pa.OSFile(self.path + OPEN_SUFFIX, 'wb')
+            self._writer = ipc.new_file(self._sink, schema)
+
+    def write(self, table):
+        self._writer.write_table(table)
+        self.rows += table.num_rows
+
+    def size(self):
+        return os.path.getsize(self.path + OPEN_SUFFIX)
+
+    def close(self):
+        self._writer.close()
+        if hasattr(self, '_sink'):
+            self._sink.close()
+        os.replace(self.path + OPEN_SUFFIX, self.path)
+        return self.path
+
+class PredictionLogger:
+    def __init__(self, directory=LOG_DIR, format=FORMAT, capacity=BUFFER_SIZE, flush_rows=FLUSH_ROWS,
+                 flush_seconds=FLUSH_SECONDS, rotate_bytes=ROTATE_BYTES, rotate_seconds=ROTATE_SECONDS):
+        if format not in (*EXTENSIONS, "off"):
+            raise ValueError(f"PREDICTION_LOG must be one of {', '.join(EXTENSIONS)} or off, not {format!r}")
+        self.directory = directory
+        self.format = format
+        self.capacity = capacity
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self._buffer = deque()
+        # Rows in the buffer; capacity and flush_rows count rows, not entries
+        self._rows = 0
+        self._rows_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._stopping = False
+        # Serializes flushes (the background thread, stop() and explicit flush() calls)
+        self._flush_lock = threading.Lock()
+        self._files = {}
+        self._sequence = 0
+
+    def start(self):
+        """Start the background writer; until then (or with PREDICTION_LOG=off) log() is a no-op."""
+        if self.format == "off" or self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="prediction-log", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Write what is buffered, close every file and stop the writer."""
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        thread.join()
+
+    def log(self, stream, inputs, outputs, version=None):
+        """
+        Queue served predictions: an input model and its result dict, or
+        equal-length lists / DataFrames of them. Never blocks; returns
+        False when the entry was dropped because the buffer is full.
+        """
+        if self._thread is None:
+            return False
+        rows = row_count(inputs)
+        with self._rows_lock:
+            if self._rows + rows > self.capacity:
+                metrics.PREDICTION_LOG.inc((stream, "dropped"), rows)
+                return False
+            self._rows += rows
+            self._buffer.append((stream, time.time(), version, inputs, outputs, rows))
+            full = self._rows >= self.flush_rows
+        if full:
+            self._wake.set()
+        return True
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self.flush()
+        self.flush()
+        with self._flush_lock:
+            for stream in list(self._files):
+                self._close(stream)
+
+    def flush(self):
+        """Drain the buffer into the stream files; returns the number of rows written."""
+        with self._flush_lock:
+            with self._rows_lock:
+                entries = [self._buffer.popleft() for _ in range(len(self._buffer))]
+                self._rows -= sum(entry[-1] for entry in entries)
+            streams = {}
+            for stream, logged_at, version, inputs, outputs, count in entries:
+                try:
+                    converted = [{'logged_at': logged_at, 'model_version': version,
+                                  'input': input, 'output': output_row(output)}
+                                 for input, output in zip(as_rows(inputs), as_rows(outputs))]
+                except Exception as e:
+                    # One malformed entry must not take the writer thread down with it
+                    print(f"⚠️ Prediction log {stream}: {count} rows not converted: {e}")
+                    metrics.PREDICTION_LOG.inc((stream, "failed"), count)
+                    continue
+                streams.setdefault(stream, []).extend(converted)
+            written = 0
+            for stream, rows in streams.items():
+                try:
+                    self._write(stream, rows)
+                    written += len(rows)
+                    metrics.PREDICTION_LOG.inc((stream, "written"), len(rows))
+                except Exception as e:
+                    print(f"⚠️ Prediction log {stream}: {len(rows)} rows not written: {e}")
+                    metrics.PREDICTION_LOG.inc((stream, "failed"), len(rows))
+            for stream, file in list(self._files.items()):
+                if time.monotonic() - file.opened_at > self.rotate_seconds:
+                    self._close(stream)
+            return written
+
+    def _write(self, stream, rows):
+        file = self._files.get(stream)
+        table = None
+        if file is not None:
+            try:
+                table = pa.Table.from_pylist(rows, schema=file.schema)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, KeyError):
+                # New fields or a column that was all null so far: continue in a new file
+                self._close(stream)
+                file = None
+        if file is None:
+            table = table if table is not None else pa.Table.from_pylist(rows)
+            self._sequence += 1
+            file = self._files[stream] = LogFile(os.path.join(self.directory, stream), stream, self.format,
+                                                 table.schema, self._sequence)
+        file.write(table)
+        if file.size() >= self.rotate_bytes:
+            self._close(stream)
+
+    def _close(self, stream):
+        file = self._files.pop(stream, None)
+        if file is not None:
+            file.close()
+
+    def describe(self):
+        return {
+            'format': self.format,
+            'directory': self.directory,
+            'running': self._thread is not None,
+            'buffered': self._rows,
+            'capacity': self.capacity,
+            'open_files': {stream: file.path + OPEN_SUFFIX for stream, file in self._files.items()}
+        }
+
+def log_files(directory=LOG_DIR, stream=None):
+    """Completed log files, oldest first (files still being written are skipped)."""
+    files = []
+    for name in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+        if stream is not None and name != stream:
+            continue
+        folder = os.path.join(directory, name)
+        if os.path.isdir(folder):
+            files.extend(os.path.join(folder, file) for file in os.listdir(folder) if file.endswith(tuple(EXTENSIONS.values())))
+    return sorted(files, key=os.path.getmtime)
+
+def read_file(path, columns=None):
+    if path.endswith(".arrow"):
+        table = ipc.open_file(pa.memory_map(path, 'r')).read_all()
+        return table.select(columns) if columns else table
+    return pq.read_table(path, columns=columns, memory_map=True)
+
+def logged_inputs(stream, directory=LOG_DIR, limit=None):
+    """Inputs of the most recent logged predictions of a stream, oldest first, as request bodies."""
+    inputs = []
+    for path in reversed(log_files(directory, stream)):
+        rows = read_file(path, ['input']).column('input').to_pylist()
+        inputs[:0] = rows
+        if limit and len(inputs) >= limit:
+            return inputs[-limit:]
+    return inputs
+
+prediction_logger = PredictionLogger()
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize the prediction logs")
+    parser.add_argument("--dir", default=LOG_DIR)
+    args = parser.parse_args()
+
+    files = log_files(args.dir)
+    if not files:
+        print(f"No prediction logs in {args.dir}")
+    streams = {}
+    for path in files:
+        stream = os.path.basename(os.path.dirname(path))
+        metadata = pq.read_metadata(path) if path.endswith(".parquet") else None
+        rows = metadata.num_rows if metadata else read_file(path).num_rows
+        count, total_rows, size = streams.get(stream, (0, 0, 0))
+        streams[stream] = (count + 1, total_rows + rows, size + os.path.getsize(path))
+    for stream, (count, rows, size) in streams.items():
+        print(f"✅ {stream}: {rows} predictions in {count} files ({size / 1024:.1f} KB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+On-demand profiling of a live worker, for routers/debug.py.
+
+Everything here is off unless DEBUG_TOKEN is set: main.py then mounts
+/debug and ProfileMiddleware, and every use needs the token in an
+X-Debug-Token header. Nothing runs between captures.
+
+- sample_stacks: a sampling profiler over every thread of the process
+  (event loop, executor threads, model loading). It reads
+  sys._current_frames() every few milliseconds, so profiled code runs
+  unmodified; process-pool workers are not sampled.
+- memory_report: tracemalloc's top allocations, resident memory per
+  mapped file or package from /proc/self/smaps, and the registry's
+  estimate per model.
+- ProfileMiddleware: a request sent with `X-Profile: 1` gets its spans
+  back in a Server-Timing header.
+"""
+import hmac
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+
+from services import metrics
+from services.model_registry import process_rss_bytes, registry
+
+DEBUG_TOKEN = os.getenv("DEBUG_TOKEN", "")
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MAX_PROFILE_SECONDS = 60
+# Innermost frames of threads that are waiting rather than working
+IDLE_FRAMES = {
+    ("threading", "Condition.wait"), ("threading", "Event.wait"), ("threading", "Thread._wait_for_tstate_lock"),
+    ("selectors", "EpollSelector.select"), ("selectors", "PollSelector.select"), ("selectors", "SelectSelector.select"),
+    ("queue", "Queue.get"), ("concurrent.futures.thread", "_worker"), ("multiprocessing.connection", "wait"),
+}
+
+_capture_lock = threading.Lock()
+
+def authorized(token):
+    return bool(DEBUG_TOKEN) and hmac.compare_digest(token or "", DEBUG_TOKEN)
+
+def _frame_name(frame):
+    return frame.f_globals.get('__name__', '?'), frame.f_code.co_qualname
+
+def sample_stacks(seconds, interval=0.005, include_idle=False):
+    """
+    Sample the stack of every other thread each `interval` seconds for
+    `seconds`. Returns (Counter of collapsed stacks, number of sampling
+    rounds); a collapsed stack is "thread;module:function;..." from the
+    outermost frame in, as flamegraph.pl and speedscope read them.
+    Raises RuntimeError if another capture is running.
+    """
+    if not _capture_lock.acquire(blocking=False):
+        raise RuntimeError("A profile is already being captured")
+    try:
+        me = threading.get_ident()
+        counts = Counter()
+        rounds = 0
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                if not include_idle and _frame_name(frame) in IDLE_FRAMES:
+                    continue
+                stack = []
+                while frame is not None:
+                    module, function = _frame_name(frame)
+                    stack.append(f"{module}:{function}")
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                counts[';'.join(reversed(stack))] += 1
+            rounds += 1
+            time.sleep(interval)
+        return counts, rounds
+    finally:
+        _capture_lock.release()
+
+def collapsed(counts):
+    return ''.join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+def top_functions(counts, limit=30):
+    """Functions by samples spent in them (self) and under them (total)."""
+    own, total = Counter(), Counter()
+    for stack, count in counts.items():
+        frames = stack.split(';')[1:]
+        if frames:
+            own[frames[-1]] += count
+        for function in set(frames):
+            total[function] += count
+    samples = sum(counts.values()) or 1
+    return [{
+        'function': function,
+        'self_samples': own[function],
+        'total_samples': samples_in,
+        'self_percent': round(100 * own[function] / samples, 2),
+        'total_percent': round(100 * samples_in / samples, 2)
+    } for function, samples_in in total.most_common(limit)]
+
+def _mapping_owner(path):
+    """What a mapped region belongs to: a package, a file of this app, or the kernel's label."""
+    if not path:
+        return "[anonymous]"
+    if path.startswith('['):
+        return path
+    marker = "-packages/"
+    if marker in path:
+        return path.split(marker, 1)[1].split('/', 1)[0]
+    if path.startswith(BACKEND_DIR):
+        return os.path.relpath(path, BACKEND_DIR)
+    return os.path.basename(path)
+
+def mapped_rss(limit=20):
+    """Resident bytes per mapping owner from /proc/self/smaps (Linux only; empty elsewhere)."""
+    owners = defaultdict(int)
+    try:
+        with open("/proc/self/smaps") as f:
+            owner = None
+            for line in f:
+                if line.startswith("Rss:"):
+                    owners[owner] += int(line.split()[1]) * 1024
+                elif not line.split(maxsplit=1)[0].endswith(':'):
+                    # A mapping header: address perms offset dev inode [path]
+                    fields = line.split(maxsplit=5)
+                    owner = _mapping_owner(fields[5].strip() if len(fields) > 5 else "")
+    except OSError:
+        return []
+    top = sorted(owners.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return [{'mapping': owner, 'rss_bytes': rss} for owner, rss in top if rss]
+
+def top_allocations(snapshot, limit=20):
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ))
+    return [{
+        'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+        'size_bytes': stat.size,
+        'count': stat.count
+    } for stat in snapshot.statistics('lineno')[:limit]]
+
+def memory_report(limit=20, trace_seconds=0.0):
+    """
+    Process memory broken down by mapping and by model. Python allocations
+    come from tracemalloc: live ones when it has been tracing since startup
+    (PYTHONTRACEMALLOC=1), otherwise those made during the next
+    trace_seconds, since tracing slows every allocation down.
+    """
+    allocations, traced = None, None
+    if tracemalloc.is_tracing():
+        allocations, traced = top_allocations(tracemalloc.take_snapshot(), limit), "since startup"
+    elif trace_seconds > 0:
+        if not _capture_lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already being captured")
+        try:
+            tracemalloc.start()
+            time.sleep(trace_seconds)
+            snapshot = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+            _capture_lock.release()
+        allocations, traced = top_allocations(snapshot, limit), f"last {trace_seconds}s"
+    return {
+        'process_rss_bytes': process_rss_bytes(),
+        'models': [{key: model[key] for key in ('name', 'kind', 'status', 'memory_bytes', 'artifact_bytes')}
+                   for model in registry.status()['models']],
+        'mappings': mapped_rss(limit),
+        'allocations': allocations,
+        'allocations_traced': traced
+    }
+
+def server_timing(spans, started, total):
+    """Spans as a Server-Timing header value, in the order they started, plus the request total."""
+    entries = [f"{name};dur={seconds * 1000:.3f};desc=\"+{(start - started) * 1000:.3f}ms\""
+               for name, start, seconds in sorted(spans, key=lambda item: item[1])]
+    entries.append(f"total;dur={total * 1000:.3f}")
+    return ', '.join(entries)
+
+class ProfileMiddleware:
+    """
+    Adds a Server-Timing header listing the spans (and when each started)
+    of requests sent with `X-Profile: 1` and a valid X-Debug-Token. Only
+    mounted when DEBUG_TOKEN is set; other requests pass straight through.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope['headers'])
+        if headers.get(b'x-profile') != b'1' or not authorized(headers.get(b'x-debug-token', b'').decode('latin-1')):
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        with metrics.collect_spans() as spans:
+            async def send_with_timing(message):
+                if message['type'] == 'http.response.start':
+                    value = server_timing(spans, started, time.perf_counter() - started)
+                    message['headers'] = [*message.get('headers', []), (b'server-timing', value.encode('latin-1'))]
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
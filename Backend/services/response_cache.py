@@ -0,0 +1,173 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import orjson
+
+from services import metrics
+from services.responses import json_default
+
+REDIS_TIMEOUT_SECONDS = 0.05
+
+def canonical_key(namespace, version, payload):
+    """
+    namespace:version:hash of a validated Pydantic input. Keys are dumped in
+    sorted order, so equal inputs hash equally whatever the field order of
+    the request; a new model version gets new keys.
+    """
+    data = payload.model_dump(mode='json') if hasattr(payload, 'model_dump') else payload
+    digest = hashlib.sha256(orjson.dumps(data, option=orjson.OPT_SORT_KEYS)).hexdigest()[:32]
+    return f"{namespace}:{version}:{digest}"
+
+def is_cacheable(value):
+    return not (isinstance(value, dict) and 'error' in value)
+
+class ResponseCache:
+    """
+    Response cache shared by the routers: an in-process LRU with per-entry
+    TTLs in front of an optional Redis tier (any redis.asyncio-compatible
+    client, e.g. fakeredis.FakeAsyncRedis in tests).
+
+    get_or_compute is single-flight: concurrent requests for a key that is
+    being computed wait for that computation instead of starting their own.
+    The computation runs in its own task, so cancelling any one of the
+    requests waiting on it (the first included) does not cancel it.
+    Error dicts are never stored. Cached values are shared between requests
+    and must not be mutated. Redis failures and slow replies are counted and
+    treated as misses, so the cache can never take the API down.
+    """
+    def __init__(self, max_entries=10000, ttl_seconds=300, redis=None, redis_ttl_seconds=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.redis = redis
+        self.redis_ttl_seconds = redis_ttl_seconds or ttl_seconds
+        self.stats = {'local_hits': 0, 'redis_hits': 0, 'coalesced': 0, 'misses': 0, 'redis_errors': 0}
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """
+        RESPONSE_CACHE_SIZE entries (0 disables caching), RESPONSE_CACHE_TTL
+        seconds, and a Redis tier when REDIS_URL is set.
+        """
+        redis = None
+        if os.getenv("REDIS_URL"):
+            import redis.asyncio as redis_asyncio
+            redis = redis_asyncio.from_url(os.environ["REDIS_URL"])
+        return cls(int(os.getenv("RESPONSE_CACHE_SIZE", "10000")),
+                   float(os.getenv("RESPONSE_CACHE_TTL", "300")), redis)
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def _record(self, namespace, result):
+        self.stats[result] += 1
+        if metrics.ENABLED:
+            metrics.RESPONSE_CACHE.inc((namespace, result))
+
+    def get_local(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set_local(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def _get_redis(self, namespace, key):
+        try:
+            data = await asyncio.wait_for(self.redis.get(key), REDIS_TIMEOUT_SECONDS)
+            return orjson.loads(data) if data is not None else None
+        except Exception:
+            self._record(namespace, 'redis_errors')
+            return None
+
+    async def _set_redis(self, namespace, key, value):
+        try:
+            data = orjson.dumps(value, default=json_default, option=orjson.OPT_SERIALIZE_NUMPY)
+            await asyncio.wait_for(self.redis.set(key, data, ex=max(1, int(self.redis_ttl_seconds))),
+                                   REDIS_TIMEOUT_SECONDS)
+        except Exception:
+            self._record(namespace, 'redis_errors')
+
+    async def get_or_compute(self, namespace, version, payload, compute):
+        """
+        The cached response for (namespace, model version, payload), or
+        `await compute()` stored in both tiers.
+        """
+        if not self.enabled:
+            return await compute()
+
+        key = canonical_key(namespace, version, payload)
+        value = self.get_local(key)
+        if value is not None:
+            self._record(namespace, 'local_hits')
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._record(namespace, 'coalesced')
+        else:
+            # Detached from the request that started it: a leader that is
+            # cancelled (client gone, timeout) only stops waiting, and the
+            # requests coalesced onto it still get the value
+            task = asyncio.get_running_loop().create_task(self._fill(namespace, key, compute))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._settle(key, done))
+        return await asyncio.shield(task)
+
+    async def _fill(self, namespace, key, compute):
+        value = await self._get_redis(namespace, key) if self.redis is not None else None
+        if value is not None:
+            self._record(namespace, 'redis_hits')
+            self.set_local(key, value)
+            return value
+        self._record(namespace, 'misses')
+        value = await compute()
+        if is_cacheable(value):
+            self.set_local(key, value)
+            if self.redis is not None:
+                await self._set_redis(namespace, key, value)
+        return value
+
+    def _settle(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark retrieved: every waiter may have been cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def describe(self):
+        lookups = sum(self.stats[result] for result in ('local_hits', 'redis_hits', 'coalesced', 'misses'))
+        hits = lookups - self.stats['misses']
+        return {
+            'enabled': self.enabled,
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'redis': self.redis is not None,
+            **self.stats,
+            'hit_ratio': round(hits / lookups, 4) if lookups else None
+        }
+
+response_cache = ResponseCache.from_env()
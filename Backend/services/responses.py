@@ -0,0 +1,57 @@
+from typing import Optional
+
+import numpy as np
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ConfigDict
+
+# Keys that only echo the request or repeat static advice; dropped by compact=true
+ECHO_FIELDS = ('recommendations', 'input_data', 'input_parameters')
+
+def json_default(obj):
+    """orjson fallback for numpy/pandas values OPT_SERIALIZE_NUMPY does not cover."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+class NumpyJSONResponse(JSONResponse):
+    """JSON response rendered by orjson, with numpy scalars and arrays serialized natively."""
+    def render(self, content):
+        return orjson.dumps(content, default=json_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+class ErrorResponse(BaseModel):
+    """The error dict every router returns (with status 200) instead of raising."""
+    model_config = ConfigDict(extra='allow')
+
+    error: str
+    status: Optional[str] = None
+
+class SlimModel(BaseModel):
+    """
+    Base for success response models: every field is optional so fields=
+    and compact=true can leave keys out, and unknown keys are rejected so
+    error dicts validate as ErrorResponse instead.
+    """
+    model_config = ConfigDict(extra='forbid')
+
+def parse_fields(fields):
+    return {field.strip() for field in fields.split(',') if field.strip()} if fields else None
+
+def slim(result, fields=None, compact=False):
+    """
+    Drop ECHO_FIELDS (compact) and keep only the comma-separated top-level
+    keys in fields; error dicts are returned untouched.
+    """
+    if not isinstance(result, dict) or 'error' in result:
+        return result
+    if compact:
+        result = {key: value for key, value in result.items() if key not in ECHO_FIELDS}
+    keep = parse_fields(fields)
+    if keep:
+        result = {key: value for key, value in result.items() if key in keep}
+    return result
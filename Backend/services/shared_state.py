@@ -0,0 +1,71 @@
+"""
+State that endpoints change at runtime, shared by every gunicorn worker
+and kept across restarts.
+
+Each worker serves from its own memory; what an update changes is also
+written under STATE_DIR (default Backend/state), and the other workers
+pick it up on their next request. Writers hold a file lock around the
+whole read-modify-write, and every file is replaced atomically, so
+readers never see half of one. This is the same scheme batch jobs use
+for job.json.
+
+Without fcntl (Windows) the locks only cover the threads of one process,
+so run a single worker there.
+"""
+import os
+import pickle
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE_DIR = os.getenv("STATE_DIR", os.path.join(BACKEND_DIR, "state"))
+
+def path(*parts):
+    return os.path.join(STATE_DIR, *parts)
+
+_local_locks = {}
+_local_locks_guard = threading.Lock()
+
+@contextmanager
+def locked(name, shared=False):
+    """Hold STATE_DIR/<name>.lock across processes; shared=True takes a read lock."""
+    if fcntl is None:
+        with _local_locks_guard:
+            lock = _local_locks.setdefault(name, threading.Lock())
+        with lock:
+            yield
+        return
+    os.makedirs(STATE_DIR, exist_ok=True)
+    fd = os.open(path(f"{name}.lock"), os.O_RDWR | os.O_CREAT)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+def stamp(file):
+    """Identifies one version of a file (it changes whenever the file is replaced or appended to); None if missing."""
+    try:
+        st = os.stat(file)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+def write_pickle(file, obj):
+    os.makedirs(os.path.dirname(file), exist_ok=True)
+    with open(f"{file}.tmp", 'wb') as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(f"{file}.tmp", file)
+
+def read_pickle(file, default=None):
+    try:
+        with open(file, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return default
@@ -0,0 +1,371 @@
+"""
+Load test and benchmark harness for the API.
+
+Runs every scenario against the app in-process (httpx ASGI transport, with
+the real lifespan so models are loaded and warmed) or against a live server
+with --url. Payloads are sampled from the datasets in data/, or with --replay
+from the inputs served predictions were logged with. Each scenario is
+driven by --concurrency workers for --requests requests and reports
+p50/p95/p99 latency, RPS and errors; results are written as JSON, and
+--baseline compares against an earlier run to flag regressions.
+
+The response cache is off in-process, so every request runs the model;
+--cache leaves it on and reports the latency of the first request for
+each payload (a miss) apart from its repeats (hits). Against --url the
+server's RESPONSE_CACHE_SIZE decides, and misses are only misses on a
+freshly started server.
+
+    python test/benchmark.py
+    python test/benchmark.py --url http://localhost:8000 --concurrency 16 --requests 500
+    python test/benchmark.py --scenarios cluster.predict,dropout.predict --baseline test/results/<earlier>.json
+    python test/benchmark.py --replay prediction_logs
+    python test/benchmark.py --cache --scenarios cluster.predict
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import warnings
+from datetime import datetime, timezone
+
+import httpx
+import numpy as np
+
+warnings.filterwarnings('ignore')
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from services.datasets import AREAS, DROPOUT, FORECAST
+from services.prediction_log import logged_inputs
+
+RESULTS_DIR = os.path.join(BACKEND_DIR, "test", "results")
+
+class Scenario:
+    """
+    One endpoint under load: a method, path and a cycle of prepared
+    requests; cached scenarios go through the response cache.
+    """
+    def __init__(self, name, method, path, requests, cached=False):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.requests = requests
+        self.cached = cached
+
+    def request(self, i):
+        """(params, json body) for the i-th request."""
+        return self.requests[i % len(self.requests)]
+
+def forecast_payloads(rng, n):
+    rows = FORECAST.frame(['District', 'Vaccine Type', 'Temperature', 'Rainfall', 'Stock Left',
+                           'Holiday Indicator']).to_dict('records')
+    return [(None, {
+        'district': row['District'],
+        'vaccine_type': row['Vaccine Type'],
+        'temperature': round(float(row['Temperature']), 2),
+        'rainfall': round(float(row['Rainfall']), 2),
+        'stock_left': int(row['Stock Left']),
+        'holiday_indicator': int(row['Holiday Indicator'])
+    }) for row in rng.choices(rows, k=n)]
+
+def dropout_payloads(rng, n):
+    rows = DROPOUT.frame().to_dict('records')
+    return [(None, {
+        'gender': row['Gender'],
+        'age': int(row['Age']),
+        'travel_time': int(row['Travel Time']),
+        'parent_education': row['Parent Education'],
+        'dose1_date': row['Dose1 Date'].strftime('%Y-%m-%d'),
+        'dose2_date': row['Dose2 Date'].strftime('%Y-%m-%d'),
+        'distance_to_center': round(float(row['Distance to Center']), 2),
+        'delay_days': int(row['Delay_Days'])
+    }) for row in rng.choices(rows, k=n)]
+
+def area_records():
+    return AREAS.frame().to_dict('records')
+
+def cluster_input(row):
+    return {
+        'area_id': str(row['Area ID']),
+        'city_name': row['City Name'],
+        'district_name': row['District Name'],
+        'latitude': float(row['Latitude']),
+        'longitude': float(row['Longitude']),
+        'zero_dose_count': int(row['Zero-dose Count']),
+        'income': round(float(row['Income']), 2),
+        'travel_time': round(float(row['Travel Time']), 2),
+        'literacy_rate': round(float(row['Literacy Rate']), 2)
+    }
+
+def cluster_payloads(rng, n):
+    return [(None, cluster_input(row)) for row in rng.choices(area_records(), k=n)]
+
+def cluster_batch_payloads(rng, n, batch_size):
+    rows = area_records()
+    return [(None, [cluster_input(row) for row in rng.choices(rows, k=batch_size)]) for _ in range(n)]
+
+def nearby_payloads(rng, n):
+    return [({'lat': row['Latitude'], 'lon': row['Longitude'], 'radius_km': 25}, None)
+            for row in rng.choices(area_records(), k=n)]
+
+def replay_scenarios(log_dir, batch_size=100, distinct=64):
+    """
+    Scenarios whose payloads are the most recent `distinct` logged inputs of
+    each prediction log stream, in the order they were served; streams
+    without logs are left out.
+    """
+    forecast, dropout, cluster = (logged_inputs(stream, log_dir, distinct * batch_size)
+                                  for stream in ("forecast", "dropout", "cluster"))
+    scenarios = [
+        Scenario("forecast.predict", "POST", "/api/forecast/predict", [(None, body) for body in forecast[-distinct:]],
+                 cached=True),
+        Scenario("dropout.predict", "POST", "/api/dropout/predict", [(None, body) for body in dropout[-distinct:]],
+                 cached=True),
+        Scenario("dropout.predict_batch", "POST", "/api/dropout/predict-batch",
+                 [(None, dropout[start:start + batch_size]) for start in range(0, len(dropout), batch_size)][-8:]),
+        Scenario("cluster.predict", "POST", "/api/cluster/predict", [(None, body) for body in cluster[-distinct:]],
+                 cached=True),
+        Scenario("cluster.predict_batch", "POST", "/api/cluster/predict-batch",
+                 [(None, cluster[start:start + batch_size]) for start in range(0, len(cluster), batch_size)][-8:]),
+        Scenario("cluster.nearby", "GET", "/api/cluster/nearby",
+                 [({'lat': body['latitude'], 'lon': body['longitude'], 'radius_km': 25}, None) for body in cluster[-distinct:]])
+    ]
+    return {scenario.name: scenario for scenario in scenarios if scenario.requests}
+
+def build_scenarios(seed=42, batch_size=100, distinct=64, replay=None):
+    """Every benchmark scenario with `distinct` sampled payloads each (or logged ones, with replay)."""
+    if replay:
+        return replay_scenarios(replay, batch_size, distinct)
+    rng = random.Random(seed)
+    return {scenario.name: scenario for scenario in [
+        Scenario("forecast.predict", "POST", "/api/forecast/predict", forecast_payloads(rng, distinct), cached=True),
+        Scenario("dropout.predict", "POST", "/api/dropout/predict", dropout_payloads(rng, distinct), cached=True),
+        Scenario("cluster.predict", "POST", "/api/cluster/predict", cluster_payloads(rng, distinct), cached=True),
+        Scenario("cluster.predict_batch", "POST", "/api/cluster/predict-batch",
+                 cluster_batch_payloads(rng, min(distinct, 8), batch_size)),
+        Scenario("cluster.nearby", "GET", "/api/cluster/nearby", nearby_payloads(rng, distinct)),
+        Scenario("cluster.map", "GET", "/api/cluster/map", [(None, None)])
+    ]}
+
+def is_error(response):
+    """HTTP errors, and the error dicts the routers return with status 200."""
+    if response.status_code >= 400:
+        return True
+    if response.headers.get('content-type', '').startswith('application/json'):
+        body = response.json()
+        return isinstance(body, dict) and 'error' in body
+    return False
+
+def latency_summary(latencies):
+    latencies_ms = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {
+        'mean': round(float(latencies_ms.mean()), 3),
+        'p50': round(float(p50), 3),
+        'p95': round(float(p95), 3),
+        'p99': round(float(p99), 3),
+        'max': round(float(latencies_ms.max()), 3)
+    }
+
+async def run_scenario(client, scenario, requests, concurrency, warmup, cache=False, clear_cache=None):
+    """
+    With cache, requests of a cached scenario are split into the first for
+    each distinct payload (a miss) and its repeats (hits); clear_cache runs
+    after the warmup so the warmup's payloads are missed again.
+    """
+    for i in range(warmup):
+        params, body = scenario.request(i)
+        await client.request(scenario.method, scenario.path, params=params, json=body)
+    if clear_cache is not None:
+        clear_cache()
+
+    split = cache and scenario.cached
+    latencies = []
+    misses = []
+    seen = set()
+    statuses = {}
+    errors = 0
+    counter = itertools.count()
+
+    async def worker():
+        nonlocal errors
+        while (i := next(counter)) < requests:
+            params, body = scenario.request(i)
+            payload = json.dumps([params, body], sort_keys=True) if split else None
+            miss = payload not in seen
+            seen.add(payload)
+            started = time.perf_counter()
+            try:
+                response = await client.request(scenario.method, scenario.path, params=params, json=body)
+            except httpx.HTTPError as e:
+                latencies.append(time.perf_counter() - started)
+                misses.append(miss)
+                statuses[type(e).__name__] = statuses.get(type(e).__name__, 0) + 1
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            misses.append(miss)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+            errors += is_error(response)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    result = {
+        'method': scenario.method,
+        'path': scenario.path,
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'errors': int(errors),
+        'statuses': statuses,
+        'wall_seconds': round(wall, 4),
+        'rps': round(len(latencies) / wall, 2),
+        'latency_ms': latency_summary(latencies)
+    }
+    if split:
+        hits = [latency for latency, miss in zip(latencies, misses) if not miss]
+        cold = [latency for latency, miss in zip(latencies, misses) if miss]
+        result['cache_misses'] = len(cold)
+        if cold:
+            result['miss_latency_ms'] = latency_summary(cold)
+        if hits:
+            result['hit_latency_ms'] = latency_summary(hits)
+    return result
+
+async def run_all(scenarios, url, requests, concurrency, warmup, timeout, cache=False):
+    results = {}
+    if url:
+        async with httpx.AsyncClient(base_url=url, timeout=timeout) as client:
+            for scenario in scenarios:
+                results[scenario.name] = await run_scenario(client, scenario, requests, concurrency, warmup, cache)
+        return results
+
+    from main import app
+    from services.response_cache import response_cache
+    if not cache:
+        # Measure the models, not repeats of the sampled payloads served from memory
+        response_cache.max_entries = 0
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=timeout) as client:
+            for scenario in scenarios:
+                results[scenario.name] = await run_scenario(client, scenario, requests, concurrency, warmup, cache,
+                                                            response_cache.clear if cache else None)
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_results(results):
+    print(f"{'scenario':<24}{'reqs':>7}{'errs':>6}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, result in results.items():
+        latency = result['latency_ms']
+        status = "✅" if result['errors'] == 0 else "❌"
+        print(f"{status} {name:<22}{result['requests']:>7}{result['errors']:>6}{result['rps']:>10.1f}"
+              f"{latency['p50']:>10.2f}{latency['p95']:>10.2f}{latency['p99']:>10.2f}")
+        for kind, label in (('miss', "cache misses"), ('hit', "cache hits")):
+            split = result.get(f'{kind}_latency_ms')
+            if split is None:
+                continue
+            count = result['cache_misses'] if kind == 'miss' else result['requests'] - result['cache_misses']
+            print(f"     {label:<20}{count:>7}{'':>16}"
+                  f"{split['p50']:>10.2f}{split['p95']:>10.2f}{split['p99']:>10.2f}")
+
+def compare(results, baseline, threshold):
+    """Print p95/RPS changes against a baseline run; returns the regressed scenario names."""
+    regressions = []
+    print(f"\n📊 Against baseline {baseline.get('commit')} ({baseline.get('timestamp')})")
+    for name, result in results.items():
+        before = baseline['results'].get(name)
+        if before is None:
+            continue
+        p95_change = result['latency_ms']['p95'] / before['latency_ms']['p95'] - 1
+        rps_change = result['rps'] / before['rps'] - 1
+        regressed = p95_change > threshold or rps_change < -threshold
+        if regressed:
+            regressions.append(name)
+        print(f"{'⚠️ ' if regressed else '   '}{name:<22} p95 {p95_change:+7.1%}   rps {rps_change:+7.1%}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the API in-process or against a live server")
+    parser.add_argument("--url", help="Base URL of a running server (default: in-process)")
+    parser.add_argument("--scenarios", help="Comma-separated scenario names (default: all)")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=5, help="Unrecorded requests per scenario")
+    parser.add_argument("--batch-size", type=int, default=100, help="Areas per predict-batch request")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cache", action="store_true",
+                        help="Leave the response cache on and report cache hit and miss latency separately")
+    parser.add_argument("--replay", metavar="LOG_DIR",
+                        help="Replay the inputs logged in a prediction log directory instead of sampling data/")
+    parser.add_argument("--output", help="JSON results path (default: test/results/<commit>-<time>.json)")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative p95/RPS change counted as a regression")
+    args = parser.parse_args()
+
+    scenarios = build_scenarios(args.seed, args.batch_size, replay=args.replay)
+    if not scenarios:
+        parser.error(f"No prediction logs to replay in {args.replay}")
+    if args.scenarios:
+        unknown = set(args.scenarios.split(',')) - set(scenarios)
+        if unknown:
+            parser.error(f"Unknown scenarios {sorted(unknown)}; available: {', '.join(scenarios)}")
+        scenarios = {name: scenarios[name] for name in args.scenarios.split(',')}
+
+    target = args.url or "in-process"
+    print(f"🚀 Benchmarking {len(scenarios)} scenarios against {target} "
+          f"({args.requests} requests, concurrency {args.concurrency})")
+    print("=" * 77)
+    if args.url and not args.cache:
+        print("ℹ️  The server's RESPONSE_CACHE_SIZE decides caching; start it with RESPONSE_CACHE_SIZE=0 "
+              "to measure every request uncached")
+    results = asyncio.run(run_all(list(scenarios.values()), args.url, args.requests,
+                                  args.concurrency, args.warmup, args.timeout, args.cache))
+    print_results(results)
+
+    commit = git_commit()
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    report = {
+        'commit': commit,
+        'timestamp': timestamp,
+        'target': target,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'settings': {key: getattr(args, key) for key in ('requests', 'concurrency', 'warmup', 'batch_size', 'seed', 'replay', 'cache')},
+        'results': results
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit or 'local'}-{timestamp}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results written to {output}")
+
+    failed = any(result['errors'] for result in results.values())
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        # Runs from before --cache existed were cached
+        baseline_cache = baseline['settings'].get('cache', True)
+        if baseline_cache != args.cache:
+            print(f"\n⚠️  The baseline was run with the response cache {'on' if baseline_cache else 'off'}")
+        failed |= bool(compare(results, baseline, args.threshold))
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import os
+import sys
+import warnings
+
+warnings.filterwarnings('ignore')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from services.camp_placement import by_contribution, coverage_sets, exact_placement, place_camps
+
+def check(name, condition):
+    print(f"{'✅' if condition else '❌'} {name}")
+    return bool(condition)
+
+def test_order():
+    covers = [np.array([0, 1]), np.array([0, 1, 2, 3]), np.array([4]), np.array([2])]
+    weights = np.array([1.0, 1.0, 1.0, 1.0, 5.0])
+    order = by_contribution([0, 1, 2, 3], covers, weights)
+    return check("Sites are ordered by contribution and redundant ones are kept last",
+                 order == [2, 1, 0, 3])
+
+def test_exact():
+    # Three tight groups of areas and one camp more than there are groups
+    rng = np.random.default_rng(0)
+    centres = np.array([[18.52, 73.85], [19.07, 72.88], [20.00, 73.79]])
+    points = np.repeat(centres, 10, axis=0) + rng.normal(0, 0.005, (30, 2))
+    weights = rng.integers(1, 50, 30).astype(np.float64)
+    sites, _ = exact_placement(coverage_sets(points[:, 0], points[:, 1], 5.0), weights, 4)
+    chosen, assigned, solver = place_camps(points[:, 0], points[:, 1], weights, 4, 5.0, method="exact")
+    ok = check(f"Every site the solver chose is returned ({len(sites)} sites)",
+               sorted(chosen) == sorted(sites) and solver['method'] == "exact")
+    ok &= check("The exact placement covers every area", sum(len(areas) for areas in assigned) == len(weights))
+    return ok
+
+if __name__ == "__main__":
+    print("🧪 Camp placement")
+    print("=" * 60)
+    ok = test_order()
+    ok &= test_exact()
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+import warnings
+import numpy as np
+
+warnings.filterwarnings('ignore')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.cluster_model import load_cluster_artifacts
+from services.datasets import AREAS
+from services.cluster_features import FEATURES, add_engineered_features
+
+def synthetic_areas(areas, n_rows, seed=42):
+    """Resample the area table with jitter to get n_rows realistic rows."""
+    rng = np.random.default_rng(seed)
+    sample = areas.sample(n=n_rows, replace=True, random_state=seed).reset_index(drop=True)
+    sample['Latitude'] += rng.normal(0, 0.05, n_rows)
+    sample['Longitude'] += rng.normal(0, 0.05, n_rows)
+    sample['Zero-dose Count'] = (sample['Zero-dose Count'] * rng.uniform(0.5, 2.0, n_rows)).round()
+    sample['Income'] = (sample['Income'] * rng.uniform(0.5, 2.0, n_rows)).round()
+    sample['Travel Time'] = (sample['Travel Time'] * rng.uniform(0.5, 2.0, n_rows)).round().clip(lower=1)
+    sample['Literacy Rate'] = (sample['Literacy Rate'] + rng.normal(0, 5, n_rows)).clip(0, 100)
+    return add_engineered_features(sample)
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def test_parity(scaler, model, assigner, df):
+    expected = model.predict(scaler.transform(df[FEATURES]))
+    actual = assigner.predict(df[FEATURES].to_numpy())
+    mismatches = int((expected != actual).sum())
+    status = "✅" if mismatches == 0 else "❌"
+    print(f"{status} Parity on {len(df):,} rows: {mismatches} mismatches")
+    return mismatches == 0
+
+def benchmark(scaler, model, assigner, df, label, repeat):
+    X = df[FEATURES].to_numpy()
+    sklearn_time = best_of(lambda: model.predict(scaler.transform(df[FEATURES])), repeat)
+    numpy_time = best_of(lambda: assigner.predict(X), repeat)
+    print(f"{label:>12} | sklearn {sklearn_time * 1e6:12.1f} µs | numpy {numpy_time * 1e6:12.1f} µs | {sklearn_time / numpy_time:6.1f}x")
+
+if __name__ == "__main__":
+    print("🔍 Nearest-centroid cluster assignment: parity and microbenchmarks")
+    print("=" * 70)
+
+    artifacts = load_cluster_artifacts()
+    scaler, model, assigner = artifacts.scaler, artifacts.model, artifacts.assigner
+    areas = AREAS.frame()
+
+    ok = test_parity(scaler, model, assigner, add_engineered_features(areas.copy()))
+    ok &= test_parity(scaler, model, assigner, synthetic_areas(areas, 100000))
+
+    print("-" * 70)
+    benchmark(scaler, model, assigner, synthetic_areas(areas, 1), "1 row", repeat=200)
+    benchmark(scaler, model, assigner, synthetic_areas(areas, 100000), "100k rows", repeat=10)
+
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,70 @@
+import os
+import sys
+import warnings
+import numpy as np
+
+warnings.filterwarnings('ignore')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routers.cluster import get_cluster_artifacts, intervention_priority_rules
+from services.cluster_features import (
+    FEATURES, INCOME_FLOOR, TRAVEL_TIME_FLOOR, feature_matrix, priority_score, valid_rows
+)
+
+# Values that used to produce inf/NaN or nonsense ratios
+EDGE_VALUES = {
+    'Zero-dose Count': [0, -5, 1, 10**6],
+    'Income': [0, -1000, 1, 999, 10**9],
+    'Travel Time': [0, -10, 1, 10**4],
+    'Literacy Rate': [0.0, -20.0, 100.0, 150.0]
+}
+
+def random_areas(n_rows, seed):
+    """Random raw attributes mixing realistic values with the edge values above."""
+    rng = np.random.default_rng(seed)
+    columns = {
+        'Latitude': rng.uniform(15.5, 22.5, n_rows),
+        'Longitude': rng.uniform(72.5, 80.5, n_rows),
+        'Zero-dose Count': rng.integers(0, 500, n_rows).astype(float),
+        'Income': rng.integers(0, 200000, n_rows).astype(float),
+        'Travel Time': rng.integers(0, 240, n_rows).astype(float),
+        'Literacy Rate': rng.uniform(0, 100, n_rows)
+    }
+    for col, values in EDGE_VALUES.items():
+        mask = rng.random(n_rows) < 0.2
+        columns[col][mask] = rng.choice(values, mask.sum())
+    return columns
+
+def check(name, condition):
+    print(f"{'✅' if condition else '❌'} {name}")
+    return bool(condition)
+
+def test_cluster_features(n_rows=100000, seed=7):
+    columns = random_areas(n_rows, seed)
+    X = feature_matrix(*columns.values())
+    assigner = get_cluster_artifacts().assigner
+    clusters = assigner.predict(X)
+    scores = priority_score(columns['Zero-dose Count'], columns['Travel Time'], columns['Literacy Rate'])
+
+    ok = check(f"Feature matrix shape is ({n_rows}, {len(FEATURES)})", X.shape == (n_rows, len(FEATURES)))
+    ok &= check("All engineered features are finite", valid_rows(X).all())
+    ok &= check("Ratio features are non-negative", (X[:, 6:8] >= 0).all())
+    ok &= check(f"Income clipped to >= {INCOME_FLOOR}", (X[:, 3] >= INCOME_FLOOR).all())
+    ok &= check(f"Travel time clipped to >= {TRAVEL_TIME_FLOOR}", (X[:, 4] >= TRAVEL_TIME_FLOOR).all())
+    ok &= check("Priority score matches the feature column", np.allclose(scores, X[:, 8]))
+    ok &= check("Every row gets a valid cluster", ((clusters >= 0) & (clusters < len(assigner.intercept))).all())
+
+    single = feature_matrix(*(values[0] for values in columns.values()))
+    ok &= check("Scalar inputs give the same row as arrays", np.allclose(single[0], X[0]))
+
+    missing = feature_matrix(18.5, 73.8, np.nan, 20000, 30, 85.0)
+    ok &= check("Missing inputs are flagged, not assigned", not valid_rows(missing)[0])
+
+    levels = intervention_priority_rules(np.array([80.0, 80.1, 60.0, 60.1, 40.0, 40.1]))
+    ok &= check("Priority thresholds are exclusive", list(levels) == ["High", "Immediate", "Medium", "High", "Low", "Medium"])
+    return ok
+
+if __name__ == "__main__":
+    print("🧪 Cluster feature edge cases")
+    print("=" * 60)
+    sys.exit(0 if test_cluster_features() else 1)
@@ -0,0 +1,124 @@
+"""
+CSV vs typed Arrow/Parquet loading on --scale x synthetic copies of data/.
+
+Each dataset is resampled with jitter to scale times its rows and written
+as CSV, then converted with services.datasets to Arrow IPC and Parquet.
+Every loader runs in a fresh process and reports wall time, the RSS it
+added (mapped file pages included) and the in-memory size of the
+resulting DataFrame:
+
+    csv          pd.read_csv with type inference (what the code did before)
+    csv typed    pyarrow CSV parse with the dataset schema
+    parquet      memory-mapped Parquet, decoded to pandas
+    arrow        memory-mapped Arrow IPC, zero-copy into pandas
+    arrow 2 col  the same, projected to two columns
+
+    python test/dataset_bench.py --scale 100
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+warnings.filterwarnings('ignore')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.datasets import DATASETS, Dataset, table_to_frame
+
+def synthetic_frame(dataset, scale, seed=42):
+    """The dataset resampled to scale x rows: numbers jittered, dates shifted, ids made unique."""
+    rng = np.random.default_rng(seed)
+    source = dataset.frame()
+    n_rows = len(source) * scale
+    df = source.sample(n=n_rows, replace=True, random_state=seed).reset_index(drop=True)
+    for field in dataset.schema:
+        col = field.name
+        if pa.types.is_floating(field.type):
+            df[col] = (df[col].astype(np.float64) * rng.uniform(0.8, 1.2, n_rows)).round(2)
+        elif pa.types.is_integer(field.type) and df[col].nunique() > 2:
+            df[col] = (df[col] * rng.uniform(0.8, 1.2, n_rows)).round().clip(lower=0).astype(np.int64)
+        elif pa.types.is_date(field.type):
+            df[col] = (df[col] + pd.to_timedelta(rng.integers(0, 365, n_rows), unit='D')).dt.strftime('%Y-%m-%d')
+        elif pa.types.is_string(field.type):
+            df[col] = df[col].astype(str) + '-' + pd.Series(np.arange(n_rows)).astype(str)
+    return df
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 1024 ** 2
+
+def synthetic_dataset(name, directory):
+    dataset = DATASETS[name]
+    return Dataset(name, os.path.basename(dataset.csv_path), dataset.schema, data_dir=directory)
+
+def run_loader(loader, name, directory):
+    """Runs in a fresh process: (seconds, RSS added in MB, DataFrame MB)."""
+    dataset = synthetic_dataset(name, directory)
+    baseline = rss_mb()
+    start = time.perf_counter()
+    if loader == "csv":
+        df = pd.read_csv(dataset.csv_path)
+    elif loader == "csv typed":
+        df = table_to_frame(dataset.read_csv())
+    elif loader == "parquet":
+        df = table_to_frame(dataset.table())
+    elif loader == "arrow":
+        df = dataset.frame()
+    else:
+        df = dataset.frame(dataset.schema.names[-2:])
+    seconds = time.perf_counter() - start
+    return seconds, rss_mb() - baseline, df.memory_usage(deep=True).sum() / 1024 ** 2
+
+LOADERS = ("csv", "csv typed", "parquet", "arrow", "arrow 2 col")
+
+def bench(dataset, scale, directory, context, repeat):
+    df = synthetic_frame(dataset, scale)
+    synthetic = synthetic_dataset(dataset.name, directory)
+    df.to_csv(synthetic.csv_path, index=False)
+
+    start = time.perf_counter()
+    synthetic.convert(parquet_path=synthetic.parquet_path)
+    convert_seconds = time.perf_counter() - start
+    sizes = {ext: os.path.getsize(path) / 1024 ** 2 for ext, path in
+             (("csv", synthetic.csv_path), ("arrow", synthetic.arrow_path), ("parquet", synthetic.parquet_path))}
+    print(f"\n📦 {dataset.name}: {len(df):,} rows | CSV {sizes['csv']:.1f} MB, Arrow {sizes['arrow']:.1f} MB, "
+          f"Parquet {sizes['parquet']:.1f} MB | converted in {convert_seconds:.2f}s")
+
+    results = {}
+    for loader in LOADERS:
+        if loader == "parquet":
+            # Parquet is only read when the Arrow copy is missing
+            os.rename(synthetic.arrow_path, f"{synthetic.arrow_path}.off")
+        runs = []
+        for _ in range(repeat):
+            with context.Pool(1) as pool:
+                runs.append(pool.apply(run_loader, (loader, dataset.name, directory)))
+        if loader == "parquet":
+            os.rename(f"{synthetic.arrow_path}.off", synthetic.arrow_path)
+        seconds, added_mb, frame_mb = min(runs)
+        results[loader] = seconds
+        speedup = results["csv"] / seconds
+        print(f"{loader:>12} | {seconds * 1000:8.1f} ms | {speedup:6.1f}x | RSS +{added_mb:7.1f} MB | frame {frame_mb:7.1f} MB")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare CSV and Arrow/Parquet load time and memory")
+    parser.add_argument("--scale", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh-process runs per loader (best is reported)")
+    parser.add_argument("--datasets", default=",".join(DATASETS))
+    args = parser.parse_args()
+
+    print(f"🧪 Dataset loading at {args.scale}x")
+    print("=" * 77)
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as directory:
+        for name in args.datasets.split(','):
+            bench(DATASETS[name], args.scale, directory, context, args.repeat)
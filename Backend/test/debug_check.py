@@ -0,0 +1,102 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import warnings
+
+warnings.filterwarnings('ignore')
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ["DEBUG_TOKEN"] = "debug-check"
+# Shared runtime state of this check lives in a scratch directory, not Backend/state
+os.environ["STATE_DIR"] = tempfile.mkdtemp(prefix="debug-check-")
+
+from fastapi.testclient import TestClient
+
+from main import app
+from routers.forecasting import ForecastInput, run_forecast
+from services import metrics
+
+ADMIN = {'X-Debug-Token': "debug-check"}
+
+def check(name, condition):
+    print(f"{'✅' if condition else '❌'} {name}")
+    return bool(condition)
+
+def forecast_input(temperature):
+    return {'district': "Pune", 'vaccine_type': "BCG", 'temperature': temperature, 'rainfall': 0.5,
+            'stock_left': 100, 'holiday_indicator': 0}
+
+def test_access(client):
+    ok = check("Profile needs the debug token", client.get("/debug/profile", params={'seconds': 0.1}).status_code == 403)
+    ok &= check("A wrong token is refused", client.get("/debug/memory", headers={'X-Debug-Token': "nope"}).status_code == 403)
+    ok &= check("Invalid durations are rejected",
+                'error' in client.get("/debug/profile", params={'seconds': 600}, headers=ADMIN).json())
+    return ok
+
+def test_profile(client):
+    stop = threading.Event()
+
+    def busy():
+        while not stop.is_set():
+            run_forecast(ForecastInput(**forecast_input(30.0)))
+
+    worker = threading.Thread(target=busy, name="forecast-busy")
+    worker.start()
+    try:
+        stacks = client.get("/debug/profile", params={'seconds': 1.0}, headers=ADMIN).text
+        top = client.get("/debug/profile", params={'seconds': 1.0, 'format': "json"}, headers=ADMIN).json()
+    finally:
+        stop.set()
+        worker.join()
+
+    lines = stacks.strip().split("\n")
+    ok = check(f"Collapsed stacks are flamegraph lines ({len(lines)} stacks)",
+               all(line.rsplit(' ', 1)[1].isdigit() for line in lines))
+    ok &= check("The busy thread is sampled down to the forecast",
+                any(line.startswith("forecast-busy;") and "routers.forecasting:run_forecast" in line for line in lines))
+    ok &= check("JSON lists the top functions", top['samples'] > 0 and
+                any(row['function'] == "routers.forecasting:run_forecast" and row['total_percent'] > 0 for row in top['top']))
+    return ok
+
+def test_memory(client):
+    report = client.get("/debug/memory", params={'trace_seconds': 0.2}, headers=ADMIN).json()
+    ok = check("Memory report attributes RSS to mappings", report['process_rss_bytes'] > 0 and report['mappings']
+               and sum(m['rss_bytes'] for m in report['mappings']) <= report['process_rss_bytes'] * 1.01)
+    ok &= check("Memory report lists every model", any(m['name'].startswith("forecast:") for m in report['models']))
+    ok &= check("Allocations are traced for the requested window",
+                isinstance(report['allocations'], list) and report['allocations_traced'] == "last 0.2s")
+    return ok
+
+def test_request_profile(client):
+    response = client.post("/api/forecast/predict", json=forecast_input(31.7),
+                           headers={**ADMIN, 'X-Profile': "1"})
+    timing = response.headers.get('server-timing', "")
+    ok = check(f"X-Profile returns the span breakdown ({timing[:60]}...)",
+               response.json()['prediction'] > 0 and "forecast.prepare;dur=" in timing
+               and "forecast.inference;dur=" in timing and "total;dur=" in timing)
+    response = client.post("/api/forecast/predict", json=forecast_input(31.8), headers={'X-Profile': "1"})
+    ok &= check("X-Profile without the token is ignored", 'server-timing' not in response.headers)
+    ok &= check("No spans are collected once the request ends", not metrics.profiling())
+    return ok
+
+def test_disabled():
+    code = ("from fastapi.testclient import TestClient; from main import app, profiling; "
+            "print(TestClient(app).get('/debug/memory', headers={'X-Debug-Token': ''}).status_code, "
+            "any(m.cls is profiling.ProfileMiddleware for m in app.user_middleware))")
+    env = {key: value for key, value in os.environ.items() if key != "DEBUG_TOKEN"}
+    output = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True).stdout.split()
+    return check("Without DEBUG_TOKEN nothing is mounted", output[-2:] == ["404", "False"])
+
+if __name__ == "__main__":
+    print("🧪 Debug profiling")
+    print("=" * 60)
+    with TestClient(app) as client:
+        ok = test_access(client)
+        ok &= test_profile(client)
+        ok &= test_memory(client)
+        ok &= test_request_profile(client)
+    ok &= test_disabled()
+    sys.exit(0 if ok else 1)
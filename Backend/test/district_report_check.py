@@ -0,0 +1,111 @@
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+warnings.filterwarnings('ignore')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Shared runtime state of this check lives in a scratch directory, not Backend/state
+os.environ["STATE_DIR"] = tempfile.mkdtemp(prefix="district-report-check-")
+
+from fastapi.testclient import TestClient
+
+from main import app
+from routers import district, forecasting
+
+def check(name, condition):
+    print(f"{'✅' if condition else '❌'} {name}")
+    return bool(condition)
+
+DELAY = 0.5
+calls = []
+finished = []
+
+def slowed(fn):
+    def run(*args):
+        calls.append((fn.__name__, *args))
+        time.sleep(DELAY)
+        result = fn(*args)
+        finished.append((fn.__name__, *args))
+        return result
+    return run
+
+def test_content(client):
+    report = client.get("/api/district/pune/report").json()
+    ok = check("Names resolve case-insensitively and every section is returned",
+               report['district'] == "Pune" and report['status'] == "complete"
+               and all(section in report for section in ('forecast', 'dropout', 'clusters')))
+    vaccine = report['forecast']['vaccines'][0]
+    single = client.post("/api/forecast/predict", json={'district': "Pune", 'vaccine_type': vaccine['vaccine_type'],
+                                                         **vaccine['inputs']}).json()
+    ok &= check("Forecasts match /api/forecast/predict on the latest day's inputs",
+                vaccine['prediction'] == single['prediction']
+                and report['forecast']['total_predicted_doses'] == single['prediction'])
+    clusters = report['clusters']
+    ok &= check(f"The cluster mix covers the district's areas ({clusters['areas']} areas)",
+                clusters['areas'] > 0 and sum(clusters['by_cluster_type'].values()) == clusters['areas']
+                and len(clusters['top_priority_areas']) == min(district.TOP_PRIORITY_AREAS, clusters['areas']))
+    ok &= check("A district without registry children reports dropout as unavailable",
+                report['dropout']['status'] == "unavailable")
+
+    satara = client.get("/api/district/Satara/report").json()
+    aggregates = client.get("/api/dropout/aggregates", params={'district': "Satara", 'group_by': "distance_band"}).json()
+    ok &= check("Registry dropout risk matches /api/dropout/aggregates",
+                satara['dropout']['status'] == "success" and satara['dropout']['totals'] == aggregates['totals']
+                and satara['dropout']['by_distance_band'] == aggregates['groups'])
+    ok &= check("Overridden conditions are used for every vaccine",
+                all(vaccine['inputs']['temperature'] == 40.0 for vaccine in
+                    client.get("/api/district/Pune/report", params={'temperature': 40}).json()['forecast']['vaccines']))
+    return ok
+
+def test_concurrency(client):
+    originals = district.district_dropout, district.district_clusters, forecasting.run_forecast
+    district.district_dropout, district.district_clusters, forecasting.run_forecast = map(slowed, originals)
+    try:
+        # A fresh temperature so the forecast is not served from the response cache
+        started = time.perf_counter()
+        report = client.get("/api/district/Pune/report", params={'temperature': 33.3}).json()
+        wall = time.perf_counter() - started
+        sections = [report[name]['seconds'] for name in ('forecast', 'dropout', 'clusters')]
+        ok = check(f"Sections run concurrently ({wall:.2f}s for sections of {', '.join(f'{s:.2f}' for s in sections)}s)",
+                   min(sections) >= DELAY and wall < sum(sections) - DELAY)
+
+        report = client.get("/api/district/Satara/report", params={'timeout': DELAY / 5}).json()
+        ok &= check("Sections slower than the timeout are reported and the rest returned",
+                    report['status'] == "partial" and report['dropout']['status'] == "timeout"
+                    and report['clusters']['status'] == "timeout" and report['seconds'] < DELAY)
+        # Let the sections the last report gave up on finish first
+        time.sleep(2 * DELAY)
+        calls.clear()
+        finished.clear()
+        first = client.get("/api/district/Satara/report", params={'timeout': DELAY / 5}).json()
+        second = client.get("/api/district/Satara/report", params={'timeout': DELAY / 5}).json()
+        time.sleep(2 * DELAY)
+        ok &= check("Timed-out sections finish in the background, and a report meanwhile waits for them "
+                    "instead of running them again",
+                    first['dropout']['status'] == second['dropout']['status'] == "timeout"
+                    and calls.count(('district_dropout', "Satara")) == 1
+                    and finished.count(('district_dropout', "Satara")) == 1)
+        report = client.get("/api/district/Pune/report", params={'timeout': DELAY / 5, 'temperature': 34.4}).json()
+        ok &= check("A vaccine forecast past the timeout is reported per vaccine",
+                    report['forecast']['status'] == "error"
+                    and 'error' in report['forecast']['vaccines'][0])
+    finally:
+        district.district_dropout, district.district_clusters, forecasting.run_forecast = originals
+    return ok
+
+def test_unknown(client):
+    report = client.get("/api/district/Atlantis/report").json()
+    return check("Unknown districts are rejected with the known ones",
+                 report['status'] == "error" and "Pune" in report['available_districts']
+                 and "Satara" in report['available_districts'])
+
+if __name__ == "__main__":
+    print("🧪 District report")
+    print("=" * 60)
+    with TestClient(app) as client:
+        ok = test_content(client)
+        ok &= test_concurrency(client)
+        ok &= test_unknown(client)
+    sys.exit(0 if ok else 1)
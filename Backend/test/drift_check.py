@@ -0,0 +1,162 @@
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import warnings
+
+warnings.filterwarnings('ignore')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Shared runtime state of this check lives in a scratch directory, not Backend/state
+os.environ["STATE_DIR"] = tempfile.mkdtemp(prefix="drift-check-")
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from main import app
+from routers.cluster import INPUT_COLUMNS
+from routers.dropout import DropoutInput, drift_monitor as dropout_drift
+from routers.forecasting import ForecastInput, drift_monitor as forecast_drift
+from services import drift
+from services.datasets import AREAS, DROPOUT
+
+def check(name, condition):
+    print(f"{'✅' if condition else '❌'} {name}")
+    return bool(condition)
+
+def dropout_inputs(n=None, **overrides):
+    frame = DROPOUT.frame()
+    rows = frame.sample(n, random_state=0) if n else frame
+    return [DropoutInput(**{
+        'gender': row['Gender'], 'age': int(row['Age']), 'travel_time': int(row['Travel Time']),
+        'parent_education': row['Parent Education'], 'dose1_date': str(row['Dose1 Date'].date()),
+        'dose2_date': str(row['Dose2 Date'].date()), 'distance_to_center': float(row['Distance to Center']),
+        'delay_days': int(row['Delay_Days']), **overrides
+    }) for _, row in rows.iterrows()]
+
+def features(report):
+    return {feature['feature']: feature for feature in report['features']}
+
+def test_reference(client):
+    dropout_drift.reset()
+    for input in dropout_inputs():
+        dropout_drift.observe(input)
+    report = client.get("/api/drift/dropout").json()
+    worst = max(feature['psi'] for feature in report['features'])
+    ok = check(f"Replaying the training table scores no drift (worst PSI {worst:.1e})",
+               report['status'] == "stable" and worst < 1e-6 and report['live_rows'] == report['reference_rows'])
+    ok &= check("KS is zero for the training table itself",
+                all(feature['ks'] < 1e-9 for feature in report['features'] if feature['kind'] == "numeric"))
+
+    dropout_drift.reset()
+    for input in dropout_inputs(200):
+        client.post("/api/dropout/predict", json=input.model_dump())
+    report = client.get("/api/drift/dropout").json()
+    ok &= check(f"A sample of the training data through /predict is stable (status {report['status']})",
+                report['live_rows'] == 200 and report['status'] in ("stable", "moderate")
+                and all(feature['psi'] < drift.PSI_DRIFT for feature in report['features']))
+    return ok
+
+def test_shift(client):
+    dropout_drift.reset()
+    far = dropout_inputs(300)
+    for input in far:
+        dropout_drift.observe(input.model_copy(update={'distance_to_center': input.distance_to_center + 6.0,
+                                                      'parent_education': "Doctorate"}))
+    report = features(client.get("/api/drift/dropout").json())
+    ok = check(f"A shifted numeric feature is flagged (PSI {report['distance_to_center']['psi']:.2f}, "
+               f"KS {report['distance_to_center']['ks']:.2f})",
+               report['distance_to_center']['status'] == "drift" and report['distance_to_center']['ks'] > 0.9)
+    ok &= check("Unshifted features stay stable", report['age']['status'] == report['gender']['status'] == "stable")
+    ok &= check("An unseen category is reported and flagged",
+                report['parent_education']['unseen'] == ["Doctorate"] and report['parent_education']['status'] == "drift")
+
+    forecast_drift.reset()
+    for temperature in np.linspace(45, 50, 150):
+        forecast_drift.observe(ForecastInput(district="Pune", vaccine_type="BCG", temperature=float(temperature),
+                                             rainfall=0.0, stock_left=300, holiday_indicator=0))
+    summary = {model['model']: model for model in client.get("/api/drift").json()['models']}
+    ok &= check("The summary lists the shifted forecast features",
+                summary['forecast']['status'] == "drift" and "temperature" in summary['forecast']['shifted_features'])
+    return ok
+
+def test_batches(client):
+    from routers.cluster import drift_monitor as cluster_drift
+
+    cluster_drift.reset()
+    areas = AREAS.frame(list(INPUT_COLUMNS.values()))
+    payload = [{field: (value.item() if hasattr(value, 'item') else value) for field, value in zip(INPUT_COLUMNS, row)}
+               for row in areas.itertuples(index=False)]
+    client.post("/api/cluster/predict-batch", json=payload)
+    report = client.get("/api/drift/cluster").json()
+    ok = check("Cluster batch rows are recorded as a frame",
+               report['live_rows'] == len(areas) and max(feature['psi'] for feature in report['features']) < 1e-6)
+
+    dropout_drift.reset()
+    client.post("/api/dropout/predict-batch", json=[input.model_dump() for input in dropout_inputs(120)])
+    ok &= check("Dropout batch rows are recorded", client.get("/api/drift/dropout").json()['live_rows'] == 120)
+    return ok
+
+def test_threads(client):
+    """Sketches are per thread and merged on read: no update is lost without a lock."""
+    dropout_drift.reset()
+    inputs = dropout_inputs(250)
+
+    def worker():
+        for input in inputs:
+            dropout_drift.observe(input)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    report = features(client.get("/api/drift/dropout").json())
+    ok = check("Concurrent requests from 8 threads are all counted",
+               sum(report['gender']['live_counts'].values()) == 8 * 250
+               and client.get("/api/drift/dropout").json()['live_rows'] == 8 * 250)
+    reset = client.post("/api/drift/dropout/reset").json()
+    ok &= check("Reset starts an empty window", reset['live_rows'] == 0 and reset['status'] == "insufficient_data")
+    ok &= check("Unknown monitors are rejected", 'error' in client.get("/api/drift/centres").json())
+    return ok
+
+def test_exited_workers(client):
+    """Sketches published by workers that are gone are pruned, not merged."""
+    dropout_drift.reset()
+    for input in dropout_inputs(30):
+        dropout_drift.observe(input)
+    dropout_drift.publish()
+    directory = dropout_drift._share_dir()
+    with open(os.path.join(directory, f"{drift.worker_id()}.pkl"), 'rb') as f:
+        published = f.read()
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    host = socket.gethostname()
+    names = {'running': f"{host}-{os.getppid()}-1.pkl", 'exited': f"{host}-{exited.pid}-2.pkl",
+             'stale': f"elsewhere-{os.getpid()}-3.pkl"}
+    for name in names.values():
+        with open(os.path.join(directory, name), 'wb') as f:
+            f.write(published)
+    old = time.time() - drift.STALE_SECONDS - 1
+    os.utime(os.path.join(directory, names['stale']), (old, old))
+
+    report = client.get("/api/drift/dropout").json()
+    ok = check("Only sketches of running workers are merged", report['live_rows'] == 60)
+    left = set(os.listdir(directory))
+    ok &= check("Sketches of exited workers and stale ones are deleted",
+                names['running'] in left and names['exited'] not in left and names['stale'] not in left)
+    dropout_drift.reset()
+    return ok
+
+if __name__ == "__main__":
+    print("🧪 Input drift")
+    print("=" * 60)
+    with TestClient(app) as client:
+        ok = test_reference(client)
+        ok &= test_shift(client)
+        ok &= test_batches(client)
+        ok &= test_threads(client)
+        ok &= test_exited_workers(client)
+    sys.exit(0 if ok else 1)
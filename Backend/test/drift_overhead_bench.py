@@ -0,0 +1,61 @@
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+warnings.filterwarnings('ignore')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Shared runtime state of this check lives in a scratch directory, not Backend/state
+os.environ["STATE_DIR"] = tempfile.mkdtemp(prefix="drift-overhead-bench-")
+
+from routers.cluster import ClusterInput, drift_monitor as cluster_drift
+from routers.dropout import DropoutInput, drift_monitor as dropout_drift
+from routers.forecasting import ForecastInput, drift_monitor as forecast_drift
+from services import drift
+
+ITERATIONS = 200_000
+BUDGET_NS = 5000
+
+INPUTS = {
+    'dropout': (dropout_drift, DropoutInput(gender="F", age=1, travel_time=25, parent_education="Primary",
+                                            dose1_date="2024-03-10", dose2_date="2024-04-20",
+                                            distance_to_center=4.5, delay_days=40)),
+    'cluster': (cluster_drift, ClusterInput(area_id="X1", city_name="Pune", district_name="Pune", latitude=18.5,
+                                            longitude=73.8, zero_dose_count=120, income=20000, travel_time=35,
+                                            literacy_rate=72)),
+    'forecast': (forecast_drift, ForecastInput(district="Pune", vaccine_type="BCG", temperature=31.5, rainfall=0.4,
+                                               stock_left=120, holiday_indicator=0))
+}
+
+def observe_cost_ns(monitor, input, iterations=ITERATIONS):
+    """Average cost of recording one request's inputs, loop overhead subtracted."""
+    observe = monitor.observe
+    start = time.perf_counter()
+    for _ in range(iterations):
+        pass
+    baseline = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        observe(input)
+    return (time.perf_counter() - start - baseline) / iterations * 1e9
+
+if __name__ == "__main__":
+    print("⏱️  Drift sketch overhead per request")
+    print("=" * 70)
+    drift.fit_all()
+
+    ok = True
+    for name, (monitor, input) in INPUTS.items():
+        monitor.reset()
+        cost = observe_cost_ns(monitor, input)
+        report_ms = time.perf_counter()
+        monitor.report()
+        report_ms = (time.perf_counter() - report_ms) * 1000
+        features = len(monitor.numeric) + len(monitor.categorical)
+        passed = cost < BUDGET_NS
+        ok &= passed
+        print(f"{'✅' if passed else '❌'} {name:>8} | {features} features | {cost:7.0f} ns per request "
+              f"(budget {BUDGET_NS} ns) | report {report_ms:.2f} ms")
+    sys.exit(0 if ok else 1)
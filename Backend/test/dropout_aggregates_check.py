@@ -0,0 +1,145 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import warnings
+
+warnings.filterwarnings('ignore')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Shared runtime state of this check lives in a scratch directory, not Backend/state
+os.environ["STATE_DIR"] = tempfile.mkdtemp(prefix="dropout-aggregates-check-")
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from main import app
+from routers.dropout import DropoutAggregates, aggregates, get_predictor, registry_children
+
+def check(name, condition):
+    print(f"{'✅' if condition else '❌'} {name}")
+    return bool(condition)
+
+CHILD = {'gender': "F", 'age': 1, 'travel_time': 25, 'parent_education': "Primary", 'dose1_date': "2024-03-10",
+         'dose2_date': "2024-04-20", 'distance_to_center': 4.5, 'delay_days': 40}
+
+def full_rescore(group_by):
+    """The same aggregates by rescoring every child, as a dashboard would without the store."""
+    children = registry_children()
+    predictions = pd.DataFrame(get_predictor().predict_many([record for record, _ in children.values()]))
+    keys = pd.DataFrame([DropoutAggregates.group_key(record, district) for record, district in children.values()],
+                        columns=DropoutAggregates.DIMENSIONS)
+    frame = pd.concat([keys, predictions], axis=1)
+    return frame.groupby(group_by)['probability_delayed'].sum() / 100
+
+def test_aggregates(client):
+    response = client.get("/api/dropout/aggregates", params={'group_by': "gender,parent_education"}).json()
+    ok = check("Aggregates cover the whole registry", response['totals']['children'] == 1000 and len(response['groups']) == 6)
+    expected = full_rescore(['gender', 'parent_education'])
+    worst = max(abs(group['expected_delayed'] - expected[(group['gender'], group['parent_education'])])
+                for group in response['groups'])
+    ok &= check(f"Expected delayed matches a full rescore (max diff {worst:.1e})", worst < 1e-3)
+
+    months = client.get("/api/dropout/aggregates", params={'group_by': "dose1_month", 'gender': "F"}).json()
+    ok &= check("Filters and cohorts roll up", all(group['dose1_month'].startswith("2024-") for group in months['groups'])
+                and sum(group['children'] for group in months['groups']) == months['totals']['children'] < 1000)
+    ok &= check("Unknown dimensions are rejected",
+                'error' in client.get("/api/dropout/aggregates", params={'group_by': "centre"}).json())
+    return ok
+
+def test_updates(client):
+    before = client.get("/api/dropout/aggregates").json()['totals']
+    added = client.put("/api/dropout/children/NEW0001", json=CHILD).json()
+    after_add = client.get("/api/dropout/aggregates").json()['totals']
+    p = added['prediction']['probability_delayed'] / 100
+    ok = check("Adding a child adds its probability", after_add['children'] == before['children'] + 1 and
+               abs(after_add['expected_delayed'] - before['expected_delayed'] - p) < 1e-3
+               and added['group']['distance_band'] == "3-5 km" and added['group']['dose1_month'] == "2024-03")
+
+    rescored = client.put("/api/dropout/children/NEW0001", json={**CHILD, 'delay_days': 0, 'travel_time': 5,
+                                                                 'district': "Pune"}).json()
+    after_rescore = client.get("/api/dropout/aggregates", params={'group_by': "district"}).json()
+    q = rescored['prediction']['probability_delayed'] / 100
+    ok &= check("Re-scoring replaces the child's contribution", after_rescore['totals']['children'] == before['children'] + 1
+                and abs(after_rescore['totals']['expected_delayed'] - before['expected_delayed'] - q) < 1e-3
+                and {group['district'] for group in after_rescore['groups']} == {"Pune", "Satara"})
+
+    removed = client.delete("/api/dropout/children/NEW0001").json()
+    after_remove = client.get("/api/dropout/aggregates").json()['totals']
+    ok &= check("Removing a child restores the totals", removed['removed'] and after_remove == before)
+    ok &= check("Removing an unknown child is reported", 'error' in client.delete("/api/dropout/children/NEW0001").json())
+    return ok
+
+def test_missing_features(client):
+    # An education level the model has no code for leaves that feature missing
+    unknown = {**CHILD, 'parent_education': "Unknown"}
+    scores = [client.post("/api/dropout/predict-batch", json=batch).json()['predictions'][0]['probability_delayed']
+              for batch in ([unknown], [unknown, {**CHILD, 'age': 4}], [unknown, {**CHILD, 'parent_education': "Graduate"}])]
+    return check("Missing features are filled from training statistics, not the batch", max(scores) - min(scores) < 1e-9)
+
+def test_shared(client):
+    client.put("/api/dropout/children/SHARED1", json={**CHILD, 'district': "Pune"})
+    # A second store over the same STATE_DIR, as another worker or a restarted server sees it
+    other = DropoutAggregates()
+    with other.locked(shared=True):
+        pass
+    ok = check("Another store catches up from the snapshot and change log",
+               other.query(['district']) == aggregates.query(['district']) and "SHARED1" in other.children)
+    client.delete("/api/dropout/children/SHARED1")
+    with other.locked(shared=True):
+        pass
+    ok &= check("Removals reach it too", "SHARED1" not in other.children and other.query() == aggregates.query())
+
+    predictor = get_predictor()
+    original = predictor.predict_many
+
+    def slow(records):
+        time.sleep(1)
+        return original(records)
+    predictor.predict_many = slow
+    try:
+        update = threading.Thread(target=client.put, args=("/api/dropout/children/SLOW1",), kwargs={'json': CHILD})
+        update.start()
+        time.sleep(0.2)
+        started = time.perf_counter()
+        client.get("/api/dropout/aggregates")
+        waited = time.perf_counter() - started
+        update.join()
+    finally:
+        predictor.predict_many = original
+    ok &= check(f"Queries are not held up while an update is scored ({waited * 1000:.0f} ms)",
+                waited < 0.5 and "SLOW1" in aggregates.children)
+    client.delete("/api/dropout/children/SLOW1")
+    return ok
+
+def test_query_cost(client):
+    """Query time should track the number of groups, not the number of children."""
+    def query_ms():
+        start = time.perf_counter()
+        for _ in range(20):
+            client.get("/api/dropout/aggregates", params={'group_by': "gender"})
+        return (time.perf_counter() - start) / 20 * 1000
+
+    small = query_ms()
+    rng = np.random.default_rng(42)
+    for offset in range(0, 50000, 10000):
+        children = [{**CHILD, 'child_id': f"BULK{offset + i}", 'gender': str(rng.choice(["M", "F"])),
+                     'distance_to_center': float(rng.uniform(0.5, 5.5)), 'delay_days': int(rng.integers(0, 60))}
+                    for i in range(10000)]
+        client.post("/api/dropout/children", json=children)
+    large = query_ms()
+    print(f"   groups: {len(aggregates.groups)} | 1,000 children {small:.2f} ms | "
+          f"{len(aggregates.children):,} children {large:.2f} ms per query")
+    return check("Query cost does not grow with the registry", len(aggregates.children) == 51000 and large < small * 3)
+
+if __name__ == "__main__":
+    print("🧪 Dropout risk aggregates")
+    print("=" * 60)
+    with TestClient(app) as client:
+        ok = test_aggregates(client)
+        ok &= test_updates(client)
+        ok &= test_missing_features(client)
+        ok &= test_shared(client)
+        ok &= test_query_cost(client)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,148 @@
+"""
+Keras vs ONNX Runtime (fp32 and dynamic int8) for the forecasting LSTMs.
+
+Needs the exported models: python -m services.forecast_onnx --int8
+
+Every backend runs in a fresh process serving all forecasting models the
+way routers/forecasting.py does (FORECAST_BACKEND), and reports:
+
+    import      seconds to import the router (TensorFlow is only imported
+                by the first Keras load)
+    load        seconds to load every model and scaler
+    RSS         resident memory once loaded
+    single      p50 latency of one /predict window
+    batch       p50 latency of 256 windows in one predict_windows call
+
+The demand predictions of each backend are compared with Keras on the
+history windows plus perturbed copies. Image size is estimated as the
+installed size of the packages each runtime adds on top of the rest of
+requirements.txt.
+
+    python test/forecast_backend_bench.py --repeat 200
+"""
+import argparse
+import multiprocessing
+import os
+import re
+import resource
+import sys
+import time
+import warnings
+from importlib import metadata
+
+import numpy as np
+
+warnings.filterwarnings('ignore')
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+BACKENDS = ("keras", "onnx", "onnx-int8")
+# The package each backend needs that the rest of the app does not
+RUNTIMES = {"keras": "tensorflow", "onnx": "onnxruntime", "onnx-int8": "onnxruntime"}
+# Wheels installed in place of a requirement on some platforms
+ALTERNATIVES = {"tensorflow": ("tensorflow", "tensorflow-cpu")}
+BATCH = 256
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 1024 ** 2
+
+def p50_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1000
+
+def run_backend(backend, repeat):
+    """Runs in a fresh process: timings, RSS and the demand predictions per model."""
+    os.environ["FORECAST_BACKEND"] = backend
+    os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
+    start = time.perf_counter()
+    from routers import forecasting
+    from services.forecast_onnx import parity_windows
+    import_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    models = {key: forecasting.load_forecast_model(key) for key in forecasting.MODEL_PATHS}
+    load_seconds = time.perf_counter() - start
+
+    result = {'import': import_seconds, 'load': load_seconds, 'single': [], 'batch': [], 'predictions': {},
+              'modules': sorted({name.split('.')[0] for name in sys.modules} & {"tensorflow", "keras", "onnxruntime"})}
+    for key, (model, scaler) in models.items():
+        windows = parity_windows(forecasting.recent_data_dict[key][forecasting.FEATURES].to_numpy(dtype=np.float64), n=BATCH - 1)
+        forecasting.predict_windows(model, scaler, windows)
+        result['single'].append(p50_ms(lambda: forecasting.predict_windows(model, scaler, windows[:1]), repeat))
+        result['batch'].append(p50_ms(lambda: forecasting.predict_windows(model, scaler, windows), max(1, repeat // 10)))
+        result['predictions'][key] = forecasting.predict_windows(model, scaler, windows)
+    result['rss'] = rss_mb()
+    return result
+
+def requirement_names(dist):
+    names = set()
+    for requirement in metadata.distribution(dist).requires or []:
+        if "extra ==" not in requirement:
+            names.add(re.split(r"[\s;<>=!~\[(]", requirement, maxsplit=1)[0].lower().replace('_', '-'))
+    return names
+
+def closure(dists):
+    seen, pending = set(), [dist.lower().replace('_', '-') for dist in dists]
+    while pending:
+        dist = pending.pop()
+        if dist in seen:
+            continue
+        try:
+            pending.extend(requirement_names(dist))
+        except metadata.PackageNotFoundError:
+            continue
+        seen.add(dist)
+    return seen
+
+def installed_mb(dist):
+    files = metadata.distribution(dist).files or []
+    return sum(os.path.getsize(path) for path in (f.locate() for f in files) if os.path.isfile(path)) / 1024 ** 2
+
+def image_sizes():
+    """MB of packages each runtime adds to an image that already has the rest of requirements.txt."""
+    with open(os.path.join(BACKEND_DIR, "requirements.txt")) as f:
+        requirements = {line.strip().lower() for line in f if line.strip()}
+    base = closure(requirements - set(RUNTIMES.values()))
+    sizes = {}
+    for runtime in set(RUNTIMES.values()):
+        extra = closure(ALTERNATIVES.get(runtime, (runtime,))) - base
+        sizes[runtime] = (sum(installed_mb(dist) for dist in extra), len(extra))
+    return sizes
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare Keras and ONNX Runtime forecasting backends")
+    parser.add_argument("--repeat", type=int, default=200, help="Timed single-window predictions per model")
+    args = parser.parse_args()
+
+    from services.forecast_onnx import backend_model_path
+    from routers.forecasting import MODEL_PATHS
+
+    print(f"🧪 Forecast backends: {len(MODEL_PATHS)} models")
+    print("=" * 96)
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for backend in BACKENDS:
+        if not all(os.path.exists(backend_model_path(path, backend)) for path in MODEL_PATHS.values()):
+            print(f"⚠️  {backend}: models not exported; run python -m services.forecast_onnx --int8")
+            continue
+        with context.Pool(1) as pool:
+            results[backend] = pool.apply(run_backend, (backend, args.repeat))
+
+    sizes = image_sizes()
+    keras = results.get("keras")
+    for backend, result in results.items():
+        model_kb = sum(os.path.getsize(backend_model_path(path, backend)) for path in MODEL_PATHS.values()) / 1024
+        runtime_mb, packages = sizes[RUNTIMES[backend]]
+        line = (f"{backend:>9} | import {result['import']:5.2f}s | load {result['load']:5.2f}s | RSS {result['rss']:6.0f} MB | "
+                f"single {np.mean(result['single']):6.2f} ms | batch {np.mean(result['batch']):6.2f} ms | "
+                f"models {model_kb:5.0f} KB | runtime {runtime_mb:5.0f} MB ({packages} pkgs)")
+        if keras is not None and backend != "keras":
+            diffs = np.concatenate([np.abs(result['predictions'][key] - keras['predictions'][key]) for key in keras['predictions']])
+            line += f" | differs on {int((diffs > 0).sum())}/{len(diffs)} (max {int(diffs.max())})"
+        print(line)
+        print(f"{'':>9}   loaded: {', '.join(result['modules'])}")
@@ -0,0 +1,60 @@
+import os
+import sys
+import tempfile
+import warnings
+
+warnings.filterwarnings('ignore')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Shared runtime state of this check lives in a scratch directory, not Backend/state
+os.environ["STATE_DIR"] = tempfile.mkdtemp(prefix="forecast-onnx-check-")
+
+import numpy as np
+
+from routers import forecasting
+from services import forecast_onnx, model_pack
+from services.forecast_onnx import PARITY_TOLERANCE, OnnxForecaster, backend_model_path
+
+def check(name, condition):
+    print(f"{'✅' if condition else '❌'} {name}")
+    return bool(condition)
+
+def onnx_forecasters(keras_path, directory):
+    """
+    The ONNX models served beside a .keras model (from disk or models.pack).
+    Missing ones are exported to `directory`, as the Docker build would.
+    """
+    paths = {backend: backend_model_path(keras_path, backend) for backend in PARITY_TOLERANCE}
+    if not all(model_pack.exists(path) for path in paths.values()):
+        try:
+            import tf2onnx  # noqa: F401
+        except ImportError:
+            print(f"⚠️  {os.path.basename(keras_path)}: no ONNX export and tf2onnx not installed, skipping")
+            return {}
+        exported = os.path.join(directory, os.path.basename(keras_path))
+        paths = {backend: backend_model_path(exported, backend) for backend in PARITY_TOLERANCE}
+        forecast_onnx.export_model(keras_path, paths["onnx"])
+        forecast_onnx.quantize_model(paths["onnx"], paths["onnx-int8"])
+    return {backend: OnnxForecaster(model_pack.file_source(path)) for backend, path in paths.items()}
+
+def test_parity(directory):
+    ok = True
+    for key, keras_path in forecasting.MODEL_PATHS.items():
+        forecasters = onnx_forecasters(keras_path, directory)
+        if not forecasters or key not in forecasting.recent_data_dict:
+            continue
+        model = model_pack.load_keras(keras_path)
+        scaler = model_pack.load_pickle(forecasting.SCALER_PATHS[key])
+        window = forecasting.recent_data_dict[key][forecasting.FEATURES].to_numpy(dtype=np.float64)
+        results = forecast_onnx.parity(model, scaler, window, forecasters)
+        for backend, (diff, demand_diff) in results.items():
+            ok &= check(f"{key[0]} {key[1]} {backend}: matches Keras within {PARITY_TOLERANCE[backend]:g} "
+                        f"(max |Δ scaled| {diff:.2e}, max {int(demand_diff.max())} doses)",
+                        diff <= PARITY_TOLERANCE[backend])
+    return ok
+
+if __name__ == "__main__":
+    print("🧪 Forecast ONNX parity")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as directory:
+        ok = test_parity(directory)
+    sys.exit(0 if ok else 1)
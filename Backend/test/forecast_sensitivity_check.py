@@ -0,0 +1,106 @@
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+warnings.filterwarnings('ignore')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Shared runtime state of this check lives in a scratch directory, not Backend/state
+os.environ["STATE_DIR"] = tempfile.mkdtemp(prefix="forecast-sensitivity-check-")
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from main import app
+from routers import forecasting
+from services.model_registry import registry
+
+def check(name, condition):
+    print(f"{'✅' if condition else '❌'} {name}")
+    return bool(condition)
+
+def gradient(key, inputs):
+    """d demand / d input on the last day by GradientTape, through the scaler's linear maps."""
+    import tensorflow as tf
+
+    model, scaler = registry.get(forecasting.model_name(key))
+    window = forecasting.recent_data_dict[key][forecasting.FEATURES].to_numpy(dtype=np.float64)
+    for name, column in forecasting.INPUT_COLUMNS.items():
+        window[-1, column] = inputs[name]
+    scaled = tf.constant(scaler.transform(window)[np.newaxis], dtype=tf.float32)
+    with tf.GradientTape() as tape:
+        tape.watch(scaled)
+        output = model(scaled)
+    grads = tape.gradient(output, scaled).numpy()[0, -1]
+    return {name: float(grads[column] * scaler.data_range_[0] / scaler.data_range_[column])
+            for name, column in forecasting.INPUT_COLUMNS.items() if name in forecasting.CONTINUOUS_INPUTS}
+
+def test_sensitivity(client):
+    response = client.post("/api/forecast/sensitivity", json={'temperature': 30.0, 'rainfall': 0.5}).json()
+    results = response['results']
+    ok = check("Every model is analysed in one call each",
+               len(results) == len(forecasting.recent_data_dict) and response['model_calls'] == len(results))
+
+    worst = 0.0
+    for result in results:
+        expected = gradient((result['district'], result['vaccine_type']), result['inputs'])
+        for name, value in expected.items():
+            worst = max(worst, abs(result['sensitivity'][name] - value) / max(abs(value), 1.0))
+    ok &= check(f"Finite differences match GradientTape (worst relative error {worst:.2e})", worst < 0.02)
+
+    result = results[0]
+    single = client.post("/api/forecast/predict", json={
+        'district': result['district'], 'vaccine_type': result['vaccine_type'], **result['inputs']}).json()
+    ok &= check("Base prediction matches /predict", single['prediction'] == result['prediction'])
+    on = client.post("/api/forecast/predict", json={
+        'district': result['district'], 'vaccine_type': result['vaccine_type'], **{**result['inputs'], 'holiday_indicator': 1}
+    }).json()['prediction']
+    off = client.post("/api/forecast/predict", json={
+        'district': result['district'], 'vaccine_type': result['vaccine_type'], **{**result['inputs'], 'holiday_indicator': 0}
+    }).json()['prediction']
+    ok &= check("Holiday effect matches /predict with the holiday on and off",
+                abs(result['sensitivity']['holiday_indicator'] - (on - off)) <= 1)
+    defaults = client.post("/api/forecast/sensitivity", json={'districts': ["Pune"]}).json()['results']
+    ok &= check("Inputs default to the most recent day",
+                len(defaults) == 1 and defaults[0]['inputs']['temperature'] ==
+                float(forecasting.recent_data_dict[("Pune", "BCG")]['Temperature'].iloc[-1]))
+    return ok
+
+def test_grid(client):
+    temperatures = [float(t) for t in np.linspace(20, 40, 10)]
+    rainfalls = [float(r) for r in np.linspace(0, 2, 10)]
+    start = time.perf_counter()
+    response = client.post("/api/forecast/sensitivity", json={'temperatures': temperatures, 'rainfalls': rainfalls,
+                                                              'stock_left': 120, 'holiday_indicator': 0}).json()
+    grid_seconds = time.perf_counter() - start
+    ok = check("Grid is a temperature x rainfall matrix per model",
+               all(np.shape(result['grid']['predictions']) == (10, 10) for result in response['results']))
+
+    result = response['results'][0]
+    mismatches, start = 0, time.perf_counter()
+    for i, temperature in enumerate(temperatures):
+        for j, rainfall in enumerate(rainfalls):
+            single = client.post("/api/forecast/predict", json={
+                'district': result['district'], 'vaccine_type': result['vaccine_type'], 'temperature': temperature,
+                'rainfall': rainfall, 'stock_left': 120, 'holiday_indicator': 0
+            }).json()
+            mismatches += single['prediction'] != result['grid']['predictions'][i][j]
+    single_seconds = (time.perf_counter() - start) * len(response['results'])
+    ok &= check(f"Grid matches /predict point by point ({mismatches} mismatches)", mismatches == 0)
+    print(f"   {len(response['results'])} models x 100 points: {grid_seconds * 1000:.0f} ms in one request "
+          f"vs ~{single_seconds * 1000:.0f} ms as single /predict calls")
+
+    ok &= check("Oversized grids are rejected", 'error' in client.post("/api/forecast/sensitivity", json={
+        'temperatures': list(range(200)), 'rainfalls': list(range(100))}).json())
+    ok &= check("Unknown districts are rejected",
+                'error' in client.post("/api/forecast/sensitivity", json={'districts': ["Atlantis"]}).json())
+    return ok
+
+if __name__ == "__main__":
+    print("🧪 Forecast sensitivity")
+    print("=" * 60)
+    with TestClient(app) as client:
+        ok = test_sensitivity(client)
+        ok &= test_grid(client)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,132 @@
+import io
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+warnings.filterwarnings('ignore')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Jobs of this check live in a scratch directory, not Backend/jobs
+os.environ["JOBS_DIR"] = tempfile.mkdtemp(prefix="jobs-check-")
+
+import pandas as pd
+import pyarrow.ipc as ipc
+from fastapi.testclient import TestClient
+
+from main import app
+from routers import forecasting
+
+def check(name, condition):
+    print(f"{'✅' if condition else '❌'} {name}")
+    return bool(condition)
+
+def wait_for(client, job_id, statuses=("completed", "failed", "cancelled"), timeout=300, until=None):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f"/api/jobs/{job_id}").json()
+        if job['status'] in statuses or (until and until(job)):
+            return job
+        time.sleep(0.2)
+    return job
+
+def test_dropout_job(client):
+    job = client.post("/api/jobs", json={'kind': "dropout", 'chunk_size': 250}).json()
+    ok = check("Dropout job is accepted before scoring", job['status'] in ("queued", "running") and job['total_chunks'] == 4)
+    job = wait_for(client, job['id'])
+    ok &= check("Dropout job scores the whole registry", job['status'] == "completed" and job['result_rows'] == 1000
+                and job['progress'] == 1.0)
+
+    result = pd.read_csv(io.StringIO(client.get(f"/api/jobs/{job['id']}/result").text))
+    ok &= check("CSV result has one row per child", len(result) == 1000 and result['row'].tolist() == list(range(1000)))
+
+    sample = result.head(5)
+    listed = client.get("/api/jobs").json()['jobs']
+    records = pd.read_csv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                       "data", "dropout_prediction_satara.csv")).head(5)
+    batch = client.post("/api/dropout/predict-batch", json=[{
+        'gender': row['Gender'], 'age': int(row['Age']), 'travel_time': int(row['Travel Time']),
+        'parent_education': row['Parent Education'], 'dose1_date': row['Dose1 Date'],
+        'dose2_date': row['Dose2 Date'], 'distance_to_center': float(row['Distance to Center']),
+        'delay_days': int(row['Delay_Days'])
+    } for _, row in records.iterrows()]).json()
+    ok &= check("Job predictions match /predict-batch",
+                [p['risk_level'] for p in batch['predictions']] == sample['risk_level'].tolist() and
+                all(abs(p['probability_on_time'] - q) < 1e-9
+                    for p, q in zip(batch['predictions'], sample['probability_on_time'])))
+    ok &= check("Job is listed", any(other['id'] == job['id'] for other in listed))
+    return ok
+
+def test_cluster_job(client):
+    job = client.post("/api/jobs", json={'kind': "cluster", 'chunk_size': 30}).json()
+    job = wait_for(client, job['id'])
+    ok = check("Cluster job classifies the area table", job['status'] == "completed" and job['result_rows'] == 100
+               and job['model_version'] is not None)
+    table = ipc.open_file(io.BytesIO(client.get(f"/api/jobs/{job['id']}/result", params={'format': "arrow"}).content)).read_all()
+    ok &= check("Arrow result has the batch prediction columns",
+                table.num_rows == 100 and {'area_id', 'risk_level', 'intervention_priority'} <= set(table.column_names))
+
+    records = [{'area_id': f"J{i}", 'city_name': "Pune", 'district_name': "Pune", 'latitude': 18.5,
+                'longitude': 73.8, 'zero_dose_count': 10 * i, 'income': 20000, 'travel_time': 20,
+                'literacy_rate': 80} for i in range(5)]
+    job = wait_for(client, client.post("/api/jobs", json={'kind': "cluster", 'records': records}).json()['id'])
+    lines = client.get(f"/api/jobs/{job['id']}/result", params={'format': "ndjson"}).text.strip().split("\n")
+    ok &= check("Posted records are scored and streamed as NDJSON", job['source'] == "records" and len(lines) == 5)
+    return ok
+
+def test_forecast_sweep(client):
+    parameters = {'temperatures': [30.0, 37.6], 'rainfalls': [0.1], 'stock_left': [100], 'holiday_indicators': [0, 1]}
+    job = wait_for(client, client.post("/api/jobs", json={'kind': "forecast", 'parameters': parameters,
+                                                          'chunk_size': 5}).json()['id'])
+    result = pd.read_csv(io.StringIO(client.get(f"/api/jobs/{job['id']}/result").text))
+    ok = check("Forecast sweep covers every model and grid point", job['status'] == "completed" and len(result) == 12)
+    ok &= check("Forecast jobs record the served models' version",
+                job['model_version'] == forecasting.forecast_job_version())
+
+    mismatches = 0
+    for _, row in result.iterrows():
+        single = client.post("/api/forecast/predict", json={
+            'district': row['district'], 'vaccine_type': row['vaccine_type'], 'temperature': row['temperature'],
+            'rainfall': row['rainfall'], 'stock_left': int(row['stock_left']),
+            'holiday_indicator': int(row['holiday_indicator'])
+        }).json()
+        mismatches += single['prediction'] != row['prediction']
+    ok &= check(f"Batched sweep matches /api/forecast/predict ({mismatches} mismatches)", mismatches == 0)
+
+    error = client.post("/api/jobs", json={'kind': "forecast", 'parameters': {'temperatures': [30], 'districts': ["Atlantis"]}}).json()
+    ok &= check("Invalid sweeps are rejected", 'error' in error)
+    ok &= check("Unknown kinds are rejected", 'error' in client.post("/api/jobs", json={'kind': "nope"}).json())
+    ok &= check("Unknown ids are reported", 'error' in client.get("/api/jobs/0123").json())
+    return ok
+
+def test_cancel(client):
+    job = client.post("/api/jobs", json={'kind': "dropout", 'chunk_size': 5}).json()
+    wait_for(client, job['id'], until=lambda job: job['completed_chunks'] >= 2)
+    job = client.post(f"/api/jobs/{job['id']}/cancel").json()
+    ok = check("Cancelled job stops early", job['status'] == "cancelled" and job['completed_chunks'] < job['total_chunks'])
+    ok &= check("Cancelled job has no result", 'error' in client.get(f"/api/jobs/{job['id']}/result").json())
+    return ok
+
+def test_resume():
+    with TestClient(app) as client:
+        job = client.post("/api/jobs", json={'kind': "dropout", 'chunk_size': 10}).json()
+        job = wait_for(client, job['id'], until=lambda job: job['completed_chunks'] >= 5)
+    # The server stopped mid-job: it is left running on disk, with its committed chunks
+    with TestClient(app) as client:
+        job = wait_for(client, job['id'])
+        ok = check(f"Restart resumes from the committed chunks ({job['resumed_chunks']} of {job['total_chunks']} kept)",
+                   job['status'] == "completed" and job['resumed_chunks'] >= 5 and job['result_rows'] == 1000)
+        result = pd.read_csv(io.StringIO(client.get(f"/api/jobs/{job['id']}/result").text))
+        ok &= check("Resumed result has every row exactly once", sorted(result['row']) == list(range(1000)))
+    return ok
+
+if __name__ == "__main__":
+    print("🧪 Batch jobs")
+    print("=" * 60)
+    with TestClient(app) as client:
+        ok = test_dropout_job(client)
+        ok &= test_cluster_job(client)
+        ok &= test_forecast_sweep(client)
+        ok &= test_cancel(client)
+    ok &= test_resume()
+    sys.exit(0 if ok else 1)
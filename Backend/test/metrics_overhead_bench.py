@@ -0,0 +1,38 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import metrics
+
+ITERATIONS = 1_000_000
+DISABLED_BUDGET_NS = 1000
+
+def span_cost_ns(iterations=ITERATIONS):
+    """Average cost of one empty `with span(...)` block, loop overhead subtracted."""
+    span = metrics.span
+    start = time.perf_counter()
+    for _ in range(iterations):
+        pass
+    baseline = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with span("bench"):
+            pass
+    return (time.perf_counter() - start - baseline) / iterations * 1e9
+
+if __name__ == "__main__":
+    print("⏱️  Metrics span overhead")
+    print("=" * 70)
+
+    metrics.ENABLED = True
+    enabled = span_cost_ns()
+    metrics.ENABLED = False
+    disabled = span_cost_ns()
+
+    ok = disabled < DISABLED_BUDGET_NS
+    print(f"   enabled  | {enabled:8.1f} ns per span")
+    print(f"{'✅' if ok else '❌'} disabled | {disabled:8.1f} ns per span (budget {DISABLED_BUDGET_NS} ns)")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,112 @@
+"""
+Model directories vs the single-file model pack.
+
+Image size: what push.py shipped before (the model directories, file by
+file) against models.pack, raw and gzip-compressed as image layers are.
+
+Cold start: every registered model loaded and warmed in a fresh process,
+from the files and from the pack, for each forecasting backend. Reports
+wall time, RSS, bytes read through read() calls (rchar) and the number of
+artifact files opened. The page cache is warm in both cases, so time
+differences come from fewer opens and less decoding, not from disk speed.
+
+    python test/model_pack_bench.py --repeat 3
+"""
+import argparse
+import gzip
+import io
+import multiprocessing
+import os
+import resource
+import sys
+import tarfile
+import tempfile
+import time
+import warnings
+
+warnings.filterwarnings('ignore')
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# What push.py copied before the pack, and what it ships now
+MODEL_DIRS = ["cluster_model", "notebooks/cluster_model", "notebooks/models",
+              "notebooks/vaccine_models", "notebooks/vaccine_scalers"]
+ARTIFACT_SUFFIXES = ('.pkl', '.keras', '.h5', '.onnx', '.pack')
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 1024 ** 2
+
+def read_bytes():
+    with open("/proc/self/io") as f:
+        return int(dict(line.split(': ') for line in f.read().splitlines())['rchar'])
+
+def cold_start(pack_path, backend):
+    """Runs in a fresh process: load and warm every model; (seconds, RSS MB, MB read, artifact opens)."""
+    os.environ["MODEL_PACK"] = pack_path
+    os.environ["FORECAST_BACKEND"] = backend
+    os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
+    import builtins
+    import main  # registers every model
+    from services.model_registry import registry
+
+    opens = []
+    real_open = builtins.open
+
+    def counting_open(file, *args, **kwargs):
+        if isinstance(file, str) and file.endswith(ARTIFACT_SUFFIXES):
+            opens.append(file)
+        return real_open(file, *args, **kwargs)
+
+    builtins.open = counting_open
+    before_rss, before_read = rss_mb(), read_bytes()
+    start = time.perf_counter()
+    registry.load_all()
+    seconds = time.perf_counter() - start
+    builtins.open = real_open
+    return seconds, rss_mb() - before_rss, (read_bytes() - before_read) / 1024 ** 2, len(opens), registry.is_ready()
+
+def payload(paths):
+    """(files, raw MB, gzip MB) of a set of files, as one tar layer."""
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb') as gz, tarfile.open(fileobj=gz, mode='w') as tar:
+        for path in paths:
+            tar.add(path, arcname=os.path.relpath(path, BACKEND_DIR))
+    return len(paths), sum(os.path.getsize(path) for path in paths) / 1024 ** 2, buffer.tell() / 1024 ** 2
+
+def model_dir_files():
+    files = []
+    for directory in MODEL_DIRS:
+        for root, _, names in os.walk(os.path.join(BACKEND_DIR, directory)):
+            files.extend(os.path.join(root, name) for name in sorted(names) if name.endswith(ARTIFACT_SUFFIXES))
+    return files
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare model directories with the model pack")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh-process cold starts per case (best is reported)")
+    args = parser.parse_args()
+
+    from services import model_pack
+
+    with tempfile.TemporaryDirectory() as directory:
+        pack_path = os.path.join(directory, "models.pack")
+        model_pack.build(pack_path, model_pack.served_files())
+
+        print("🧪 Model pack")
+        print("=" * 86)
+        print("📦 Shipped artifacts")
+        for label, files in (("directories", model_dir_files()), ("models.pack", [pack_path])):
+            count, raw_mb, gz_mb = payload(files)
+            print(f"{label:>12} | {count:3d} files | {raw_mb:6.2f} MB | gzip {gz_mb:6.2f} MB")
+
+        print("\n⏱️  Cold start (load + warm every model)")
+        context = multiprocessing.get_context("spawn")
+        for backend in ("keras", "onnx"):
+            for label, path in (("files", "off"), ("pack", pack_path)):
+                runs = []
+                for _ in range(args.repeat):
+                    with context.Pool(1) as pool:
+                        runs.append(pool.apply(cold_start, (path, backend)))
+                seconds, added_mb, read_mb, opens, ready = min(runs)
+                print(f"{backend:>6} {label:>5} | {seconds:6.2f}s | RSS +{added_mb:6.1f} MB | read {read_mb:6.2f} MB | "
+                      f"{opens:2d} artifact opens | {'ready' if ready else 'NOT READY'}")
@@ -0,0 +1,129 @@
+import json
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+import warnings
+
+warnings.filterwarnings('ignore')
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+# Artifacts are loaded from disk here and compared with a pack built into a scratch file
+os.environ["MODEL_PACK"] = "off"
+# Shared runtime state of this check lives in a scratch directory, not Backend/state
+os.environ["STATE_DIR"] = tempfile.mkdtemp(prefix="model-pack-check-")
+
+import joblib
+import numpy as np
+
+from services import model_pack
+
+def check(name, condition):
+    print(f"{'✅' if condition else '❌'} {name}")
+    return bool(condition)
+
+# Every endpoint's answer for one request, printed as JSON by a server started in another tree
+PREDICT_SCRIPT = """
+import json, warnings
+warnings.filterwarnings('ignore')
+from fastapi.testclient import TestClient
+from main import app
+with TestClient(app) as client:
+    print(json.dumps({
+        'forecast': client.post('/api/forecast/predict', json={'district': 'Pune', 'vaccine_type': 'BCG', 'temperature': 31.5,
+                                'rainfall': 0.4, 'stock_left': 120, 'holiday_indicator': 0}).json()['prediction'],
+        'dropout': client.post('/api/dropout/predict', json={'gender': 'F', 'age': 1, 'travel_time': 25,
+                               'parent_education': 'Primary', 'dose1_date': '2024-03-10', 'dose2_date': '2024-04-20',
+                               'distance_to_center': 4.5, 'delay_days': 40}).json()['probability_on_time'],
+        'cluster': client.post('/api/cluster/predict', json={'area_id': 'X1', 'city_name': 'Pune', 'district_name': 'Pune',
+                               'latitude': 18.5, 'longitude': 73.8, 'zero_dose_count': 120, 'income': 20000,
+                               'travel_time': 35, 'literacy_rate': 72}).json()['cluster_id'],
+        'versions': {m['name']: m['version'] for m in client.get('/api/models').json()['models']},
+        'models_ready': client.get('/api/models').json()['ready']
+    }))
+"""
+
+def test_entries(pack, files):
+    mismatches = []
+    for path in files:
+        loaded = pack.load(path)
+        if path.endswith('.pkl'):
+            same = pickle.dumps(loaded, protocol=4) == pickle.dumps(joblib.load(path), protocol=4)
+        elif path.endswith('.keras'):
+            from tensorflow.keras.models import load_model
+
+            x = np.random.default_rng(0).random((16, 5, 5), dtype=np.float32)
+            same = np.array_equal(loaded.predict(x, verbose=0), load_model(path).predict(x, verbose=0))
+        else:
+            with open(path, 'rb') as f:
+                same = bytes(loaded) == f.read()
+        if not same:
+            mismatches.append(model_pack.relative_path(path))
+    ok = check(f"Every packed artifact matches its file ({len(files)} files, mismatches: {mismatches})", not mismatches)
+
+    model = pack.load(os.path.join(BACKEND_DIR, "notebooks", "vaccine_models", "Pune_BCG_model.keras"))
+    weights = max(model.get_weights(), key=lambda w: w.nbytes)
+    entry = pack.entry(os.path.join(BACKEND_DIR, "notebooks", "vaccine_models", "Pune_BCG_model.keras"))
+    offsets = [pack.blobs[digest][0] for digest, _, _ in entry['weights']]
+    ok &= check("Weight arrays are stored raw and 64-byte aligned",
+                all(offset % model_pack.ALIGNMENT == 0 for offset in offsets) and weights.nbytes > 0)
+    return ok
+
+def test_zero_copy(directory):
+    source = os.path.join(directory, "big.pkl")
+    joblib.dump({'weights': np.arange(100000, dtype=np.float64), 'name': "big"}, source)
+    pack = model_pack.build(os.path.join(directory, "big.pack"), [source])
+    loaded = pack.load(source)
+    ok = check("Large arrays are served from the mapped pack without a copy",
+               not loaded['weights'].flags.owndata and not loaded['weights'].flags.writeable
+               and np.array_equal(loaded['weights'], np.arange(100000)))
+
+    model_pack.MODEL_PACK, model_pack._pack = pack.path, None
+    try:
+        fresh = model_pack.packed(source) is not None
+        os.utime(source, ns=(0, 0))
+        touched = model_pack.packed(source) is not None
+        joblib.dump({'weights': np.ones(100000), 'name': "refit"}, source)
+        stale = model_pack.packed(source) is None and model_pack.load_pickle(source)['name'] == "refit"
+        os.remove(source)
+        only_packed = model_pack.load_pickle(source)['name'] == "big" and model_pack.exists(source)
+    finally:
+        model_pack.MODEL_PACK, model_pack._pack = "off", None
+    ok &= check("An unchanged file is served from the pack, even when touched", fresh and touched)
+    ok &= check("A file changed since packing is loaded from disk instead", stale)
+    ok &= check("A file missing from disk is served from the pack", only_packed)
+    return ok
+
+def run_tree(directory, env):
+    output = subprocess.run([sys.executable, "-c", PREDICT_SCRIPT], cwd=directory, capture_output=True, text=True,
+                            env={**os.environ, **env}).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def test_pack_only_tree(directory):
+    """A copy of Backend/ with the model directories replaced by models.pack, as push.py ships it."""
+    tree = os.path.join(directory, "Backend")
+    shutil.copytree(BACKEND_DIR, tree, ignore=shutil.ignore_patterns(
+        "notebooks", "cluster_model", "jobs", "test", "__pycache__", "*.pack", ".git"))
+    model_pack.build(os.path.join(tree, "models.pack"), model_pack.served_files())
+
+    from_files = run_tree(BACKEND_DIR, {'MODEL_PACK': "off"})
+    from_pack = run_tree(tree, {'MODEL_PACK': os.path.join(tree, "models.pack")})
+    ok = check("A tree without model directories serves every model from the pack",
+               from_pack['models_ready'] and not os.path.exists(os.path.join(tree, "notebooks")))
+    ok &= check("Predictions match the file-by-file tree", all(from_pack[key] == from_files[key]
+                                                               for key in ("forecast", "dropout", "cluster")))
+    ok &= check("Model versions are the same from files and from the pack", from_pack['versions'] == from_files['versions'])
+    return ok
+
+if __name__ == "__main__":
+    print("🧪 Model pack")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as directory:
+        files = model_pack.served_files()
+        pack = model_pack.build(os.path.join(directory, "models.pack"), files)
+        ok = test_entries(pack, files)
+        ok &= test_zero_copy(directory)
+        ok &= test_pack_only_tree(directory)
+    sys.exit(0 if ok else 1)
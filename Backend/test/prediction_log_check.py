@@ -0,0 +1,147 @@
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+warnings.filterwarnings('ignore')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Shared runtime state of this check lives in a scratch directory, not Backend/state
+os.environ["STATE_DIR"] = tempfile.mkdtemp(prefix="prediction-log-check-")
+
+from fastapi.testclient import TestClient
+
+from main import app
+from services import metrics, prediction_log
+from services.model_registry import registry
+from services.prediction_log import PredictionLogger, log_files, logged_inputs, prediction_logger, read_file
+
+def check(name, condition):
+    print(f"{'✅' if condition else '❌'} {name}")
+    return bool(condition)
+
+CHILD = {'gender': "F", 'age': 1, 'travel_time': 25, 'parent_education': "Primary", 'dose1_date': "2024-03-10",
+         'dose2_date': "2024-04-20", 'distance_to_center': 4.5, 'delay_days': 40}
+AREA = {'area_id': "X1", 'city_name': "Pune", 'district_name': "Pune", 'latitude': 18.5, 'longitude': 73.8,
+        'zero_dose_count': 120, 'income': 20000, 'travel_time': 35, 'literacy_rate': 72.0}
+FORECAST = {'district': "Pune", 'vaccine_type': "BCG", 'temperature': 31.5, 'rainfall': 0.4, 'stock_left': 120,
+            'holiday_indicator': 0}
+
+def rows(directory, stream):
+    return [row for path in log_files(directory, stream) for row in read_file(path).to_pylist()]
+
+def test_routers(directory):
+    prediction_logger.directory = directory
+    with TestClient(app) as client:
+        dropout = client.post("/api/dropout/predict", json=CHILD).json()
+        client.post("/api/dropout/predict-batch", json=[{**CHILD, 'delay_days': days} for days in (0, 10, 20)])
+        forecast = client.post("/api/forecast/predict", json=FORECAST).json()
+        client.post("/api/cluster/predict", json=AREA)
+        client.post("/api/cluster/predict-batch", json=[{**AREA, 'area_id': "X2"}, {**AREA, 'area_id': "X3", 'income': None},
+                                                        {**AREA, 'area_id': "X4", 'zero_dose_count': 7}])
+        client.post("/api/forecast/predict", json={**FORECAST, 'district': "Atlantis"})
+        versions = {name: registry.version(name) for name in ("dropout", "cluster")}
+    # Leaving the client stops the logger, which writes what is buffered and closes the files
+
+    logged = rows(directory, "dropout")
+    ok = check("Single and batch dropout predictions are logged with their inputs",
+               [row['input'] for row in logged] == [CHILD] + [{**CHILD, 'delay_days': days} for days in (0, 10, 20)])
+    ok &= check("Outputs are logged without the echoed input, with the model version",
+                logged[0]['output']['probability_delayed'] == dropout['probability_delayed']
+                and 'input_data' not in logged[0]['output'] and logged[0]['model_version'] == versions['dropout'])
+    logged = rows(directory, "forecast")
+    ok &= check("Forecasts are logged and errors are not",
+                len(logged) == 1 and logged[0]['input'] == FORECAST
+                and logged[0]['output']['prediction'] == forecast['prediction'])
+    logged = rows(directory, "cluster")
+    ok &= check("Cluster batch rows are logged as /predict inputs, skipped rows left out",
+                [row['input']['area_id'] for row in logged] == ["X1", "X2", "X4"]
+                and logged[2]['input']['zero_dose_count'] == 7 and logged[2]['model_version'] == versions['cluster'])
+    ok &= check("Only complete files are left behind",
+                not any(name.endswith(prediction_log.OPEN_SUFFIX) for _, _, names in os.walk(directory) for name in names))
+    return ok
+
+def test_backpressure(directory):
+    logger = PredictionLogger(os.path.join(directory, "full"), capacity=100, flush_rows=10 ** 9, flush_seconds=3600)
+    logger.start()
+    before = metrics.PREDICTION_LOG.value(("bench", "dropped"))
+    # A stalled writer: the flush lock is held, as it would be during a slow disk write
+    with logger._flush_lock:
+        logger._wake.set()
+        started = time.perf_counter()
+        accepted = sum(logger.log("bench", {'x': i}, {'y': i}) for i in range(10000))
+        per_call_us = (time.perf_counter() - started) / 10000 * 1e6
+    dropped = metrics.PREDICTION_LOG.value(("bench", "dropped")) - before
+    ok = check(f"A full buffer drops and counts instead of blocking ({per_call_us:.2f} µs per log call)",
+               accepted == 100 and dropped == 9900 and per_call_us < 20)
+    logger.stop()
+    ok &= check("The accepted entries are written once the writer catches up",
+                len(rows(logger.directory, "bench")) == 100)
+
+    logger = PredictionLogger(os.path.join(directory, "chunks"), capacity=100, flush_rows=10 ** 9, flush_seconds=3600)
+    logger.start()
+    with logger._flush_lock:
+        chunk = [{'x': i} for i in range(60)]
+        accepted = [logger.log("bench", chunk, chunk) for _ in range(2)]
+        accepted.append(logger.log("bench", chunk[:40], chunk[:40]))
+    logger.stop()
+    ok &= check("Capacity counts the rows of batched entries, not the entries",
+                accepted == [True, False, True] and len(rows(logger.directory, "bench")) == 100)
+    return ok
+
+def test_bad_entry(directory):
+    logger = PredictionLogger(os.path.join(directory, "bad"), flush_seconds=0.05)
+    logger.start()
+    before = metrics.PREDICTION_LOG.value(("bench", "failed"))
+    # An output that is not a result dict cannot be converted
+    logger.log("bench", {'x': 1}, "not a dict")
+    time.sleep(0.3)
+    logger.log("bench", {'x': 2}, {'y': 2})
+    time.sleep(0.3)
+    alive = logger._thread is not None and logger._thread.is_alive()
+    logger.stop()
+    ok = check("A malformed entry is counted as failed and the writer keeps running",
+               alive and metrics.PREDICTION_LOG.value(("bench", "failed")) - before == 1)
+    ok &= check("Entries logged after the malformed one are written",
+                [row['input'] for row in rows(logger.directory, "bench")] == [{'x': 2}])
+    return ok
+
+def test_rotation(directory):
+    ok = True
+    for format in ("parquet", "arrow"):
+        logger = PredictionLogger(os.path.join(directory, format), format=format, rotate_bytes=1)
+        logger.start()
+        for i in range(3):
+            logger.log("bench", [{'x': i}, {'x': i + 0.5}], [{'y': None}, {'y': None}])
+            logger.flush()
+        logger.log("bench", {'x': 9.0}, {'y': "now set"})
+        logger.stop()
+        files = log_files(logger.directory, "bench")
+        values = [row['output']['y'] for row in rows(logger.directory, "bench")]
+        ok &= check(f"{format}: files rotate by size and on a new schema ({len(files)} files)",
+                    len(files) == 4 and files[0].endswith(prediction_log.EXTENSIONS[format]) and values[-1] == "now set"
+                    and len(values) == 7)
+    return ok
+
+def test_replay(directory):
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import benchmark
+
+    scenarios = benchmark.build_scenarios(replay=directory, batch_size=2)
+    ok = check("The benchmark replays logged inputs as its payloads",
+               scenarios['dropout.predict'].requests[0] == (None, CHILD)
+               and scenarios['cluster.predict'].requests[0][1] == AREA
+               and scenarios['dropout.predict_batch'].requests[0][1] == [CHILD, {**CHILD, 'delay_days': 0}])
+    ok &= check("Replay inputs are read newest last", logged_inputs("cluster", directory, limit=1)[0]['area_id'] == "X4")
+    return ok
+
+if __name__ == "__main__":
+    print("🧪 Prediction log")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as directory:
+        ok = test_routers(directory)
+        ok &= test_backpressure(directory)
+        ok &= test_bad_entry(directory)
+        ok &= test_rotation(directory)
+        ok &= test_replay(directory)
+    sys.exit(0 if ok else 1)
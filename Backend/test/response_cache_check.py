@@ -0,0 +1,176 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+warnings.filterwarnings('ignore')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Shared runtime state of this check lives in a scratch directory, not Backend/state
+os.environ["STATE_DIR"] = tempfile.mkdtemp(prefix="response-cache-check-")
+
+from routers.cluster import ClusterInput
+from services.response_cache import ResponseCache, canonical_key
+
+AREA = {
+    'area_id': 'MH001', 'city_name': 'Pune', 'district_name': 'Pune', 'latitude': 18.5204,
+    'longitude': 73.8567, 'zero_dose_count': 35, 'income': 25000, 'travel_time': 20, 'literacy_rate': 89.6
+}
+
+def check(name, condition):
+    print(f"{'✅' if condition else '❌'} {name}")
+    return bool(condition)
+
+class BrokenRedis:
+    async def get(self, key):
+        raise ConnectionError("redis down")
+
+    async def set(self, key, value, ex=None):
+        raise ConnectionError("redis down")
+
+async def test_local_tier():
+    cache = ResponseCache(max_entries=2, ttl_seconds=0.2)
+    calls = []
+
+    async def compute(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return {'value': value}
+
+    reordered = ClusterInput(**dict(reversed(list(AREA.items()))))
+    ok = check("Field order does not change the key",
+               canonical_key("cluster", "v1", ClusterInput(**AREA)) == canonical_key("cluster", "v1", reordered))
+    ok &= check("Model version changes the key",
+                canonical_key("cluster", "v1", ClusterInput(**AREA)) != canonical_key("cluster", "v2", ClusterInput(**AREA)))
+
+    results = await asyncio.gather(*(cache.get_or_compute("test", "v1", {'x': 1}, lambda: compute(1)) for _ in range(50)))
+    ok &= check("50 concurrent identical requests compute once", calls == [1] and all(r == {'value': 1} for r in results))
+    ok &= check("Followers are counted as coalesced", cache.stats['coalesced'] == 49)
+
+    await cache.get_or_compute("test", "v1", {'x': 1}, lambda: compute(1))
+    ok &= check("Repeat request is a local hit", cache.stats['local_hits'] == 1 and len(calls) == 1)
+
+    await cache.get_or_compute("test", "v1", {'x': 2}, lambda: compute(2))
+    await cache.get_or_compute("test", "v1", {'x': 3}, lambda: compute(3))
+    await cache.get_or_compute("test", "v1", {'x': 1}, lambda: compute(1))
+    ok &= check("Least recently used entry is evicted", calls.count(1) == 2)
+
+    time.sleep(0.25)
+    await cache.get_or_compute("test", "v1", {'x': 3}, lambda: compute(3))
+    ok &= check("Expired entries are recomputed", calls.count(3) == 2)
+
+    async def failing():
+        return {'error': 'Prediction failed', 'status': 'error'}
+    await cache.get_or_compute("test", "v1", {'x': 4}, failing)
+    await cache.get_or_compute("test", "v1", {'x': 4}, failing)
+    ok &= check("Error dicts are not cached", cache.stats['misses'] == 7)
+
+    async def raising():
+        raise RuntimeError("boom")
+    try:
+        await cache.get_or_compute("test", "v1", {'x': 5}, raising)
+        raised = False
+    except RuntimeError:
+        raised = True
+    ok &= check("Exceptions propagate and are not cached", raised and not cache._inflight)
+
+    leader = asyncio.ensure_future(cache.get_or_compute("test", "v1", {'x': 6}, lambda: compute(6)))
+    await asyncio.sleep(0)
+    followers = [asyncio.ensure_future(cache.get_or_compute("test", "v1", {'x': 6}, lambda: compute(6)))
+                 for _ in range(3)]
+    await asyncio.sleep(0)
+    leader.cancel()
+    results = await asyncio.gather(*followers)
+    ok &= check("Cancelling the first request does not fail the ones waiting on it",
+                leader.cancelled() and calls.count(6) == 1 and all(r == {'value': 6} for r in results)
+                and not cache._inflight)
+    print(f"   {cache.describe()}")
+    return ok
+
+async def test_redis_tier():
+    try:
+        from fakeredis import FakeAsyncRedis, FakeServer
+    except ImportError:
+        print("⚠️  fakeredis not installed, skipping Redis tier checks")
+        return True
+
+    server = FakeServer()
+    first = ResponseCache(redis=FakeAsyncRedis(server=server), ttl_seconds=60)
+    second = ResponseCache(redis=FakeAsyncRedis(server=server), ttl_seconds=60)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return {'prediction': 3, 'scores': [0.1, 0.9]}
+
+    await first.get_or_compute("test", "v1", {'x': 1}, compute)
+    value = await second.get_or_compute("test", "v1", {'x': 1}, compute)
+    ok = check("Second process gets a Redis hit", len(calls) == 1 and second.stats['redis_hits'] == 1)
+    ok &= check("Redis round trip preserves the value", value == {'prediction': 3, 'scores': [0.1, 0.9]})
+    ttl = await FakeAsyncRedis(server=server).ttl(canonical_key("test", "v1", {'x': 1}))
+    ok &= check("Redis entries get the TTL", 0 < ttl <= 60)
+
+    broken = ResponseCache(redis=BrokenRedis())
+    value = await broken.get_or_compute("test", "v1", {'x': 1}, compute)
+    ok &= check("Redis failures fall back to computing", value['prediction'] == 3 and broken.stats['redis_errors'] == 2)
+    return ok
+
+def test_endpoints():
+    import random
+
+    from fastapi.testclient import TestClient
+
+    from benchmark import dropout_payloads, forecast_payloads
+    from main import app
+    from routers import cluster
+    from routers.cluster import get_area_indexes
+    from services.response_cache import response_cache
+
+    rng = random.Random(7)
+    area = dict(AREA, area_id='CACHE001', latitude=18.61, longitude=73.91)
+    requests = [
+        ("forecast", "/api/forecast/predict", forecast_payloads(rng, 1)[0][1]),
+        ("dropout", "/api/dropout/predict", dropout_payloads(rng, 1)[0][1]),
+        ("cluster", "/api/cluster/predict", area)
+    ]
+    ok = True
+    with TestClient(app) as client:
+        response_cache.clear()
+        for name, path, payload in requests:
+            first = client.post(path, json=payload).json()
+            if name == "cluster":
+                # Forget the area so the cache hit has to index it again
+                for index in get_area_indexes():
+                    index.remove(['CACHE001'])
+            hits = response_cache.stats['local_hits']
+            second = client.post(path, json=dict(reversed(list(payload.items())))).json()
+            ok &= check(f"{name}: reordered repeat is served from cache",
+                        'error' not in first and first == second and response_cache.stats['local_hits'] == hits + 1)
+        metrics = second['current_metrics']
+        ok &= check("Integer inputs are echoed as integers",
+                    all(type(metrics[key]) is int for key in ('zero_dose_count', 'income', 'travel_time')))
+        compact = client.post("/api/cluster/predict?compact=true", json=area).json()
+        ok &= check("Cached responses are still slimmed per request", 'input_data' not in compact)
+        nearby = client.get("/api/cluster/nearby", params={'lat': 18.61, 'lon': 73.91, 'radius_km': 1}).json()
+        ok &= check("Cache hits still index the area for /nearby",
+                    any(match.get('area_id') == 'CACHE001' for match in nearby.get('areas', [])))
+        inserts = []
+        index_classified_areas = cluster.index_classified_areas
+        cluster.index_classified_areas = lambda areas: inserts.append(areas) or index_classified_areas(areas)
+        repeat = client.post("/api/cluster/predict", json=area).json()
+        cluster.index_classified_areas = index_classified_areas
+        ok &= check("Hits on an area already indexed are served without re-indexing it",
+                    repeat == first and not inserts)
+        stats = client.get("/api/models").json()['response_cache']
+        print(f"   {stats}")
+    return ok
+
+if __name__ == "__main__":
+    print("🧪 Response cache")
+    print("=" * 60)
+    ok = asyncio.run(test_local_tier())
+    ok &= asyncio.run(test_redis_tier())
+    ok &= test_endpoints()
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,139 @@
+"""
+Multi-worker benchmark: memory per worker and throughput from 1 to N workers.
+
+Starts `gunicorn -c gunicorn.conf.py main:app` with 1..--max-workers
+workers, with and without model preloading, waits for every worker to
+finish startup, then records per-process RSS and PSS (proportional set
+size, which splits shared pages between the processes using them) and
+drives the benchmark.py scenarios against it. The servers run without
+the response cache unless --cache is given.
+
+    python test/workers_bench.py --max-workers 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(TEST_DIR)
+sys.path.insert(0, TEST_DIR)
+
+from benchmark import RESULTS_DIR, build_scenarios, git_commit, run_all
+
+def memory_kb(pid):
+    """Rss, Pss and shared/private totals of one process from smaps_rollup."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return {
+        'rss_kb': fields.get('Rss', 0),
+        'pss_kb': fields.get('Pss', 0),
+        'shared_kb': fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0),
+        'private_kb': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    }
+
+def child_pids(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+def start_server(workers, preload, port, log_path, timeout):
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), PORT=str(port),
+               PRELOAD_MODELS="1" if preload else "0")
+    log = open(log_path, 'w')
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "main:app"],
+        cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with {process.returncode}; see {log_path}")
+        with open(log_path) as f:
+            if f.read().count("Application startup complete") >= workers:
+                return process
+        time.sleep(0.5)
+    stop_server(process)
+    raise TimeoutError(f"{workers} workers not ready after {timeout}s; see {log_path}")
+
+def stop_server(process):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+def measure(workers, preload, args, scenarios):
+    log_path = os.path.join(RESULTS_DIR, f"gunicorn-{workers}{'-preload' if preload else ''}.log")
+    started = time.perf_counter()
+    process = start_server(workers, preload, args.port, log_path, args.startup_timeout)
+    startup_seconds = time.perf_counter() - started
+    try:
+        master = memory_kb(process.pid)
+        worker_memory = [memory_kb(pid) for pid in child_pids(process.pid)]
+        results = asyncio.run(run_all(scenarios, f"http://127.0.0.1:{args.port}", args.requests,
+                                      args.concurrency * workers, args.warmup, 60.0, args.cache))
+    finally:
+        stop_server(process)
+
+    total_pss = master['pss_kb'] + sum(memory['pss_kb'] for memory in worker_memory)
+    return {
+        'workers': workers,
+        'preload': preload,
+        'startup_seconds': round(startup_seconds, 2),
+        'master': master,
+        'worker_memory': worker_memory,
+        'total_pss_mb': round(total_pss / 1024, 1),
+        'pss_per_worker_mb': round(sum(m['pss_kb'] for m in worker_memory) / len(worker_memory) / 1024, 1),
+        'rss_per_worker_mb': round(sum(m['rss_kb'] for m in worker_memory) / len(worker_memory) / 1024, 1),
+        'results': results
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark memory and throughput of 1..N gunicorn workers")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--scenarios", default="cluster.predict,dropout.predict,forecast.predict")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent clients per worker")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--startup-timeout", type=float, default=300)
+    parser.add_argument("--cache", action="store_true",
+                        help="Leave the response cache on and report cache hit and miss latency separately")
+    parser.add_argument("--output", help="JSON results path")
+    args = parser.parse_args()
+    if not args.cache:
+        os.environ["RESPONSE_CACHE_SIZE"] = "0"
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    all_scenarios = build_scenarios()
+    scenarios = [all_scenarios[name] for name in args.scenarios.split(',')]
+
+    print(f"🧪 gunicorn workers 1..{args.max_workers} on {os.cpu_count()} CPUs")
+    print("=" * 77)
+    runs = []
+    for workers in range(1, args.max_workers + 1):
+        for preload in (False, True):
+            run = measure(workers, preload, args, scenarios)
+            runs.append(run)
+            rps = "  ".join(f"{name} {result['rps']:.0f}" for name, result in run['results'].items())
+            print(f"{workers} workers {'preload' if preload else 'no preload':>10} | "
+                  f"total PSS {run['total_pss_mb']:7.1f} MB | per worker PSS {run['pss_per_worker_mb']:6.1f} "
+                  f"RSS {run['rss_per_worker_mb']:6.1f} MB | rps {rps}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"workers-{git_commit() or 'local'}.json")
+    with open(output, 'w') as f:
+        json.dump({'commit': git_commit(), 'cpus': os.cpu_count(), 'runs': runs}, f, indent=2)
+    print(f"\n💾 Results written to {output}")
+
+if __name__ == "__main__":
+    main()
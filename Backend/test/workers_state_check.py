@@ -0,0 +1,119 @@
+"""
+Runtime state across gunicorn workers: an update made through one worker
+is what every worker serves.
+
+Starts `gunicorn -c gunicorn.conf.py main:app` with 2 workers on a
+scratch STATE_DIR and sends each request on a new connection, so they
+are spread over both workers.
+
+    python test/workers_state_check.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, TEST_DIR)
+sys.path.insert(0, os.path.dirname(TEST_DIR))
+
+from workers_bench import start_server, stop_server
+from services.datasets import AREAS
+
+WORKERS = 2
+PORT = 8791
+URL = f"http://127.0.0.1:{PORT}"
+REQUESTS = 30
+
+def check(name, condition):
+    print(f"{'✅' if condition else '❌'} {name}")
+    return bool(condition)
+
+def area_inputs(n, scale=1):
+    frame = AREAS.frame().head(n)
+    return [{'area_id': f"W{i}", 'city_name': row['City Name'], 'district_name': row['District Name'],
+             'latitude': float(row['Latitude']), 'longitude': float(row['Longitude']),
+             'zero_dose_count': int(row['Zero-dose Count']) * scale, 'income': float(row['Income']),
+             'travel_time': float(row['Travel Time']), 'literacy_rate': float(row['Literacy Rate'])}
+            for i, (_, row) in enumerate(frame.iterrows())]
+
+def served_versions():
+    """(cluster version, worker pid) of REQUESTS requests, each on a new connection."""
+    seen = []
+    for _ in range(REQUESTS):
+        status = httpx.get(f"{URL}/api/models", timeout=30).json()
+        version = next(model['version'] for model in status['models'] if model['name'] == "cluster")
+        seen.append((version, status['worker_pid']))
+    return {version for version, _ in seen}, {pid for _, pid in seen}
+
+def test_cluster():
+    base, pids = served_versions()
+    ok = check(f"Requests reach both workers ({len(pids)} pids)", len(pids) == WORKERS and len(base) == 1)
+    first = httpx.post(f"{URL}/api/cluster/update", json=area_inputs(20, 5), timeout=60).json()
+    versions, _ = served_versions()
+    ok &= check(f"After an update every worker serves {first['model_version']}", versions == {first['model_version']})
+    second = httpx.post(f"{URL}/api/cluster/update", json=area_inputs(20, 5), timeout=60).json()
+    versions, _ = served_versions()
+    ok &= check("A second update continues from the first, whichever worker takes it",
+                sum(second['cluster_sizes'].values()) == sum(first['cluster_sizes'].values()) + 20
+                and versions == {second['model_version']})
+    nearby = [httpx.get(f"{URL}/api/cluster/nearby", params={'lat': 18.52, 'lon': 73.85, 'radius_km': 50},
+                        timeout=30).json() for _ in range(10)]
+    ok &= check("Every worker's spatial index agrees after the update",
+                len({tuple((m['area_id'], m['cluster_id']) for m in result['areas']) for result in nearby}) == 1)
+    httpx.post(f"{URL}/api/cluster/reload", timeout=60)
+    versions, _ = served_versions()
+    ok &= check("A reload through one worker reverts every worker", versions == base)
+    return ok
+
+CHILD = {'gender': "F", 'age': 1, 'travel_time': 25, 'parent_education': "Primary", 'dose1_date': "2024-03-10",
+         'dose2_date': "2024-04-20", 'distance_to_center': 4.5, 'delay_days': 40, 'district': "Pune"}
+
+def aggregate_totals():
+    """Registry totals of REQUESTS requests, each on a new connection."""
+    return [httpx.get(f"{URL}/api/dropout/aggregates", timeout=60).json()['totals']['children'] for _ in range(REQUESTS)]
+
+def test_children():
+    before = set(aggregate_totals())
+    ok = check(f"Every worker starts from the same registry ({before})", len(before) == 1)
+    for i in range(10):
+        httpx.put(f"{URL}/api/dropout/children/W{i}", json=CHILD, timeout=60)
+    httpx.delete(f"{URL}/api/dropout/children/W0", timeout=60)
+    after = set(aggregate_totals())
+    ok &= check(f"Children added and removed through either worker count in every worker ({after})",
+                after == {before.pop() + 9})
+    districts = {tuple(group['district'] for group in httpx.get(f"{URL}/api/dropout/aggregates",
+                                                                params={'group_by': "district"}, timeout=60).json()['groups'])
+                 for _ in range(10)}
+    return ok & check("Every worker reports the same groups", districts == {("Pune", "Satara")})
+
+def test_drift():
+    share_seconds = float(os.environ["DRIFT_SHARE_SECONDS"])
+    httpx.post(f"{URL}/api/drift/cluster/reset", timeout=30)
+    # The other worker starts its new window when it next publishes
+    time.sleep(3 * share_seconds)
+    for area in area_inputs(40):
+        httpx.post(f"{URL}/api/cluster/predict", json=area, timeout=30)
+    time.sleep(3 * share_seconds)
+    rows = {httpx.get(f"{URL}/api/drift/cluster", timeout=30).json()['live_rows'] for _ in range(10)}
+    ok = check(f"Every worker's drift report counts all requests ({rows})", rows == {40})
+    httpx.post(f"{URL}/api/drift/cluster/reset", timeout=30)
+    rows = {httpx.get(f"{URL}/api/drift/cluster", timeout=30).json()['live_rows'] for _ in range(10)}
+    return ok & check(f"A reset through one worker empties every worker's window ({rows})", rows == {0})
+
+if __name__ == "__main__":
+    print(f"🧪 Runtime state across {WORKERS} gunicorn workers")
+    print("=" * 60)
+    os.environ.update(STATE_DIR=tempfile.mkdtemp(prefix="workers-state-check-"), DRIFT_SHARE_SECONDS="0.5",
+                      PREDICTION_LOG="off", JOBS_DIR=tempfile.mkdtemp(prefix="workers-state-jobs-"))
+    log_path = os.path.join(tempfile.gettempdir(), "workers-state-check.log")
+    process = start_server(WORKERS, True, PORT, log_path, timeout=600)
+    try:
+        ok = test_cluster()
+        ok &= test_children()
+        ok &= test_drift()
+    finally:
+        stop_server(process)
+    sys.exit(0 if ok else 1)